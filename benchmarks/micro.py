@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Formatter and Text Utilities Micro-benchmark
+
+Measures the per-call cost of the formatting and parsing functions that run
+for every conversation turn, on inputs sampled from a real predictions file:
+nanoseconds per call and bytes allocated per call. Results can be saved as a
+baseline and later runs compared against it, to check an optimization or
+catch a regression.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data.formatter import format_financial_context, format_table_as_json_objects
+from src.data.reader import iter_items
+from src.utils.text_utils import clean_number, extract_numbers_from_text, parse_program_answer_from_text
+
+DEFAULT_BASELINE = str(Path(__file__).resolve().parent / "baselines" / "micro.json")
+
+# Increase beyond which a function counts as regressed; timings of repeated
+# runs on one machine differ by up to about 10%
+DEFAULT_THRESHOLD = 0.25
+
+
+def build_inputs(items: List[Dict[str, Any]]) -> Dict[str, Tuple[Callable, List[tuple]]]:
+    """Collect the arguments each function sees in a run over the items.
+
+    Tables and reports come straight from the items. extract_numbers_from_text
+    gets the report sentences, questions and table cells, clean_number the
+    number strings it extracts from them, and parse_program_answer_from_text
+    the kind of almost-JSON response that reaches the fallback parser.
+
+    Args:
+        items: Dataset or prediction items
+
+    Returns:
+        Function name mapped to (function, list of argument tuples)
+    """
+    tables, reports, texts, responses = [], [], [], []
+    for item in items:
+        report = item['financial_report']
+        reports.append((report,))
+        if report.get('table'):
+            tables.append((report['table'],))
+            texts.extend((str(cell),) for row in report['table'][1:] for cell in row[1:] if str(cell).strip())
+        texts.extend((text,) for text in report.get('pre_text', []) + report.get('post_text', []))
+        for turn in item.get('conversation', []):
+            texts.append((turn['question'],))
+            program = turn.get('predicted_program', turn.get('expected_program', ''))
+            answer = turn.get('predicted_answer', turn.get('expected_answer', 0))
+            responses.append((f'Here is the calculation:\n{{"program": "{program}", "answer": {answer},}}',))
+    numbers = [(number,) for (text,) in texts for number in extract_numbers_from_text(text)]
+
+    return {
+        'format_table_as_json_objects': (format_table_as_json_objects, tables),
+        'format_financial_context': (format_financial_context, reports),
+        'extract_numbers_from_text': (extract_numbers_from_text, texts),
+        'clean_number': (clean_number, numbers),
+        'parse_program_answer_from_text': (parse_program_answer_from_text, responses)
+    }
+
+
+def time_per_call(func: Callable, inputs: List[tuple], min_time: float = 0.2, repeat: int = 5) -> float:
+    """Measure the mean time of one call over all inputs.
+
+    Calls cycle through every input, enough passes to run for at least
+    min_time; the fastest of repeat runs is kept, as in timeit, because
+    slower runs only add noise from the rest of the system.
+
+    Args:
+        func: Function to measure
+        inputs: Argument tuples to call it with
+        min_time: Minimum seconds per run
+        repeat: Number of runs
+
+    Returns:
+        Nanoseconds per call
+    """
+    passes = 1
+    while True:
+        elapsed = _run_passes(func, inputs, passes)
+        if elapsed >= min_time * 1e9:
+            break
+        passes *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _run_passes(func, inputs, passes))
+    return best / (passes * len(inputs))
+
+
+def _run_passes(func: Callable, inputs: List[tuple], passes: int) -> int:
+    """Call func on every input passes times and return the elapsed nanoseconds."""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for _ in range(passes):
+            for args in inputs:
+                func(*args)
+        return time.perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def allocations_per_call(func: Callable, inputs: List[tuple]) -> Dict[str, float]:
+    """Measure the memory allocated by one call, averaged over all inputs.
+
+    CPython has no allocation counter, so this reports what tracemalloc
+    sees: the peak of memory allocated during the call (bytes) and the
+    number of memory blocks the call left allocated (blocks, normally 0
+    except for the returned value and caches).
+
+    Args:
+        func: Function to measure
+        inputs: Argument tuples to call it with
+
+    Returns:
+        Dictionary with bytes and blocks per call
+    """
+    total_bytes = 0
+    total_blocks = 0
+    tracemalloc.start()
+    try:
+        for args in inputs:
+            blocks_before = sys.getallocatedblocks()
+            tracemalloc.reset_peak()
+            current_before, _ = tracemalloc.get_traced_memory()
+            result = func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            total_bytes += peak - current_before
+            total_blocks += sys.getallocatedblocks() - blocks_before
+            del result
+    finally:
+        tracemalloc.stop()
+    return {
+        'bytes': total_bytes / len(inputs),
+        'blocks': total_blocks / len(inputs)
+    }
+
+
+def run_benchmarks(
+    inputs: Dict[str, Tuple[Callable, List[tuple]]],
+    names: Optional[List[str]] = None,
+    min_time: float = 0.2,
+    repeat: int = 5
+) -> Dict[str, Dict[str, float]]:
+    """Measure every selected function.
+
+    Args:
+        inputs: Output of build_inputs
+        names: Functions to measure (all if None)
+        min_time: Minimum seconds per timing run
+        repeat: Number of timing runs
+
+    Returns:
+        Function name mapped to ns_per_op, bytes_per_op, blocks_per_op and calls
+    """
+    results = {}
+    for name in names or list(inputs):
+        func, args = inputs[name]
+        if not args:
+            continue
+        # Warm up caches (regexes, lazily built tables) before measuring
+        for call_args in args:
+            func(*call_args)
+        allocations = allocations_per_call(func, args)
+        results[name] = {
+            'ns_per_op': time_per_call(func, args, min_time, repeat),
+            'bytes_per_op': allocations['bytes'],
+            'blocks_per_op': allocations['blocks'],
+            'calls': len(args)
+        }
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """Find functions that got slower or allocate more than in the baseline.
+
+    Args:
+        results: Current results from run_benchmarks
+        baseline: Results of the baseline run
+        threshold: Relative increase counted as a regression
+
+    Returns:
+        Names of the regressed functions
+    """
+    regressed = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ('ns_per_op', 'bytes_per_op'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                regressed.append(name)
+                break
+    return regressed
+
+
+def print_report(
+    results: Dict[str, Dict[str, float]],
+    baseline: Optional[Dict[str, Dict[str, float]]] = None
+) -> None:
+    """Print the results, with the change against the baseline if given."""
+    header = f"{'function':<32}{'calls':>7}{'ns/op':>12}{'B/op':>10}{'blocks/op':>11}"
+    print(header + (f"{'ns/op vs base':>15}{'B/op vs base':>14}" if baseline else ""))
+    for name, current in results.items():
+        line = (
+            f"{name:<32}{current['calls']:>7}{current['ns_per_op']:>12.0f}"
+            f"{current['bytes_per_op']:>10.0f}{current['blocks_per_op']:>11.1f}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += f"{_change(current['ns_per_op'], previous['ns_per_op']):>15}"
+            line += f"{_change(current['bytes_per_op'], previous['bytes_per_op']):>14}"
+        print(line)
+
+
+def _change(current: float, previous: float) -> str:
+    """Format the relative change from previous to current."""
+    if not previous:
+        return "n/a"
+    return f"{(current / previous - 1) * 100:+.1f}%"
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Measure the per-call cost of formatter and text_utils functions")
+    parser.add_argument(
+        '--input-file', '-i',
+        type=str,
+        default="data/output/predictions_first_100.json",
+        help='Predictions or dataset file to sample inputs from'
+    )
+    parser.add_argument(
+        '--sample-size', '-n',
+        type=int,
+        default=50,
+        help='Number of items sampled from the input file (default: 50)'
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for sampling (default: 0)')
+    parser.add_argument(
+        '--function', '-f',
+        dest='functions',
+        action='append',
+        help='Function to measure; repeat for several (default: all)'
+    )
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per timing run (default: 0.2)')
+    parser.add_argument('--repeat', type=int, default=7, help='Timing runs per function, fastest kept (default: 7)')
+    parser.add_argument(
+        '--baseline', '-b',
+        type=str,
+        default=None,
+        help=f'Compare against this baseline file (e.g. {DEFAULT_BASELINE})'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f'Relative increase counted as a regression (default: {DEFAULT_THRESHOLD})'
+    )
+    parser.add_argument(
+        '--save-baseline',
+        type=str,
+        default=None,
+        help='Write the results to this file for later comparisons'
+    )
+    args = parser.parse_args()
+
+    # Log records are still built, as in a real run, but not written out
+    logging.disable(logging.CRITICAL)
+
+    items = list(iter_items(args.input_file))
+    items = random.Random(args.seed).sample(items, min(args.sample_size, len(items)))
+    inputs = build_inputs(items)
+    unknown = set(args.functions or []) - set(inputs)
+    if unknown:
+        parser.error(f"Unknown functions {sorted(unknown)}, expected some of {list(inputs)}")
+
+    results = run_benchmarks(inputs, args.functions, args.min_time, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print(f"{len(items)} items sampled from {args.input_file} (seed {args.seed})")
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'input_file': args.input_file,
+                    'sample_size': len(items),
+                    'seed': args.seed
+                },
+                'results': results
+            }, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if baseline is not None:
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"Regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Table Format Benchmark
+
+Reports the characters and tokens per item that each table serializer in
+src/data/formatter.py adds to the prompt, so the cheapest format can be
+chosen for config.table_format. Tokens are counted with the model's
+tokenizer (config.token_encoding); without it they can only be estimated
+from characters, which cannot rank the formats. Accuracy has to be compared
+separately, by running main.py and eval.py with each --table-format.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import config
+from src.data.formatter import TABLE_FORMATS, format_financial_context
+from src.data.reader import iter_items
+from src.utils.tokens import count_tokens, tokenizer_available
+
+
+def measure_formats(
+    items: List[Dict[str, Any]],
+    formats: Optional[List[str]] = None
+) -> Dict[str, Dict[str, float]]:
+    """Measure the table and context size of each item in every format.
+
+    Args:
+        items: Dataset items with a financial_report
+        formats: Table formats to measure (all TABLE_FORMATS if None)
+
+    Returns:
+        Dictionary mapping format to per-item averages (table_chars,
+        table_tokens, context_chars, context_tokens)
+    """
+    formats = formats or list(TABLE_FORMATS)
+    results = {}
+    for table_format in formats:
+        serializer, _ = TABLE_FORMATS[table_format]
+        totals = {'table_chars': 0, 'table_tokens': 0, 'context_chars': 0, 'context_tokens': 0}
+        for item in items:
+            report = item['financial_report']
+            table = serializer(report.get('table') or [])
+            context = format_financial_context(report, table_format)
+            totals['table_chars'] += len(table)
+            totals['table_tokens'] += count_tokens(table)
+            totals['context_chars'] += len(context)
+            totals['context_tokens'] += count_tokens(context)
+        results[table_format] = {
+            name: total / len(items) if items else 0.0
+            for name, total in totals.items()
+        }
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, float]], num_items: int) -> None:
+    """Print per-format averages relative to the default json format."""
+    baseline = results.get('json', next(iter(results.values())))
+    print(f"Average per item over {num_items} items")
+    if tokenizer_available():
+        print(f"Tokens counted with the {config.token_encoding} tokenizer")
+    else:
+        print(
+            f"WARNING: tokenizer {config.token_encoding} unavailable (install tiktoken or cache its "
+            f"encoding); tokens are estimated from characters and do not rank the formats"
+        )
+    print(f"{'format':<14}{'table chars':>13}{'table tokens':>14}{'context tokens':>16}{'vs json':>9}")
+    for table_format, averages in results.items():
+        relative = (
+            averages['context_tokens'] / baseline['context_tokens'] * 100
+            if baseline['context_tokens'] else 0.0
+        )
+        print(
+            f"{table_format:<14}{averages['table_chars']:>13.0f}{averages['table_tokens']:>14.0f}"
+            f"{averages['context_tokens']:>16.0f}{relative:>8.0f}%"
+        )
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Compare prompt size of the table serializers")
+    parser.add_argument(
+        '--input-file', '-i',
+        type=str,
+        default="data/output/predictions_first_100.json",
+        help='Dataset or predictions file with financial reports'
+    )
+    parser.add_argument(
+        '--max-items', '-n',
+        type=int,
+        default=None,
+        help='Number of items to measure (default: all)'
+    )
+    parser.add_argument(
+        '--format', '-f',
+        dest='formats',
+        action='append',
+        choices=list(TABLE_FORMATS),
+        help='Format to measure; repeat for several (default: all)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        default=None,
+        help='Also write the results to this JSON file'
+    )
+    args = parser.parse_args()
+
+    items = list(iter_items(args.input_file, args.max_items))
+    results = measure_formats(items, args.formats)
+    print_report(results, len(items))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'items': len(items),
+                'tokenizer': config.token_encoding if tokenizer_available() else None,
+                'formats': results
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
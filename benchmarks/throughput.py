@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+End-to-end Throughput Benchmark
+
+Runs the prediction pipeline (DatasetProcessor) and the evaluation pipeline
+(EvaluationProcessor) against a stubbed client with simulated latency, for
+every combination of dataset size and concurrency, and reports items/sec,
+turns/sec, per-turn latency percentiles, CPU time and peak RSS.
+
+Per-turn latency covers the whole turn: for prediction, generate_prediction
+(prompt formatting, the client call with its rate limiting and retries, and
+parsing); for evaluation, the judge call for the turn's batch. Turns settled
+by rules or reused from a baseline are not timed.
+
+Each scenario runs in a fresh process so peak RSS is its own. With the
+default stub transport the client is replaced in-process; --transport http
+sends real requests through AzureOpenAIClient to a local MockServer, which
+adds the SDK and HTTP overhead (and shares the GIL with the server).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Make the repository root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import config
+from src.api.azure_client import AzureOpenAIClient
+from src.api.mock_server import (
+    LATENCY_DISTRIBUTIONS, LatencyModel, MockResponder, MockServer, load_answers
+)
+from src.evaluation.models import EvaluationResult
+from src.evaluation.processor import EvaluationProcessor
+from src.prediction.generator import PredictionGenerator
+from src.prediction.processor import DatasetProcessor
+from src.utils.tokens import count_tokens
+
+PIPELINES = ('prediction', 'evaluation')
+TRANSPORTS = ('stub', 'http')
+
+
+class CallRecorder:
+    """Counts client calls."""
+
+    def __init__(self):
+        """Initialize the count."""
+        self.calls = 0
+        self._record_lock = threading.Lock()
+
+    def record(self) -> None:
+        """Count a call."""
+        with self._record_lock:
+            self.calls += 1
+
+
+class TurnTimer:
+    """Records the wall time of every turn."""
+
+    def __init__(self):
+        """Initialize empty records."""
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def record(self, turns: int, duration: float) -> None:
+        """Record the duration of a step that handled one or more turns."""
+        with self._lock:
+            self.latencies.extend([duration] * turns)
+
+
+class TimedGenerator(PredictionGenerator):
+    """PredictionGenerator that times every turn it predicts."""
+
+    def __init__(self, client: AzureOpenAIClient, timer: TurnTimer):
+        """Initialize the generator.
+
+        Args:
+            client: API client
+            timer: Receives the duration of every turn
+        """
+        super().__init__(client=client)
+        self.timer = timer
+
+    def generate_prediction(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Predict a turn and time it."""
+        start = time.perf_counter()
+        try:
+            return super().generate_prediction(*args, **kwargs)
+        finally:
+            self.timer.record(1, time.perf_counter() - start)
+
+
+class TimedEvaluationProcessor(EvaluationProcessor):
+    """EvaluationProcessor that times the judge call of every batch of turns."""
+
+    def __init__(self, timer: TurnTimer):
+        """Initialize the processor.
+
+        Args:
+            timer: Receives the duration of every judged turn
+        """
+        super().__init__()
+        self.timer = timer
+
+    def _judge_batch(self, turns: List[Tuple[Dict[str, Any], int]]) -> List[EvaluationResult]:
+        """Judge turns and time the call."""
+        start = time.perf_counter()
+        try:
+            return super()._judge_batch(turns)
+        finally:
+            self.timer.record(len(turns), time.perf_counter() - start)
+
+    async def _ajudge_batch(self, turns: List[Tuple[Dict[str, Any], int]]) -> List[EvaluationResult]:
+        """Judge turns without blocking the event loop and time the call."""
+        start = time.perf_counter()
+        try:
+            return await super()._ajudge_batch(turns)
+        finally:
+            self.timer.record(len(turns), time.perf_counter() - start)
+
+
+class StubClient(AzureOpenAIClient, CallRecorder):
+    """AzureOpenAIClient that sleeps instead of calling the API.
+
+    Responses come from a MockResponder, so predictions are the dataset's
+    expected programs and judge verdicts compare the values in the prompt.
+    """
+
+    def __init__(self, responder: MockResponder, latency: LatencyModel):
+        """Initialize the stub.
+
+        Args:
+            responder: Builds response contents
+            latency: Simulated latency of every call
+        """
+        AzureOpenAIClient.__init__(self)
+        CallRecorder.__init__(self)
+        self.responder = responder
+        self.latency = latency
+
+    def create_chat_completion(self, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+        """Answer a request after the simulated latency."""
+        time.sleep(self.latency.sample())
+        self.record()
+        return self.responder.respond(messages)
+
+    async def acreate_chat_completion(self, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+        """Answer a request after the simulated latency without blocking the loop."""
+        await asyncio.sleep(self.latency.sample())
+        self.record()
+        return self.responder.respond(messages)
+
+
+class CountedClient(AzureOpenAIClient, CallRecorder):
+    """AzureOpenAIClient that counts its calls."""
+
+    def __init__(self):
+        """Initialize the client and the count."""
+        AzureOpenAIClient.__init__(self)
+        CallRecorder.__init__(self)
+
+    def create_chat_completion(self, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+        """Send a request and count it."""
+        content = super().create_chat_completion(messages, **kwargs)
+        self.record()
+        return content
+
+    async def acreate_chat_completion(self, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+        """Send an async request and count it."""
+        content = await super().acreate_chat_completion(messages, **kwargs)
+        self.record()
+        return content
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Get a nearest-rank percentile (0.0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_scenario(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one pipeline over one dataset size at one concurrency level.
+
+    Args:
+        scenario: pipeline, items, concurrency, input_file, predictions_file,
+                  transport, latency (distribution, mean, spread), batch_size,
+                  rules and seed
+
+    Returns:
+        Scenario parameters with the measured results
+    """
+    latency = LatencyModel(**scenario['latency'], seed=scenario['seed'])
+    answers = load_answers(scenario['input_file'], scenario['items'])
+    responder = MockResponder(answers, seed=scenario['seed'])
+
+    server = None
+    if scenario['transport'] == 'http':
+        server = MockServer(responder=responder, latency=latency).start()
+        config.azure_openai.api_key = 'mock'
+        config.azure_openai.endpoint = server.url
+        config.azure_openai.deployment_name = 'mock'
+        client = CountedClient()
+    else:
+        client = StubClient(responder, latency)
+
+    # Load the tokenizer up front so its one-off setup is not measured
+    count_tokens("")
+    timer = TurnTimer()
+
+    with tempfile.TemporaryDirectory() as temp_dir, contextlib.redirect_stdout(io.StringIO()):
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        if scenario['pipeline'] == 'prediction':
+            processor = DatasetProcessor(generator=TimedGenerator(client, timer))
+            stats = processor.process_dataset(
+                scenario['input_file'],
+                os.path.join(temp_dir, 'predictions.json'),
+                max_items=scenario['items'],
+                max_workers=scenario['concurrency']
+            )
+            items, turns = stats['total_items'], stats['total_turns']
+        else:
+            processor = TimedEvaluationProcessor(timer)
+            processor.judge.client = client
+            if not scenario['rules']:
+                processor.rule_judge = None
+            predictions = processor.load_predictions(scenario['predictions_file'])[:scenario['items']]
+            predictions_file = os.path.join(temp_dir, 'predictions.json')
+            with open(predictions_file, 'w', encoding='utf-8') as f:
+                json.dump(predictions, f)
+            summary = processor.process_evaluation(
+                predictions_file,
+                temp_dir,
+                max_concurrency=scenario['concurrency'],
+                batch_size=scenario['batch_size']
+            )
+            items, turns = len(predictions), summary.total
+        wall = time.perf_counter() - start
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    if server is not None:
+        server.stop()
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss_unit = 1 if sys.platform == 'darwin' else 1024
+    latencies_ms = [value * 1000 for value in timer.latencies]
+    return {
+        **{key: scenario[key] for key in ('pipeline', 'items', 'concurrency', 'transport')},
+        'turns': turns,
+        'requests': client.calls,
+        'wall_s': wall,
+        'items_per_s': items / wall if wall else 0.0,
+        'turns_per_s': turns / wall if wall else 0.0,
+        'latency_ms': {
+            'p50': percentile(latencies_ms, 50),
+            'p95': percentile(latencies_ms, 95),
+            'p99': percentile(latencies_ms, 99),
+            'mean': sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0
+        },
+        'cpu_s': (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime),
+        'peak_rss_mb': usage_after.ru_maxrss * rss_unit / 1024 / 1024
+    }
+
+
+def _run_isolated(scenario: Dict[str, Any], log_level: str) -> Dict[str, Any]:
+    """Run a scenario in a fresh process and return its results."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(_run_in_child, (scenario, log_level))
+
+
+def _run_in_child(scenario: Dict[str, Any], log_level: str) -> Dict[str, Any]:
+    """Configure logging in a worker process and run the scenario."""
+    logging.basicConfig(level=log_level)
+    return run_scenario(scenario)
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every pipeline, size and concurrency combination.
+
+    The evaluation pipeline judges predictions made by the stub, so that
+    its input looks like a real run.
+
+    Returns:
+        Dictionary with run metadata and a list of scenario results
+    """
+    latency = {'distribution': args.latency, 'mean': args.latency_mean, 'spread': args.latency_spread}
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        predictions_file = os.path.join(temp_dir, 'predictions.json')
+        if 'evaluation' in args.pipelines:
+            _write_stub_predictions(args, predictions_file)
+
+        for pipeline in args.pipelines:
+            for items in args.sizes:
+                for concurrency in args.concurrency:
+                    scenario = {
+                        'pipeline': pipeline,
+                        'items': items,
+                        'concurrency': concurrency,
+                        'input_file': args.input_file,
+                        'predictions_file': predictions_file,
+                        'transport': args.transport,
+                        'latency': latency,
+                        'batch_size': args.batch_size,
+                        'rules': args.rules,
+                        'seed': args.seed
+                    }
+                    result = _run_isolated(scenario, args.log_level)
+                    results.append(result)
+                    _print_result(result)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'input_file': args.input_file,
+            'transport': args.transport,
+            'latency': latency,
+            'batch_size': args.batch_size,
+            'rules': args.rules
+        },
+        'results': results
+    }
+
+
+def _write_stub_predictions(args: argparse.Namespace, predictions_file: str) -> None:
+    """Generate the evaluation input with a fast, 80% accurate stub."""
+    answers = load_answers(args.input_file, max(args.sizes))
+    client = StubClient(MockResponder(answers, accuracy=0.8, seed=args.seed), LatencyModel())
+    processor = DatasetProcessor(generator=PredictionGenerator(client=client))
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.process_dataset(args.input_file, predictions_file, max_items=max(args.sizes), max_workers=8)
+
+
+def _git_commit() -> Optional[str]:
+    """Get the current commit hash, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_header() -> None:
+    """Print the column headers of the results table."""
+    print(
+        f"{'pipeline':<12}{'items':>6}{'conc':>6}{'turns':>7}{'items/s':>9}{'turns/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'cpu s':>8}{'rss MB':>8}"
+    )
+
+
+def _print_result(result: Dict[str, Any]) -> None:
+    """Print one row of the results table."""
+    latency = result['latency_ms']
+    print(
+        f"{result['pipeline']:<12}{result['items']:>6}{result['concurrency']:>6}{result['turns']:>7}"
+        f"{result['items_per_s']:>9.2f}{result['turns_per_s']:>9.2f}"
+        f"{latency['p50']:>9.1f}{latency['p95']:>9.1f}{latency['p99']:>9.1f}"
+        f"{result['cpu_s']:>8.2f}{result['peak_rss_mb']:>8.1f}"
+    )
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Measure end-to-end pipeline throughput against a stubbed client")
+    parser.add_argument(
+        '--input-file', '-i',
+        type=str,
+        default="data/output/predictions_first_100.json",
+        help='Dataset with expected programs (default: data/output/predictions_first_100.json)'
+    )
+    parser.add_argument(
+        '--pipeline', '-p',
+        dest='pipelines',
+        action='append',
+        choices=list(PIPELINES),
+        help='Pipeline to run; repeat for both (default: both)'
+    )
+    parser.add_argument(
+        '--sizes', '-n',
+        type=int,
+        nargs='+',
+        default=[25, 100],
+        help='Dataset sizes in items (default: 25 100)'
+    )
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        nargs='+',
+        default=[1, 10],
+        help='Concurrency levels: workers for prediction, requests in flight for evaluation (default: 1 10)'
+    )
+    parser.add_argument(
+        '--transport',
+        choices=list(TRANSPORTS),
+        default='stub',
+        help='In-process stub client, or AzureOpenAIClient against a local MockServer (default: stub)'
+    )
+    parser.add_argument(
+        '--latency',
+        choices=list(LATENCY_DISTRIBUTIONS),
+        default='lognormal',
+        help='Simulated latency distribution (default: lognormal)'
+    )
+    parser.add_argument('--latency-mean', type=float, default=0.05, help='Typical latency in seconds (default: 0.05)')
+    parser.add_argument('--latency-spread', type=float, default=0.3, help='Latency spread (default: 0.3)')
+    parser.add_argument(
+        '--batch-size', '-b',
+        type=int,
+        default=1,
+        help='Turns per judge request in the evaluation pipeline (default: 1)'
+    )
+    parser.add_argument(
+        '--rules',
+        action='store_true',
+        help='Let the rule-based judge settle clear cases (default: every turn goes to the stub judge)'
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument(
+        '--log-level',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        default='WARNING',
+        help='Logging level inside the pipelines (default: WARNING)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        default=None,
+        help='Also write the results to this JSON file'
+    )
+    args = parser.parse_args()
+    args.pipelines = args.pipelines or list(PIPELINES)
+
+    logging.basicConfig(level=args.log_level)
+    print(
+        f"Simulated latency: {args.latency} mean {args.latency_mean}s spread {args.latency_spread} "
+        f"({args.transport} transport)"
+    )
+    _print_header()
+    report = run_suite(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Prompt Corpus Builder
+
+Compiles a dataset into a prompt-ready corpus (formatted context, normalized
+table and per-turn history prefixes) that main.py --corpus reads instead of
+formatting prompts during the run.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from config.settings import config
+from src.data.corpus import build_corpus
+from src.data.formatter import TABLE_FORMATS
+from src.utils.logging_config import setup_logging
+from src.utils.validation import validate_input_file
+
+
+def create_cli_parser() -> argparse.ArgumentParser:
+    """Create command line argument parser.
+    
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Compile a financial QA dataset into a precompiled prompt corpus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python build_corpus.py                      # Compile the default input file
+  python build_corpus.py -n 100               # Compile the first 100 examples
+  python main.py --corpus data/input/processed_train.corpus.jsonl
+        """
+    )
+    
+    parser.add_argument(
+        '--input-file', '-i',
+        type=str,
+        default=config.default_input_file,
+        help=f'Input dataset path (default: {config.default_input_file})'
+    )
+    
+    parser.add_argument(
+        '--output-file', '-o',
+        type=str,
+        default=config.default_corpus_file,
+        help=f'Corpus path; the index is written next to it (default: {config.default_corpus_file})'
+    )
+    
+    parser.add_argument(
+        '--table-format',
+        choices=list(TABLE_FORMATS),
+        default=None,
+        help=f'How tables are serialized in the prompt (default: {config.table_format})'
+    )
+    
+    parser.add_argument(
+        '--max-examples', '-n',
+        type=int,
+        default=None,
+        help='Maximum number of examples to compile (default: all examples)'
+    )
+    
+    parser.add_argument(
+        '--log-level',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        default='INFO',
+        help='Logging level (default: INFO)'
+    )
+    
+    return parser
+
+
+def main():
+    """Main execution function."""
+    parser = create_cli_parser()
+    args = parser.parse_args()
+    
+    if args.max_examples is not None and args.max_examples <= 0:
+        print("Error: --max-examples must be a positive integer")
+        sys.exit(1)
+    
+    if args.table_format:
+        config.table_format = args.table_format
+    
+    setup_logging(log_level=args.log_level)
+    
+    try:
+        validate_input_file(args.input_file)
+        stats = build_corpus(args.input_file, args.output_file, args.max_examples)
+        
+        print(f"Compiled {stats['items']} items ({stats['turns']} turns) into {args.output_file}")
+        print(f"Table format: {config.table_format}")
+        print(f"Corpus size: {stats['size_bytes'] / 1024 / 1024:.1f} MB")
+        
+    except Exception as e:
+        print(f"Error: Corpus build failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
 """Configuration settings for the Financial QA Predictor."""
 
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 
+def _get_int_env(name: str) -> Optional[int]:
+    """Read an optional integer environment variable."""
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
 class AzureOpenAIConfig:
     """Azure OpenAI configuration."""
     
@@ -16,6 +23,10 @@ class AzureOpenAIConfig:
         self.api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-01")
         self.model_name = os.getenv("AZURE_OPENAI_MODEL_NAME")
         self.deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
+        
+        # Deployment quotas enforced client-side (unset disables limiting)
+        self.requests_per_minute = _get_int_env("AZURE_OPENAI_RPM")
+        self.tokens_per_minute = _get_int_env("AZURE_OPENAI_TPM")
     
     def validate(self) -> None:
         """Validate that required configuration is present."""
@@ -41,19 +52,54 @@ class AppConfig:
         self.input_dir = os.path.join(self.data_dir, "input")
         self.output_dir = os.path.join(self.data_dir, "output")
         self.logs_dir = "logs"
+        self.cache_dir = os.path.join(self.data_dir, "cache")
         
         # Default files
         self.default_input_file = os.path.join(self.input_dir, "processed_train.json")
         self.default_output_file = os.path.join(self.output_dir, "predictions.json")
+        self.default_corpus_file = os.path.join(self.input_dir, "processed_train.corpus.jsonl")
         
         # AI settings
         self.max_tokens = 1000
         self.temperature = 0.1  # Low temperature for consistent numerical results
+        self.token_encoding = "o200k_base"  # tiktoken encoding used to count prompt tokens
+        self.token_encoding_download = False  # Fetch the encoding when it is not in the local tiktoken cache
+        self.max_prompt_tokens = 12000  # prompts above this are trimmed (None disables)
+        
+        # Prediction settings
+        self.recompute_answers = True  # Replace answers that disagree with their executed program
+        self.answer_tolerance = 1e-3  # relative tolerance when comparing numerical answers
+        self.table_format = "json"  # "json", "compact_json", "markdown" or "csv"
+        self.context_cache_size = 256  # formatted report contexts kept in memory (0 disables)
+        self.retrieval_enabled = False  # Send only the report snippets relevant to the question
+        self.retrieval_top_k = 12  # maximum snippets (sentences or table rows) kept
+        self.retrieval_token_budget = 1200  # estimated tokens of the kept snippets
+        
+        # Evaluation settings
+        self.rule_judge_enabled = True  # Settle clear-cut turns without the LLM judge
+        self.rule_mismatch_margin = 0.05  # relative difference treated as clearly wrong
+        self.eval_concurrency = 10  # Default number of judge requests in flight
+        self.judge_batch_size = 1  # Turns per judge request (1 disables batching)
         
         # Processing settings
-        self.batch_size = 10  # For future batch processing
-        self.retry_attempts = 3
-        self.retry_delay = 1.0  # seconds
+        self.batch_size = 10  # Default number of items processed concurrently
+        self.retry_attempts = 3  # retries after the first attempt
+        self.retry_delay = 1.0  # seconds, base for exponential backoff
+        self.retry_max_delay = 60.0  # seconds, cap for a single backoff
+        
+        # Output settings
+        self.output_format = "json"  # "json" (single array) or "jsonl" (streamed)
+        self.output_flush_interval = 1  # items between flushes of JSONL output
+        
+        # Connection pool settings for the async client
+        self.max_connections = 100
+        self.max_keepalive_connections = 20
+        
+        # Response cache settings
+        self.cache_enabled = True
+        self.cache_path = os.path.join(self.cache_dir, "responses.sqlite")
+        self.cache_max_bytes = 512 * 1024 * 1024
+        self.verdict_cache_path = os.path.join(self.cache_dir, "verdicts.sqlite")
     
     def ensure_directories(self) -> None:
         """Create necessary directories if they don't exist."""
@@ -11,7 +11,10 @@ from pathlib import Path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
+from config.settings import config
+from src.api.azure_client import enable_response_cache
 from src.evaluation.processor import EvaluationProcessor
+from src.evaluation.verdict_cache import VerdictCache
 from src.utils.logging_config import setup_logging
 
 
@@ -36,6 +39,36 @@ def create_cli_parser() -> argparse.ArgumentParser:
         help='Output directory for results'
     )
     
+    parser.add_argument(
+        '--baseline',
+        type=str,
+        default=None,
+        help='Previous evaluation_results_*.json; only turns whose predictions changed are judged again'
+    )
+    
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        default=None,
+        help=f'Number of judge requests in flight (default: {config.eval_concurrency})'
+    )
+    
+    parser.add_argument(
+        '--batch-size', '-b',
+        type=int,
+        default=None,
+        help=f'Number of turns judged per LLM request (default: {config.judge_batch_size})'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=(
+            f'Always call the API instead of reusing cached responses from {config.cache_path} '
+            f'and verdicts from {config.verdict_cache_path}'
+        )
+    )
+    
     parser.add_argument(
         '--log-level',
         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
@@ -51,16 +84,40 @@ def main():
     parser = create_cli_parser()
     args = parser.parse_args()
     
+    if args.concurrency is not None and args.concurrency <= 0:
+        print("Error: --concurrency must be a positive integer")
+        sys.exit(1)
+    
+    if args.batch_size is not None and args.batch_size <= 0:
+        print("Error: --batch-size must be a positive integer")
+        sys.exit(1)
+    
     # Setup logging
     setup_logging(log_level=args.log_level)
     
     try:
+        # Reuse judge responses and verdicts from previous runs
+        cache = None
+        verdict_cache = None
+        if not args.no_cache and config.cache_enabled:
+            cache = enable_response_cache()
+            verdict_cache = VerdictCache()
+        
         # Initialize processor and run evaluation
-        processor = EvaluationProcessor()
-        summary = processor.process_evaluation(args.input_file, args.output_dir)
+        processor = EvaluationProcessor(verdict_cache)
+        summary = processor.process_evaluation(
+            args.input_file, args.output_dir, args.concurrency, args.batch_size,
+            baseline_file=args.baseline
+        )
         
         print(f"\nEvaluation completed successfully!")
         print(f"Overall accuracy: {summary.overall_accuracy:.1f}%")
+        if cache:
+            cache_stats = cache.stats()
+            print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        if verdict_cache:
+            verdict_stats = verdict_cache.stats()
+            print(f"Verdict cache: {verdict_stats['hits']} hits, {verdict_stats['misses']} misses")
         
     except Exception as e:
         print(f"Error: Evaluation failed: {e}")
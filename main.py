@@ -15,17 +15,34 @@ src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
 from config.settings import config
+from src.api.azure_client import enable_response_cache
+from src.data.formatter import TABLE_FORMATS
 from src.utils.logging_config import setup_logging
-from src.prediction.processor import dataset_processor
+from src.prediction.processor import get_dataset_processor
+from src.prediction.writer import OUTPUT_FORMATS
 from src.utils.validation import validate_environment, validate_input_file
 
 
-def main(max_examples: int = None) -> None:
+def main(
+    max_examples: int = None,
+    workers: int = None,
+    use_cache: bool = True,
+    resume: bool = False,
+    output_format: str = None,
+    corpus_file: str = None
+) -> None:
     """Main function to run the prediction generator.
     
     Args:
         max_examples: Maximum number of examples to process. 
                       If None, processes all examples.
+        workers: Number of examples processed concurrently.
+                 If None, uses config.batch_size.
+        use_cache: Whether to serve repeated requests from the response cache.
+        resume: Whether to skip examples completed by an interrupted run.
+        output_format: 'json' or 'jsonl'. If None, uses config.output_format.
+        corpus_file: Prompt corpus compiled by build_corpus.py.
+                     If None, prompts are formatted during the run.
     """
     # Setup logging
     logger = setup_logging()
@@ -43,33 +60,54 @@ def main(max_examples: int = None) -> None:
         # Ensure directories exist
         config.ensure_directories()
         
-        # Validate environment and input
-        validate_environment()
+        # Validate input; credentials are checked below
         validate_input_file(config.default_input_file)
         
         # Determine output file
+        output_format = output_format or config.output_format
         output_file = config.default_output_file
+        if output_format == 'jsonl' and output_file.endswith('.json'):
+            output_file += 'l'
         if max_examples:
             base_name = os.path.splitext(output_file)[0]
             extension = os.path.splitext(output_file)[1]
             output_file = f"{base_name}_first_{max_examples}{extension}"
             logger.info(f"Updated output file for limited run: {output_file}")
         
+        # Reuse responses from previous runs. Cached turns need no
+        # credentials; the client checks them on the first cache miss
+        cache = None
+        if use_cache and config.cache_enabled:
+            cache = enable_response_cache()
+        else:
+            validate_environment()
+        
         # Print startup information
         print("Starting financial QA prediction generation...")
         print(f"Input file: {config.default_input_file}")
         print(f"Output file: {output_file}")
         if max_examples:
             print(f"Processing only first {max_examples} examples")
+        if corpus_file:
+            print(f"Prompt corpus: {corpus_file}")
         print(f"Logs will be saved to: {config.logs_dir}/")
         
         # Process the dataset
-        stats = dataset_processor.process_dataset(
+        stats = get_dataset_processor().process_dataset(
             input_file=config.default_input_file,
             output_file=output_file,
-            max_items=max_examples
+            max_items=max_examples,
+            max_workers=workers,
+            resume=resume,
+            output_format=output_format,
+            corpus_file=corpus_file
         )
         
+        if cache:
+            cache_stats = cache.stats()
+            logger.info(f"Response cache: {cache_stats}")
+            print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        
         logger.info("SCRIPT COMPLETED SUCCESSFULLY")
         
     except Exception as e:
@@ -92,6 +130,10 @@ Examples:
   python main.py                    # Process all examples
   python main.py --max-examples 5   # Process first 5 examples
   python main.py -n 10             # Process first 10 examples
+  python main.py -w 20             # Process 20 examples concurrently
+  python main.py --resume          # Continue an interrupted run
+  python main.py --output-format jsonl  # Stream results as JSON Lines
+  python main.py --corpus data/input/processed_train.corpus.jsonl  # Use precompiled prompts
         """
     )
     
@@ -102,6 +144,13 @@ Examples:
         help='Maximum number of examples to process (default: process all examples)'
     )
     
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=None,
+        help=f'Number of examples processed concurrently (default: {config.batch_size})'
+    )
+    
     parser.add_argument(
         '--input-file', '-i',
         type=str,
@@ -116,6 +165,49 @@ Examples:
         help=f'Output file path (default: {config.default_output_file})'
     )
     
+    parser.add_argument(
+        '--output-format',
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help=f'Write one JSON array (json) or stream one item per line (jsonl) '
+             f'(default: {config.output_format})'
+    )
+    
+    parser.add_argument(
+        '--table-format',
+        choices=list(TABLE_FORMATS),
+        default=None,
+        help=f'How tables are serialized in the prompt (default: {config.table_format})'
+    )
+    
+    parser.add_argument(
+        '--retrieval',
+        action='store_true',
+        help=(
+            f'Send only the {config.retrieval_top_k} report sentences/table rows most relevant '
+            f'to each question (up to ~{config.retrieval_token_budget} tokens)'
+        )
+    )
+    
+    parser.add_argument(
+        '--corpus',
+        type=str,
+        default=None,
+        help='Prompt corpus compiled by build_corpus.py; skips formatting prompts during the run'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip examples already completed by an interrupted run with the same output file'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Always call the API instead of reusing cached responses from {config.cache_path}'
+    )
+    
     parser.add_argument(
         '--log-level',
         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
@@ -136,10 +228,26 @@ if __name__ == "__main__":
         parser.print_help()
         sys.exit(1)
     
+    if args.workers is not None and args.workers <= 0:
+        print("Error: --workers must be a positive integer")
+        parser.print_help()
+        sys.exit(1)
+    
     # Override config defaults if specified
     if args.input_file:
         config.default_input_file = args.input_file
     if args.output_file:
         config.default_output_file = args.output_file
+    if args.table_format:
+        config.table_format = args.table_format
+    if args.retrieval:
+        config.retrieval_enabled = True
     
-    main(max_examples=args.max_examples)
\ No newline at end of file
+    main(
+        max_examples=args.max_examples,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        resume=args.resume,
+        output_format=args.output_format,
+        corpus_file=args.corpus
+    )
\ No newline at end of file
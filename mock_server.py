@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Mock Azure OpenAI Server
+
+Serves the chat completions API locally with simulated latency and injected
+429/5xx failures, so main.py and eval.py can be load tested without using
+the real deployment's quota.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent / "src"
+sys.path.insert(0, str(src_path))
+
+from src.api.mock_server import (
+    LATENCY_DISTRIBUTIONS, FaultInjector, LatencyModel, MockResponder, MockServer, load_answers
+)
+from src.utils.logging_config import setup_logging
+
+
+def create_cli_parser() -> argparse.ArgumentParser:
+    """Create command line argument parser.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Run a local stand-in for the Azure OpenAI chat completions endpoint",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python mock_server.py --dataset data/input/processed_train.json
+  python mock_server.py --latency lognormal --latency-mean 0.8 --latency-spread 0.5
+  python mock_server.py --rate-limit-rate 0.05 --error-rate 0.01 --retry-after 2
+
+Then point the pipeline at it:
+  export AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8000
+  export AZURE_OPENAI_API_KEY=mock AZURE_OPENAI_DEPLOYMENT_NAME=mock
+  python main.py -n 50 && python eval.py
+        """
+    )
+
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+
+    parser.add_argument(
+        '--dataset', '-d',
+        type=str,
+        default=None,
+        help='Dataset whose expected programs answer prediction requests (default: canned answers only)'
+    )
+    parser.add_argument(
+        '--accuracy',
+        type=float,
+        default=1.0,
+        help='Fraction of known questions answered correctly (default: 1.0)'
+    )
+    parser.add_argument(
+        '--canned-response',
+        type=str,
+        default=None,
+        help='JSON answer for questions not in the dataset (default: {"program": "", "answer": 0})'
+    )
+
+    parser.add_argument(
+        '--latency',
+        choices=list(LATENCY_DISTRIBUTIONS),
+        default='fixed',
+        help='Latency distribution (default: fixed)'
+    )
+    parser.add_argument('--latency-mean', type=float, default=0.0, help='Typical latency in seconds (default: 0)')
+    parser.add_argument(
+        '--latency-spread',
+        type=float,
+        default=0.0,
+        help='Half-width (uniform), standard deviation (normal) or sigma (lognormal) (default: 0)'
+    )
+
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500/502/503')
+    parser.add_argument(
+        '--retry-after',
+        type=float,
+        default=None,
+        help='Seconds sent in Retry-After headers of 429 and 503 responses (default: no header)'
+    )
+    parser.add_argument(
+        '--max-concurrent',
+        type=int,
+        default=None,
+        help='Throttle requests beyond this many in flight (default: no limit)'
+    )
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs')
+
+    parser.add_argument(
+        '--log-level',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        default='INFO',
+        help='Logging level (default: INFO)'
+    )
+
+    return parser
+
+
+def main():
+    """Main execution function."""
+    parser = create_cli_parser()
+    args = parser.parse_args()
+
+    setup_logging(log_level=args.log_level)
+
+    try:
+        answers = load_answers(args.dataset) if args.dataset else None
+        canned_response = json.loads(args.canned_response) if args.canned_response else None
+        server = MockServer(
+            host=args.host,
+            port=args.port,
+            responder=MockResponder(answers, args.accuracy, canned_response, seed=args.seed),
+            latency=LatencyModel(args.latency, args.latency_mean, args.latency_spread, seed=args.seed),
+            faults=FaultInjector(
+                args.rate_limit_rate,
+                args.error_rate,
+                args.retry_after,
+                args.max_concurrent,
+                seed=args.seed
+            )
+        )
+    except Exception as e:
+        print(f"Error: Could not start mock server: {e}")
+        sys.exit(1)
+
+    print(f"Mock Azure OpenAI server listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
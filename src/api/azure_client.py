@@ -1,32 +1,265 @@
 """Azure OpenAI client management."""
 
-from openai import AzureOpenAI
-from typing import Dict, Any, List
+import asyncio
+import threading
+import time
+import httpx
+from openai import AzureOpenAI, AsyncAzureOpenAI
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from config.settings import config
+from src.api.cache import ResponseCache
+from src.api.retry import call_with_retry, acall_with_retry
 from src.utils.logging_config import get_logger
+from src.utils.metrics import CallMetrics, record_call
+from src.utils.tokens import estimate_message_tokens
 
 logger = get_logger(__name__)
 
 
+class TokenBucket:
+    """Token bucket refilled continuously up to a per-minute capacity."""
+    
+    def __init__(self, capacity_per_minute: float):
+        """Initialize a full bucket.
+        
+        Args:
+            capacity_per_minute: Bucket size and refill amount per minute
+        """
+        self.capacity = float(capacity_per_minute)
+        self.refill_rate = self.capacity / 60.0  # per second
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+    
+    def reserve(self, amount: float, now: float) -> float:
+        """Take tokens from the bucket, going into debt if necessary.
+        
+        Args:
+            amount: Number of tokens to take
+            now: Current monotonic time
+            
+        Returns:
+            Seconds to wait until the debt is paid back (0 if none)
+        """
+        self._refill(now)
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_rate
+    
+    def refund(self, amount: float, now: float) -> None:
+        """Return tokens to the bucket (negative amounts take more).
+        
+        Args:
+            amount: Number of tokens to return
+            now: Current monotonic time
+        """
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.updated_at = now
+
+
+class RateLimiter:
+    """Client-side limiter for Azure OpenAI requests-per-minute and tokens-per-minute quotas.
+    
+    Each request reserves one request slot and its estimated token count before
+    it is sent; callers sleep until both buckets can cover the reservation.
+    The token estimate is corrected from the reported usage afterwards.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
+    ):
+        """Initialize the rate limiter.
+        
+        Args:
+            requests_per_minute: RPM quota (None disables request limiting)
+            tokens_per_minute: TPM quota (None disables token limiting)
+        """
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any quota is being enforced."""
+        return self.request_bucket is not None or self.token_bucket is not None
+    
+    def acquire(self, estimated_tokens: int) -> float:
+        """Block until the request fits within the quotas.
+        
+        Args:
+            estimated_tokens: Estimated total tokens for the request
+            
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            logger.debug(f"Rate limiter delaying request by {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+    
+    async def aacquire(self, estimated_tokens: int) -> float:
+        """Wait without blocking the event loop until the request fits within the quotas.
+        
+        Args:
+            estimated_tokens: Estimated total tokens for the request
+            
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            logger.debug(f"Rate limiter delaying request by {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct a reservation with the token count reported by the API.
+        
+        Args:
+            estimated_tokens: Tokens reserved before sending the request
+            actual_tokens: Tokens reported in response.usage
+        """
+        if self.token_bucket is None:
+            return
+        with self._lock:
+            self.token_bucket.refund(estimated_tokens - actual_tokens, time.monotonic())
+    
+    def _reserve(self, estimated_tokens: int) -> float:
+        """Reserve capacity in both buckets and return the required wait."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            waits = [0.0]
+            if self.request_bucket is not None:
+                waits.append(self.request_bucket.reserve(1, now))
+            if self.token_bucket is not None:
+                waits.append(self.token_bucket.reserve(estimated_tokens, now))
+            return max(waits)
+
+
+async def _close_on_loop_shutdown(client: AsyncAzureOpenAI) -> AsyncIterator[None]:
+    """Close an async client once its event loop shuts down.
+    
+    The generator is started on the client's loop and stays suspended.
+    asyncio.run finalizes suspended async generators before closing the
+    loop, the last point at which the client's connections can be closed.
+    
+    Args:
+        client: Async client created on the current loop
+    """
+    try:
+        yield
+    finally:
+        await client.close()
+
+
 class AzureOpenAIClient:
     """Azure OpenAI client wrapper."""
     
-    def __init__(self):
-        """Initialize the Azure OpenAI client."""
-        # Validate configuration
-        config.azure_openai.validate()
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        """Initialize the Azure OpenAI client.
+        
+        Nothing is validated or connected here: the underlying SDK clients
+        are created on the first request that misses the cache, so a client
+        that only replays cached responses needs no credentials.
+        
+        Args:
+            cache: Persistent response cache consulted before each request
+                   (no caching if None)
+        """
+        self.cache = cache
+        
+        # Quotas are shared by every client in the process
+        self.rate_limiter = rate_limiter
+        
+        # SDK clients are created on first use, see client and async_client
+        self._client: Optional[AzureOpenAI] = None
+        self._client_lock = threading.Lock()
+        self._async_client: Optional[AsyncAzureOpenAI] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_closer: Optional[AsyncIterator[None]] = None
+    
+    @property
+    def client(self) -> AzureOpenAI:
+        """Get the sync Azure OpenAI client, creating it on first use.
+        
+        Returns:
+            AzureOpenAI client instance
+            
+        Raises:
+            ValueError: If the Azure OpenAI configuration is incomplete
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    # Validate configuration
+                    config.azure_openai.validate()
+                    
+                    # Initialize client (retries are handled by src.api.retry)
+                    self._client = AzureOpenAI(
+                        api_key=config.azure_openai.api_key,
+                        azure_endpoint=config.azure_openai.endpoint,
+                        api_version=config.azure_openai.api_version,
+                        max_retries=0
+                    )
+                    
+                    logger.info("Azure OpenAI client initialized successfully")
+                    logger.info(f"Azure OpenAI Endpoint: {config.azure_openai.endpoint}")
+                    logger.info(f"Deployment Name: {config.azure_openai.deployment_name}")
+                    logger.info(f"API Version: {config.azure_openai.api_version}")
+        return self._client
+    
+    @property
+    def async_client(self) -> AsyncAzureOpenAI:
+        """Get the async Azure OpenAI client for the running event loop.
         
-        # Initialize client
-        self.client = AzureOpenAI(
-            api_key=config.azure_openai.api_key,
-            azure_endpoint=config.azure_openai.endpoint,
-            api_version=config.azure_openai.api_version
-        )
+        All coroutines on a loop share one client and therefore one bounded
+        HTTP connection pool. httpx connections cannot outlive their event
+        loop, so a new client is created when called from a different loop,
+        and each client is closed when its loop shuts down (see
+        _close_on_loop_shutdown) unless aclose was called first.
         
-        logger.info("Azure OpenAI client initialized successfully")
-        logger.info(f"Azure OpenAI Endpoint: {config.azure_openai.endpoint}")
-        logger.info(f"Deployment Name: {config.azure_openai.deployment_name}")
-        logger.info(f"API Version: {config.azure_openai.api_version}")
+        Returns:
+            AsyncAzureOpenAI client instance
+            
+        Raises:
+            ValueError: If the Azure OpenAI configuration is incomplete
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            config.azure_openai.validate()
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections
+                )
+            )
+            self._async_client = AsyncAzureOpenAI(
+                api_key=config.azure_openai.api_key,
+                azure_endpoint=config.azure_openai.endpoint,
+                api_version=config.azure_openai.api_version,
+                http_client=http_client,
+                max_retries=0
+            )
+            self._async_loop = loop
+            # Start the closer so that the loop finalizes it on shutdown
+            self._async_closer = _close_on_loop_shutdown(self._async_client)
+            asyncio.ensure_future(self._async_closer.__anext__())
+            logger.info(
+                f"Async Azure OpenAI client initialized "
+                f"(max connections: {config.max_connections})"
+            )
+        return self._async_client
     
     def create_chat_completion(
         self,
@@ -49,33 +282,250 @@ class AzureOpenAIClient:
         Raises:
             Exception: If API call fails
         """
+        metrics = CallMetrics()
         try:
+            params = self._build_params(messages, max_tokens, temperature, json)
+            cache_key, cached_text = self._cache_lookup(params)
+            if cached_text is not None:
+                metrics.cache_hit = True
+                return cached_text
+            
             logger.info("Sending request to Azure OpenAI")
             
-            # Prepare the base parameters
-            params = {
-                "messages": messages,
-                "max_tokens": max_tokens or config.max_tokens,
-                "temperature": temperature or config.temperature,
-                "model": config.azure_openai.deployment_name
-            }
+            response = call_with_retry(self._send, params, metrics)
             
-            # Add response_format if json=True
-            if json:
-                params["response_format"] = {"type": "json_object"}
+            logger.info("Received response from Azure OpenAI")
             
-            response = self.client.chat.completions.create(**params)
+            response_text = self._extract_content(response)
+            self._cache_store(cache_key, response_text)
+            return response_text
             
-            logger.info("Received response from Azure OpenAI")
+        except Exception as e:
+            metrics.error = str(e)
+            logger.error(f"Error in Azure OpenAI API call: {e}", exc_info=True)
+            raise
+        finally:
+            record_call(metrics)
+    
+    async def acreate_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = None,
+        temperature: float = None,
+        json: bool = False
+    ) -> str:
+        """Create a chat completion without blocking the event loop.
+        
+        Async counterpart of create_chat_completion, same arguments and result.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            max_tokens: Maximum tokens for response (uses config default if None)
+            temperature: Temperature for response (uses config default if None)
+            json: Whether to request JSON response format (default: False)
+            
+        Returns:
+            Response content as string
             
-            response_text = response.choices[0].message.content.strip()
-            logger.debug(f"Raw response: {response_text}")
+        Raises:
+            Exception: If API call fails
+        """
+        metrics = CallMetrics()
+        try:
+            params = self._build_params(messages, max_tokens, temperature, json)
+            cache_key, cached_text = self._cache_lookup(params)
+            if cached_text is not None:
+                metrics.cache_hit = True
+                return cached_text
             
+            logger.info("Sending async request to Azure OpenAI")
+            
+            response = await acall_with_retry(self._asend, params, metrics)
+            
+            logger.info("Received async response from Azure OpenAI")
+            
+            response_text = self._extract_content(response)
+            self._cache_store(cache_key, response_text)
             return response_text
             
         except Exception as e:
-            logger.error(f"Error in Azure OpenAI API call: {e}", exc_info=True)
+            metrics.error = str(e)
+            logger.error(f"Error in async Azure OpenAI API call: {e}", exc_info=True)
             raise
+        finally:
+            record_call(metrics)
+    
+    async def aclose(self) -> None:
+        """Close the async client and its connection pool."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_loop = None
+            self._async_closer = None
+    
+    def _send(self, params: Dict[str, Any], metrics: Optional[CallMetrics] = None) -> Any:
+        """Send a single chat completion request within the rate limits.
+        
+        Args:
+            params: Chat completion request parameters
+            metrics: Measurements of the call, updated with this attempt
+            
+        Returns:
+            Chat completion response
+        """
+        metrics = metrics if metrics is not None else CallMetrics()
+        estimated_tokens = self._estimate_tokens(params)
+        start = time.perf_counter()
+        self.rate_limiter.acquire(estimated_tokens)
+        sent = time.perf_counter()
+        metrics.queue_wait += sent - start
+        metrics.attempts += 1
+        
+        try:
+            response = self.client.chat.completions.create(**params)
+        finally:
+            metrics.latency += time.perf_counter() - sent
+        self._record_usage(response, estimated_tokens, metrics)
+        return response
+    
+    async def _asend(self, params: Dict[str, Any], metrics: Optional[CallMetrics] = None) -> Any:
+        """Send a single async chat completion request within the rate limits.
+        
+        Args:
+            params: Chat completion request parameters
+            metrics: Measurements of the call, updated with this attempt
+            
+        Returns:
+            Chat completion response
+        """
+        metrics = metrics if metrics is not None else CallMetrics()
+        estimated_tokens = self._estimate_tokens(params)
+        start = time.perf_counter()
+        await self.rate_limiter.aacquire(estimated_tokens)
+        sent = time.perf_counter()
+        metrics.queue_wait += sent - start
+        metrics.attempts += 1
+        
+        try:
+            response = await self.async_client.chat.completions.create(**params)
+        finally:
+            metrics.latency += time.perf_counter() - sent
+        self._record_usage(response, estimated_tokens, metrics)
+        return response
+    
+    def _cache_lookup(self, params: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """Look up a request in the response cache.
+        
+        The key covers everything that determines the response: deployment,
+        messages, temperature, max_tokens and response_format.
+        
+        Args:
+            params: Chat completion request parameters
+            
+        Returns:
+            Tuple of (cache_key, cached_response), both None without a cache
+        """
+        if self.cache is None:
+            return None, None
+        
+        cache_key = ResponseCache.make_key(**params)
+        cached_text = self.cache.get(cache_key)
+        if cached_text is not None:
+            logger.info("Response served from cache")
+        return cache_key, cached_text
+    
+    def _cache_store(self, cache_key: Optional[str], response_text: str) -> None:
+        """Store a response in the cache.
+        
+        Args:
+            cache_key: Key from _cache_lookup (None without a cache)
+            response_text: Response content to store
+        """
+        if self.cache is not None and cache_key is not None and response_text:
+            self.cache.set(cache_key, response_text)
+    
+    def _build_params(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        json: bool
+    ) -> Dict[str, Any]:
+        """Build chat completion request parameters.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            max_tokens: Maximum tokens for response (uses config default if None)
+            temperature: Temperature for response (uses config default if None)
+            json: Whether to request JSON response format
+            
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        params = {
+            "messages": messages,
+            "max_tokens": max_tokens or config.max_tokens,
+            "temperature": temperature or config.temperature,
+            "model": config.azure_openai.deployment_name
+        }
+        
+        # Add response_format if json=True
+        if json:
+            params["response_format"] = {"type": "json_object"}
+        
+        return params
+    
+    def _estimate_tokens(self, params: Dict[str, Any]) -> int:
+        """Estimate the quota cost of a request.
+        
+        Azure counts max_tokens against the TPM quota up front, so the
+        estimate is the prompt size plus the completion allowance.
+        
+        Args:
+            params: Chat completion request parameters
+            
+        Returns:
+            Estimated total tokens
+        """
+        return estimate_message_tokens(params["messages"]) + params["max_tokens"]
+    
+    def _record_usage(
+        self,
+        response: Any,
+        estimated_tokens: int,
+        metrics: Optional[CallMetrics] = None
+    ) -> None:
+        """Feed the reported token usage back to the rate limiter and metrics.
+        
+        Args:
+            response: Chat completion response
+            estimated_tokens: Tokens reserved before sending the request
+            metrics: Measurements of the call, receiving the token counts
+        """
+        usage = getattr(response, 'usage', None)
+        total_tokens = getattr(usage, 'total_tokens', None)
+        if isinstance(total_tokens, int):
+            self.rate_limiter.record_usage(estimated_tokens, total_tokens)
+        if metrics is not None:
+            prompt_tokens = getattr(usage, 'prompt_tokens', None)
+            completion_tokens = getattr(usage, 'completion_tokens', None)
+            if isinstance(prompt_tokens, int):
+                metrics.prompt_tokens = prompt_tokens
+            if isinstance(completion_tokens, int):
+                metrics.completion_tokens = completion_tokens
+    
+    def _extract_content(self, response: Any) -> str:
+        """Extract the stripped message content from a completion response.
+        
+        Args:
+            response: Chat completion response
+            
+        Returns:
+            Response content as string
+        """
+        response_text = response.choices[0].message.content.strip()
+        logger.debug(f"Raw response: {response_text}")
+        return response_text
     
     def get_system_prompt(self) -> str:
         """Get the system prompt for financial QA.
@@ -108,5 +558,76 @@ Examples:
 Be precise with numbers and calculations. Pay attention to context from previous questions in multi-turn conversations."""
 
 
-# Global client instance
-azure_client = AzureOpenAIClient()
\ No newline at end of file
+# Global rate limiter shared by all clients
+rate_limiter = RateLimiter(
+    requests_per_minute=config.azure_openai.requests_per_minute,
+    tokens_per_minute=config.azure_openai.tokens_per_minute
+)
+
+# Shared client, created on first use by get_azure_client
+_azure_client: Optional[AzureOpenAIClient] = None
+_azure_client_lock = threading.Lock()
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_azure_client() -> AzureOpenAIClient:
+    """Get the shared client, creating it on first use.
+    
+    Importing this module does not create a client, so tools that never
+    call the API (--help, cache replay, rule-based judging) start without
+    credentials.
+    
+    Returns:
+        The shared AzureOpenAIClient
+    """
+    global _azure_client
+    if _azure_client is None:
+        with _azure_client_lock:
+            if _azure_client is None:
+                _azure_client = AzureOpenAIClient(cache=_response_cache)
+    return _azure_client
+
+
+def set_azure_client(client: Optional[AzureOpenAIClient]) -> None:
+    """Replace the shared client, e.g. with a stub or a differently configured one.
+    
+    Args:
+        client: Client returned by get_azure_client from now on (None
+                creates a new one on next use)
+    """
+    global _azure_client
+    with _azure_client_lock:
+        _azure_client = client
+
+
+def enable_response_cache(
+    path: Optional[str] = None,
+    max_size_bytes: Optional[int] = None
+) -> ResponseCache:
+    """Attach a persistent response cache to the shared client.
+    
+    The cache is also used by the shared client if it is created later.
+    
+    Args:
+        path: Cache database path (uses config.cache_path if None)
+        max_size_bytes: Cache size limit (uses config.cache_max_bytes if None)
+        
+    Returns:
+        The attached ResponseCache
+    """
+    global _response_cache
+    cache = ResponseCache(
+        path or config.cache_path,
+        max_size_bytes or config.cache_max_bytes
+    )
+    _response_cache = cache
+    if _azure_client is not None:
+        _azure_client.cache = cache
+    return cache
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the former azure_client global to the lazily created client."""
+    if name == 'azure_client':
+        return get_azure_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
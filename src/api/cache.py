@@ -0,0 +1,161 @@
+"""Persistent cache for chat completion responses."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """SQLite-backed content-addressed cache with size-based LRU eviction.
+
+    Values are stored under a SHA-256 hash of the request parameters. When the
+    total size of stored values exceeds max_size_bytes, the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, path: str, max_size_bytes: int):
+        """Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite database file
+            max_size_bytes: Maximum total size of cached values
+        """
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)"
+        )
+        self._total_size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+        logger.info(f"Response cache opened: {path} ({self._total_size} bytes)")
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Build a cache key from JSON-serializable request parts.
+
+        Args:
+            **parts: Request parts identifying the response
+
+        Returns:
+            Hex SHA-256 digest of the canonical JSON encoding
+        """
+        canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached value and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value, evicting least recently used entries if over budget.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        size = len(value.encode('utf-8'))
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._total_size += size - (old[0] if old else 0)
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and size_bytes
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups * 100 if lookups > 0 else 0,
+                'entries': entries,
+                'size_bytes': self._total_size
+            }
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._total_size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until within max_size_bytes."""
+        if self._total_size <= self.max_size_bytes:
+            return
+
+        evicted = 0
+        cursor = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        )
+        keys = []
+        for key, size in cursor:
+            if self._total_size <= self.max_size_bytes:
+                break
+            keys.append((key,))
+            self._total_size -= size
+            evicted += 1
+        cursor.close()
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", keys)
+        logger.debug(f"Evicted {evicted} entries from response cache")
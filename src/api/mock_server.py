@@ -0,0 +1,467 @@
+"""Local stand-in for the Azure OpenAI chat completions endpoint.
+
+Serves the wire protocol AzureOpenAIClient uses, with simulated latency and
+injected failures, so concurrency, rate limiting and retries can be load
+tested offline. Prediction requests are answered from the expected programs
+of a dataset and judge requests are answered by comparing the expected and
+predicted values in the prompt.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from src.data.reader import iter_items
+from src.evaluation.rules import SCALES, normalize_program
+from src.utils.logging_config import get_logger
+from src.utils.program_executor import try_execute_program
+from src.utils.tokens import estimate_message_tokens, estimate_tokens
+
+logger = get_logger(__name__)
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+# Answer returned for questions that are not in the dataset
+DEFAULT_CANNED_RESPONSE = {"program": "", "answer": 0}
+
+_CHAT_PATH = re.compile(r"^(?:/openai/deployments/[^/]+)?(?:/v1)?/chat/completions$")
+_CURRENT_QUESTION = re.compile(r"^CURRENT QUESTION: (.*)$", re.MULTILINE)
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_JUDGE_FIELDS = ('question_id', 'expected_answer', 'predicted_answer', 'expected_program', 'predicted_program')
+
+
+class LatencyModel:
+    """Random response latency following a configurable distribution.
+
+    mean is the typical latency in seconds: the median for lognormal, the
+    mean for the others. spread is the half-width for uniform, the standard
+    deviation for normal and sigma of the underlying normal for lognormal;
+    it is ignored by fixed and exponential.
+    """
+
+    def __init__(
+        self,
+        distribution: str = 'fixed',
+        mean: float = 0.0,
+        spread: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """Initialize the latency model.
+
+        Args:
+            distribution: One of LATENCY_DISTRIBUTIONS
+            mean: Typical latency in seconds
+            spread: Distribution width, see class docstring
+            seed: Random seed for reproducible runs
+
+        Raises:
+            ValueError: If the distribution is unknown or a parameter is negative
+        """
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution '{distribution}', expected one of {list(LATENCY_DISTRIBUTIONS)}"
+            )
+        if mean < 0 or spread < 0:
+            raise ValueError("Latency mean and spread must not be negative")
+        self.distribution = distribution
+        self.mean = mean
+        self.spread = spread
+        self._random = random.Random(seed)
+
+    def sample(self) -> float:
+        """Draw one latency in seconds (never negative)."""
+        if self.distribution == 'uniform':
+            value = self._random.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.distribution == 'normal':
+            value = self._random.gauss(self.mean, self.spread)
+        elif self.distribution == 'lognormal':
+            value = self.mean * math.exp(self._random.gauss(0, self.spread)) if self.mean else 0.0
+        elif self.distribution == 'exponential':
+            value = self._random.expovariate(1 / self.mean) if self.mean else 0.0
+        else:
+            value = self.mean
+        return max(0.0, value)
+
+
+class FaultInjector:
+    """Decides which requests fail with a throttling or server error.
+
+    Besides random failures, requests beyond max_concurrent in flight are
+    throttled, like a deployment running out of capacity.
+    """
+
+    def __init__(
+        self,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: Optional[float] = None,
+        max_concurrent: Optional[int] = None,
+        error_statuses: Tuple[int, ...] = (500, 502, 503),
+        seed: Optional[int] = None
+    ):
+        """Initialize the fault injector.
+
+        Args:
+            rate_limit_rate: Fraction of requests answered with 429
+            error_rate: Fraction of requests answered with a 5xx status
+            retry_after: Seconds sent in the Retry-After header of 429 and
+                         503 responses (no header if None)
+            max_concurrent: Requests in flight beyond this are throttled
+                            (no limit if None)
+            error_statuses: Statuses to pick from for server errors
+            seed: Random seed for reproducible runs
+
+        Raises:
+            ValueError: If a rate is outside [0, 1] or together exceeds 1
+        """
+        for name, rate in (('rate_limit_rate', rate_limit_rate), ('error_rate', error_rate)):
+            if not 0 <= rate <= 1:
+                raise ValueError(f"{name} must be between 0 and 1, got {rate}")
+        if rate_limit_rate + error_rate > 1:
+            raise ValueError("rate_limit_rate and error_rate must not exceed 1 together")
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.max_concurrent = max_concurrent
+        self.error_statuses = error_statuses
+        self._random = random.Random(seed)
+
+    def pick(self, in_flight: int) -> Optional[int]:
+        """Pick the error status for a request, or None to serve it.
+
+        Args:
+            in_flight: Requests in flight including this one
+
+        Returns:
+            HTTP status code of the injected failure, or None
+        """
+        if self.max_concurrent is not None and in_flight > self.max_concurrent:
+            return 429
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return self._random.choice(self.error_statuses)
+        return None
+
+    def headers_for(self, status: int) -> Dict[str, str]:
+        """Get the extra response headers for an injected failure."""
+        if self.retry_after is None or status not in (429, 503):
+            return {}
+        return {
+            'Retry-After': str(max(1, math.ceil(self.retry_after))),
+            'retry-after-ms': str(int(self.retry_after * 1000))
+        }
+
+
+class MockResponder:
+    """Builds chat completion contents for prediction and judge prompts.
+
+    Prediction prompts are answered with the expected program and answer of
+    the matching dataset turn. Questions like 'what was the change?' occur
+    in many conversations, so among turns with the same question the one
+    whose program constants appear in the prompt is chosen. A fraction of
+    predictions can be made deliberately wrong so evaluation has something
+    to find. Judge prompts get verdicts from comparing the expected and
+    predicted values they contain.
+    """
+
+    def __init__(
+        self,
+        answers: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        accuracy: float = 1.0,
+        canned_response: Optional[Dict[str, Any]] = None,
+        tolerance: float = 0.01,
+        seed: Optional[int] = None
+    ):
+        """Initialize the responder.
+
+        Args:
+            answers: Question text mapped to candidate turns with
+                     expected_program and expected_answer, see load_answers
+            accuracy: Fraction of known questions answered correctly
+            canned_response: Answer for unknown questions
+                             (DEFAULT_CANNED_RESPONSE if None)
+            tolerance: Relative tolerance for judging answers equal
+            seed: Random seed for reproducible runs
+        """
+        self.answers = answers or {}
+        self.accuracy = accuracy
+        self.canned_response = canned_response or DEFAULT_CANNED_RESPONSE
+        self.tolerance = tolerance
+        self._random = random.Random(seed)
+
+    def respond(self, messages: List[Dict[str, str]]) -> str:
+        """Build the response content for a chat completion request.
+
+        Args:
+            messages: Request messages
+
+        Returns:
+            JSON response content
+        """
+        prompt = messages[-1].get('content', '') if messages else ''
+        if 'Predicted Program:' in prompt:
+            return self._judge(prompt)
+        return self._predict(prompt)
+
+    def _predict(self, prompt: str) -> str:
+        """Answer a prediction prompt."""
+        match = _CURRENT_QUESTION.search(prompt)
+        candidates = self.answers.get(match.group(1).strip()) if match else None
+        if not candidates:
+            return json.dumps(self.canned_response)
+
+        turn = max(candidates, key=lambda candidate: _constants_found(candidate['expected_program'], prompt))
+        program = turn['expected_program']
+        answer = turn['expected_answer']
+        if self._random.random() >= self.accuracy:
+            # Append a step scaling the result, so program and answer agree
+            steps = program.count('(')
+            program = f"{program}, multiply(#{steps - 1}, 1.1)" if steps else f"multiply({program or 0}, 1.1)"
+            answer = answer * 1.1 if isinstance(answer, (int, float)) else 1.1
+        return json.dumps({"program": program, "answer": answer})
+
+    def _judge(self, prompt: str) -> str:
+        """Answer a single or batched judge prompt."""
+        blocks = [_parse_judge_block(block) for block in re.split(r"\n\s*\n", prompt)]
+        blocks = [block for block in blocks if 'predicted_program' in block]
+        verdicts = []
+        for block in blocks:
+            answer_correct = self._values_match(block.get('expected_answer'), block.get('predicted_answer'))
+            program_correct = self._programs_match(block.get('expected_program', ''), block.get('predicted_program', ''))
+            verdicts.append({
+                'question_id': block.get('question_id', ''),
+                'answer_correct': answer_correct,
+                'program_correct': program_correct,
+                'reasoning': "Mock judge: compared expected and predicted values"
+            })
+
+        if 'Question ID:' in prompt:
+            return json.dumps({'verdicts': verdicts})
+        verdict = verdicts[0] if verdicts else {'answer_correct': False, 'program_correct': False, 'reasoning': ''}
+        verdict.pop('question_id', None)
+        return json.dumps(verdict)
+
+    def _values_match(self, expected: Any, predicted: Any) -> bool:
+        """Compare two values allowing for decimal vs percentage scaling."""
+        try:
+            expected, predicted = float(expected), float(predicted)
+        except (TypeError, ValueError):
+            return False
+        return any(
+            math.isclose(expected * scale, predicted, rel_tol=self.tolerance, abs_tol=1e-9)
+            for scale in SCALES
+        )
+
+    def _programs_match(self, expected: str, predicted: str) -> bool:
+        """Compare two programs by text or by their results."""
+        if normalize_program(expected) == normalize_program(predicted):
+            return True
+        return self._values_match(try_execute_program(expected), try_execute_program(predicted))
+
+
+def load_answers(dataset_file: str, max_items: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Collect the expected program and answer of every turn in a dataset.
+
+    Args:
+        dataset_file: Path to a JSON or JSONL dataset
+        max_items: Read only the first max_items items (None for all)
+
+    Returns:
+        Question text mapped to the turns asking it
+    """
+    answers: Dict[str, List[Dict[str, Any]]] = {}
+    for item in iter_items(dataset_file, max_items):
+        for turn in item.get('conversation', []):
+            answers.setdefault(str(turn.get('question', '')).strip(), []).append({
+                'expected_program': turn.get('expected_program', ''),
+                'expected_answer': turn.get('expected_answer', 0)
+            })
+    logger.info(f"Loaded expected answers for {len(answers)} distinct questions from {dataset_file}")
+    return answers
+
+
+def _constants_found(program: str, prompt: str) -> int:
+    """Count the numeric constants of a program that occur in a prompt."""
+    prompt = prompt.replace(',', '')
+    return sum(1 for number in _NUMBER.findall(program) if number in prompt)
+
+
+def _parse_judge_block(block: str) -> Dict[str, str]:
+    """Read the labelled fields of one prediction in a judge prompt."""
+    fields = {}
+    for line in block.splitlines():
+        label, _, value = line.partition(':')
+        key = label.strip().lower().replace(' ', '_')
+        if key in _JUDGE_FIELDS:
+            fields[key] = value.strip()
+    return fields
+
+
+class MockServer(ThreadingHTTPServer):
+    """HTTP server answering chat completion requests.
+
+    Use as a context manager, or call start() and stop(), to serve from a
+    background thread; serve_forever() serves from the calling thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        responder: Optional[MockResponder] = None,
+        latency: Optional[LatencyModel] = None,
+        faults: Optional[FaultInjector] = None
+    ):
+        """Bind the server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            responder: Builds response contents (answers canned responses if None)
+            latency: Latency added to every response (none if None)
+            faults: Failures to inject (none if None)
+        """
+        super().__init__((host, port), MockRequestHandler)
+        self.responder = responder or MockResponder()
+        self.latency = latency or LatencyModel()
+        self.faults = faults or FaultInjector()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+        self.status_counts: Dict[int, int] = {}
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as AZURE_OPENAI_ENDPOINT."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockServer":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        logger.info(f"Mock server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get request statistics (requests, status_counts)."""
+        with self._lock:
+            return {
+                'requests': sum(self.status_counts.values()),
+                'status_counts': dict(self.status_counts)
+            }
+
+    def begin_request(self) -> int:
+        """Register a request in flight and return the number in flight."""
+        with self._lock:
+            self._in_flight += 1
+            return self._in_flight
+
+    def end_request(self, status: int) -> None:
+        """Register a finished request and its status."""
+        with self._lock:
+            self._in_flight -= 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Handles one HTTP request for MockServer."""
+
+    # Keep connections open so clients can reuse their connection pool
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle's algorithm the
+    # body would wait for the client's delayed ACK (~40 ms per request)
+    disable_nagle_algorithm = True
+    server: MockServer
+
+    def do_POST(self) -> None:
+        """Answer a chat completion request."""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        if not _CHAT_PATH.match(self.path.split('?', 1)[0]):
+            self._send_json(404, _error_body(404, f"Unknown path {self.path}"))
+            return
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            self._send_json(400, _error_body(400, "Request body is not valid JSON"))
+            return
+
+        in_flight = self.server.begin_request()
+        status = 500
+        try:
+            time.sleep(self.server.latency.sample())
+            status = self.server.faults.pick(in_flight) or 200
+            if status != 200:
+                self._send_json(status, _error_body(status, "Injected failure"), self.server.faults.headers_for(status))
+                return
+            messages = request.get('messages', [])
+            content = self.server.responder.respond(messages)
+            self._send_json(200, _completion_body(request, messages, content))
+        finally:
+            self.server.end_request(status)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        """Write a JSON response."""
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Route access logs to the debug log instead of stderr."""
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def _completion_body(request: Dict[str, Any], messages: List[Dict[str, str]], content: str) -> Dict[str, Any]:
+    """Build a chat completion response body."""
+    prompt_tokens = estimate_message_tokens(messages)
+    completion_tokens = estimate_tokens(content)
+    return {
+        'id': f"chatcmpl-mock-{uuid.uuid4().hex}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request.get('model', 'mock'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop'
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+    }
+
+
+def _error_body(status: int, message: str) -> Dict[str, Any]:
+    """Build an Azure OpenAI style error body."""
+    return {'error': {'code': str(status), 'message': message}}
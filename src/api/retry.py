@@ -0,0 +1,182 @@
+"""Retry logic for transient Azure OpenAI errors."""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from openai import APIConnectionError, APIStatusError
+from config.settings import config
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# HTTP status codes worth retrying: timeouts, throttling and server errors
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Check whether an API error is transient and worth retrying.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        True for timeouts, connection errors, 429 and 5xx responses
+    """
+    # APITimeoutError is a subclass of APIConnectionError
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in TRANSIENT_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read the server-requested retry delay from an error response.
+
+    Supports the 'retry-after-ms' header sent by Azure OpenAI and the
+    standard 'Retry-After' header in both seconds and HTTP-date form.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Delay in seconds, or None if the server did not specify one
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring unparseable Retry-After header: {retry_after}")
+        return None
+
+
+def compute_backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Compute a jittered exponential backoff delay.
+
+    Uses "full jitter": a random delay between 0 and base_delay * 2^attempt,
+    capped at max_delay, so concurrent callers do not retry in lockstep.
+
+    Args:
+        attempt: Zero-based retry number
+        base_delay: Delay for the first retry in seconds
+        max_delay: Upper bound for any delay in seconds
+
+    Returns:
+        Delay in seconds
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def get_retry_delay(error: Exception, attempt: int) -> float:
+    """Get the delay before the next retry, preferring the server's Retry-After.
+
+    The server's delay is capped at config.retry_max_delay, so a bad or
+    hostile header cannot stall a worker indefinitely.
+
+    Args:
+        error: Exception raised by the failed attempt
+        attempt: Zero-based retry number
+
+    Returns:
+        Delay in seconds
+    """
+    retry_after = get_retry_after(error)
+    if retry_after is not None:
+        return min(retry_after, config.retry_max_delay)
+    return compute_backoff(attempt, config.retry_delay, config.retry_max_delay)
+
+
+def _should_retry(error: Exception, attempt: int) -> bool:
+    """Check whether a failed attempt should be retried."""
+    return attempt < config.retry_attempts and is_transient_error(error)
+
+
+def call_with_retry(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call a function, retrying transient errors with backoff.
+
+    Args:
+        func: Function performing the API request
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Result of func
+
+    Raises:
+        Exception: The last error once retries are exhausted, or any
+                   non-transient error immediately
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if not _should_retry(e, attempt):
+                raise
+            delay = get_retry_delay(e, attempt)
+            attempt += 1
+            logger.warning(
+                f"Transient API error ({e}); retry {attempt}/{config.retry_attempts} "
+                f"in {delay:.2f}s"
+            )
+            time.sleep(delay)
+
+
+async def acall_with_retry(
+    func: Callable[..., Awaitable[T]],
+    *args: Any,
+    **kwargs: Any
+) -> T:
+    """Await a coroutine function, retrying transient errors with backoff.
+
+    Async counterpart of call_with_retry.
+
+    Args:
+        func: Coroutine function performing the API request
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Result of func
+
+    Raises:
+        Exception: The last error once retries are exhausted, or any
+                   non-transient error immediately
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            if not _should_retry(e, attempt):
+                raise
+            delay = get_retry_delay(e, attempt)
+            attempt += 1
+            logger.warning(
+                f"Transient API error ({e}); retry {attempt}/{config.retry_attempts} "
+                f"in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,213 @@
+"""Precompiled prompt corpus for prediction runs."""
+
+import json
+import mmap
+import os
+from typing import Any, Dict, Iterator, Optional
+from src.data.formatter import ConversationHistoryBuilder, format_financial_context, normalize_table
+from src.data.reader import iter_items
+from src.utils.logging_config import get_logger
+from src.utils.validation import validate_data_structure
+from config.settings import config
+
+logger = get_logger(__name__)
+
+# Bump whenever the stored prompt parts change so old corpora are rebuilt
+CORPUS_VERSION = 1
+
+
+def build_corpus(
+    input_file: str,
+    corpus_file: str,
+    max_items: Optional[int] = None
+) -> Dict[str, Any]:
+    """Compile a dataset into a prompt-ready corpus.
+
+    Each item becomes one JSON line holding its formatted financial context,
+    its normalized table and the conversation history prefix for every turn,
+    i.e. exactly the prompt parts PredictionGenerator would otherwise build
+    on each request, with tables in config.table_format. A separate index
+    maps item ids to byte ranges so PromptCorpus can fetch any item without
+    scanning the file.
+
+    Args:
+        input_file: Path to input JSON or JSONL dataset
+        corpus_file: Path of the corpus to write
+        max_items: Compile only the first max_items items (None for all)
+
+    Returns:
+        Dictionary with build statistics (items, turns, size_bytes)
+    """
+    logger.info(f"Compiling prompt corpus from {input_file} into {corpus_file}")
+    corpus_dir = os.path.dirname(corpus_file)
+    if corpus_dir:
+        os.makedirs(corpus_dir, exist_ok=True)
+
+    offsets = {}
+    turns = 0
+    tmp_file = f"{corpus_file}.tmp"
+    with open(tmp_file, 'wb') as f:
+        for item in iter_items(input_file, max_items, validator=validate_data_structure):
+            entry = compile_item(item)
+            if entry['id'] in offsets:
+                logger.warning(f"Duplicate item id {entry['id']}; keeping the last occurrence")
+            line = json.dumps(entry, ensure_ascii=False).encode('utf-8') + b"\n"
+            offsets[entry['id']] = [f.tell(), len(line)]
+            f.write(line)
+            turns += entry['turns']
+    os.replace(tmp_file, corpus_file)
+
+    index = {
+        'version': CORPUS_VERSION,
+        'table_format': config.table_format,
+        'source': _source_signature(input_file),
+        'items': offsets
+    }
+    with open(PromptCorpus.index_path_for(corpus_file), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+
+    stats = {
+        'items': len(offsets),
+        'turns': turns,
+        'size_bytes': os.path.getsize(corpus_file)
+    }
+    logger.info(f"Compiled prompt corpus: {stats}")
+    return stats
+
+
+def compile_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the corpus entry for a dataset item.
+
+    Args:
+        item: Dataset item with id, financial_report and conversation
+
+    Returns:
+        Dictionary with id, turns, context, table and history, where
+        history[i] is the formatted history seen by turn i
+    """
+    financial_report = item['financial_report']
+    conversation = item['conversation']
+
+    history = ConversationHistoryBuilder()
+    prefixes = []
+    for turn in conversation:
+        prefixes.append(history.text)
+        history.append(turn)
+
+    return {
+        'id': item['id'],
+        'turns': len(conversation),
+        'context': format_financial_context(financial_report),
+        'table': normalize_table(financial_report.get('table', [])),
+        'history': prefixes
+    }
+
+
+class PromptCorpus:
+    """Read-only, memory-mapped view of a compiled prompt corpus.
+
+    Only the index is loaded into memory; entries are decoded on demand from
+    the mapped file, so lookups are random access by item id and the pages
+    are shared by every worker reading the same corpus.
+    """
+
+    def __init__(self, corpus_file: str):
+        """Open a corpus written by build_corpus.
+
+        Args:
+            corpus_file: Path to the corpus file
+
+        Raises:
+            FileNotFoundError: If the corpus or its index doesn't exist
+            ValueError: If the corpus was built by an incompatible version
+        """
+        with open(self.index_path_for(corpus_file), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != CORPUS_VERSION:
+            raise ValueError(
+                f"Corpus {corpus_file} has version {index.get('version')}, "
+                f"expected {CORPUS_VERSION}; rebuild it with build_corpus.py"
+            )
+
+        self.path = corpus_file
+        self.source = index.get('source', {})
+        self.table_format = index.get('table_format', 'json')
+        self._offsets = index['items']
+        self._file = open(corpus_file, 'rb')
+        # mmap cannot map an empty file
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._offsets else None
+        logger.info(f"Loaded prompt corpus {corpus_file} with {len(self._offsets)} items")
+
+    @staticmethod
+    def index_path_for(corpus_file: str) -> str:
+        """Get the index path belonging to a corpus file.
+
+        Args:
+            corpus_file: Path to the corpus file
+
+        Returns:
+            Index file path
+        """
+        return f"{corpus_file}.index.json"
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Look up the compiled entry for an item.
+
+        Args:
+            item_id: Dataset item id
+
+        Returns:
+            Entry as produced by compile_item, or None if the item is not in
+            the corpus
+        """
+        location = self._offsets.get(item_id)
+        if location is None:
+            return None
+        offset, length = location
+        return json.loads(self._map[offset:offset + length])
+
+    def matches_source(self, input_file: str) -> bool:
+        """Check whether the corpus was built from the current input file.
+
+        Args:
+            input_file: Path to the dataset about to be processed
+
+        Returns:
+            True if the file size and modification time are unchanged
+        """
+        try:
+            return _source_signature(input_file) == self.source
+        except OSError:
+            return False
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __enter__(self) -> "PromptCorpus":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap and close the corpus file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def _source_signature(input_file: str) -> Dict[str, Any]:
+    """Identify an input file by size and modification time."""
+    stat = os.stat(input_file)
+    return {
+        'path': os.path.abspath(input_file),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime
+    }
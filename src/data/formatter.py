@@ -1,11 +1,20 @@
 """Data formatting utilities for financial reports."""
 
+import csv
+import hashlib
+import io
 import json
-from typing import List, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Dict, Any, Optional
 from src.utils.logging_config import get_logger
+from config.settings import config
 
 logger = get_logger(__name__)
 
+# First line of a non-empty conversation history
+HISTORY_HEADER = "\nPREVIOUS CONVERSATION:\n"
+
 
 def format_table_as_json_objects(table: List[List]) -> str:
     """Convert table to JSON array of objects - most readable for AI.
@@ -19,49 +28,146 @@ def format_table_as_json_objects(table: List[List]) -> str:
     if not table or len(table) < 2:
         return ""
     
+    return json.dumps(normalize_table(table), indent=2)
+
+
+def format_table_as_compact_json(table: List[List]) -> str:
+    """Convert table to a JSON array of objects without whitespace.
+    
+    Args:
+        table: 2D list where first row contains headers
+        
+    Returns:
+        Single-line JSON string representation of the table
+    """
+    if not table or len(table) < 2:
+        return ""
+    
+    return json.dumps(normalize_table(table), separators=(',', ':'), ensure_ascii=False)
+
+
+def format_table_as_markdown(table: List[List]) -> str:
+    """Convert table to a markdown grid with the headers stated once.
+    
+    Args:
+        table: 2D list where first row contains headers
+        
+    Returns:
+        Markdown table string
+    """
+    if not table or len(table) < 2:
+        return ""
+    
+    def cell(value: Any) -> str:
+        return str(value).replace('|', '\\|').replace('\n', ' ')
+    
     headers = table[0]
-    rows = table[1:]
-    
-    # Convert to array of objects
-    json_data = []
-    for row in rows:
-        row_obj = {}
-        for i, header in enumerate(headers):
-            value = row[i] if i < len(row) else ""
-            
-            # Try to convert numbers
-            if isinstance(value, str) and value.strip():
-                clean_val = value.replace(',', '').replace('$', '').strip()
-                
-                # Handle negative numbers in parentheses
-                if '(' in value and ')' in value:
-                    clean_val = clean_val.replace('(', '').replace(')', '')
-                    if clean_val.replace('.', '').replace('-', '').isdigit():
-                        try:
-                            value = -float(clean_val) if '.' in clean_val else -int(clean_val)
-                        except:
-                            pass
-                elif clean_val.replace('.', '').replace('-', '').isdigit():
-                    try:
-                        value = float(clean_val) if '.' in clean_val else int(clean_val)
-                    except:
-                        pass  # Keep as string if conversion fails
-            
-            row_obj[header] = value
-        json_data.append(row_obj)
+    lines = [
+        "| " + " | ".join(cell(header) for header in headers) + " |",
+        "|" + "---|" * len(headers)
+    ]
+    for row in _parse_rows(table):
+        lines.append("| " + " | ".join(cell(value) for value in row) + " |")
+    return "\n".join(lines)
+
+
+def format_table_as_csv(table: List[List]) -> str:
+    """Convert table to CSV with a single header line.
+    
+    Args:
+        table: 2D list where first row contains headers
+        
+    Returns:
+        CSV string representation of the table
+    """
+    if not table or len(table) < 2:
+        return ""
+    
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(table[0])
+    writer.writerows(_parse_rows(table))
+    return output.getvalue().rstrip("\n")
+
+
+# Table serializers selectable through config.table_format, with the label
+# used for the table section of the context
+TABLE_FORMATS = {
+    'json': (format_table_as_json_objects, "JSON"),
+    'compact_json': (format_table_as_compact_json, "JSON"),
+    'markdown': (format_table_as_markdown, "Markdown"),
+    'csv': (format_table_as_csv, "CSV")
+}
+
+
+def normalize_table(table: List[List]) -> List[Dict[str, Any]]:
+    """Convert table rows to objects keyed by header, with numbers parsed.
+    
+    Args:
+        table: 2D list where first row contains headers
+        
+    Returns:
+        List with one dictionary per data row (empty if there are no data rows)
+    """
+    if not table or len(table) < 2:
+        return []
     
-    return json.dumps(json_data, indent=2)
+    headers = table[0]
+    return [dict(zip(headers, row)) for row in _parse_rows(table)]
+
+
+def _parse_rows(table: List[List]) -> List[List[Any]]:
+    """Parse the data rows of a table, padding short rows to the header width."""
+    width = len(table[0])
+    return [
+        [_parse_cell(row[i] if i < len(row) else "") for i in range(width)]
+        for row in table[1:]
+    ]
 
 
-def format_financial_context(financial_report: Dict[str, Any]) -> str:
-    """Format the financial report data into a readable context with JSON tables.
+def _parse_cell(value: Any) -> Any:
+    """Convert a table cell like '$1,200' or '(300)' to a number if possible."""
+    if isinstance(value, str) and value.strip():
+        clean_val = value.replace(',', '').replace('$', '').strip()
+        
+        # Handle negative numbers in parentheses
+        if '(' in value and ')' in value:
+            clean_val = clean_val.replace('(', '').replace(')', '')
+            if clean_val.replace('.', '').replace('-', '').isdigit():
+                try:
+                    value = -float(clean_val) if '.' in clean_val else -int(clean_val)
+                except:
+                    pass
+        elif clean_val.replace('.', '').replace('-', '').isdigit():
+            try:
+                value = float(clean_val) if '.' in clean_val else int(clean_val)
+            except:
+                pass  # Keep as string if conversion fails
+    
+    return value
+
+
+def format_financial_context(
+    financial_report: Dict[str, Any],
+    table_format: Optional[str] = None
+) -> str:
+    """Format the financial report data into a readable context with tables.
     
     Args:
         financial_report: Dictionary containing financial report data
+        table_format: One of TABLE_FORMATS (uses config.table_format if None)
         
     Returns:
         Formatted context string
+        
+    Raises:
+        ValueError: If table_format is unknown
     """
+    table_format = table_format or config.table_format
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f"Unknown table format '{table_format}', expected one of {list(TABLE_FORMATS)}")
+    serializer, label = TABLE_FORMATS[table_format]
+    
     logger.debug("Formatting financial context")
     
     context = "FINANCIAL REPORT CONTEXT:\n\n"
@@ -74,13 +180,15 @@ def format_financial_context(financial_report: Dict[str, Any]) -> str:
             context += f"- {text}\n"
         context += "\n"
     
-    # Add table data as JSON
+    # Add table data; a table without data rows (e.g. only the header
+    # left after retrieval) serializes to nothing and gets no section
     if 'table' in financial_report and financial_report['table']:
         table = financial_report['table']
-        logger.debug(f"Converting table with {len(table)} rows to JSON")
-        context += "Financial Data (JSON):\n"
-        json_table = format_table_as_json_objects(table)
-        context += json_table + "\n\n"
+        logger.debug(f"Converting table with {len(table)} rows to {table_format}")
+        table_text = serializer(table)
+        if table_text:
+            context += f"Financial Data ({label}):\n"
+            context += table_text + "\n\n"
     
     # Add post-text
     if 'post_text' in financial_report:
@@ -105,10 +213,148 @@ def format_conversation_history(conversation_history: List[Dict]) -> str:
     if not conversation_history:
         return ""
     
-    history_text = "\nPREVIOUS CONVERSATION:\n"
-    for i, qa in enumerate(conversation_history):
-        history_text += f"Q{i+1}: {qa['question']}\n"
-        history_text += f"Program: {qa.get('expected_program', 'N/A')}\n"
-        history_text += f"Answer: {qa.get('expected_answer', 'N/A')}\n\n"
+    return HISTORY_HEADER + "".join(
+        _format_history_turn(i, qa) for i, qa in enumerate(conversation_history)
+    )
+
+
+def _format_history_turn(turn_idx: int, qa: Dict) -> str:
+    """Format one previous turn of the conversation history."""
+    return (
+        f"Q{turn_idx+1}: {qa['question']}\n"
+        f"Program: {qa.get('expected_program', 'N/A')}\n"
+        f"Answer: {qa.get('expected_answer', 'N/A')}\n\n"
+    )
+
+
+class ConversationHistoryBuilder:
+    """Builds the conversation history text one turn at a time.
+    
+    format_conversation_history formats every previous turn again for each
+    new question. The builder formats each turn once when it is appended
+    and keeps the text so far, so a turn only pays for itself. The text
+    always equals format_conversation_history of the appended turns.
+    """
+    
+    def __init__(self):
+        """Initialize an empty history."""
+        self.turns: List[Dict] = []
+        self._text = ""
+    
+    def append(self, turn: Dict) -> None:
+        """Add a completed turn to the history.
+        
+        Args:
+            turn: Conversation turn with question and, optionally,
+                  expected_program and expected_answer
+        """
+        if not self.turns:
+            self._text = HISTORY_HEADER
+        self._text += _format_history_turn(len(self.turns), turn)
+        self.turns.append(turn)
+    
+    @property
+    def text(self) -> str:
+        """Formatted history of the appended turns ("" if there are none)."""
+        return self._text
+    
+    def __len__(self) -> int:
+        return len(self.turns)
+
+
+class ContextCache:
+    """Bounded LRU cache of formatted financial contexts, one per report.
+    
+    Entries are keyed by the id of the item the report belongs to and
+    config.table_format. Other per-report values, such as retrieval
+    indexes, can be cached by passing their builder as the formatter.
+    Thread-safe.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None):
+        """Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of contexts kept (uses
+                      config.context_cache_size if None, 0 disables caching)
+        """
+        self.max_size = config.context_cache_size if max_size is None else max_size
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(report_id: str, table_format: Optional[str] = None) -> str:
+        """Build the cache key for the report of an item.
+        
+        Args:
+            report_id: Id of the item the report belongs to
+            table_format: Table format of the context (uses config.table_format if None)
+            
+        Returns:
+            Cache key
+        """
+        return f"{table_format or config.table_format}:{report_id}"
+    
+    @staticmethod
+    def content_id(financial_report: Dict[str, Any]) -> str:
+        """Identify a report by its content, for reports without an item id."""
+        canonical = json.dumps(financial_report, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+    
+    def get(
+        self,
+        financial_report: Dict[str, Any],
+        formatter: Callable[[Dict[str, Any]], Any] = format_financial_context,
+        report_id: Optional[str] = None
+    ) -> Any:
+        """Get the formatted context for a report, building it on a miss.
+        
+        Args:
+            financial_report: Dictionary containing financial report data
+            formatter: Function that builds the context from the report
+            report_id: Id of the item the report belongs to (the report is
+                       hashed with content_id if None, which is much slower)
+            
+        Returns:
+            Formatted context string
+        """
+        if self.max_size <= 0:
+            return formatter(financial_report)
+        
+        key = self.make_key(report_id if report_id is not None else self.content_id(financial_report))
+        with self._lock:
+            context = self._entries.get(key)
+            if context is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return context
+            self.misses += 1
+        
+        # Built outside the lock; concurrent misses for one report just race
+        context = formatter(financial_report)
+        with self._lock:
+            self._entries[key] = context
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return context
+    
+    def clear(self) -> None:
+        """Remove all cached contexts and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
     
-    return history_text
\ No newline at end of file
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics (hits, misses, hit_rate, entries)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries)
+            }
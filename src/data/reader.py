@@ -0,0 +1,165 @@
+"""Incremental readers for dataset files."""
+
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Characters read from disk per chunk when scanning a JSON array
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = ' \t\n\r'
+
+_END_OF_INPUT = "Unexpected end of input in JSON array"
+
+
+def iter_items(
+    input_file: str,
+    max_items: Optional[int] = None,
+    validator: Optional[Callable[[Dict, int], List[str]]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Lazily yield dataset items from a JSON array or JSON Lines file.
+
+    Only as much of the file as needed is read, so asking for the first few
+    items of a large dataset returns immediately. Files ending in '.jsonl'
+    are read line by line; anything else must contain a JSON array.
+
+    Args:
+        input_file: Path to input file
+        max_items: Stop after this many items (None for all)
+        validator: Function returning the structural errors of an item,
+                   applied to each item as it is read (e.g.
+                   src.utils.validation.validate_data_structure)
+
+    Yields:
+        Dataset items in file order
+
+    Raises:
+        FileNotFoundError: If input file doesn't exist
+        json.JSONDecodeError: If input file is not valid JSON
+        ValueError: If the file is not a JSON array or an item is malformed
+    """
+    if max_items is not None and max_items <= 0:
+        max_items = None
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        if input_file.endswith('.jsonl'):
+            items = _iter_jsonl(f)
+        else:
+            items = _iter_json_array(f)
+
+        for item_idx, item in enumerate(items):
+            if validator is not None:
+                _validate_item(item, item_idx, validator)
+            yield item
+            # Stop before the next item is parsed
+            if max_items is not None and item_idx + 1 >= max_items:
+                break
+
+
+def _validate_item(
+    item: Any,
+    item_idx: int,
+    validator: Callable[[Dict, int], List[str]]
+) -> None:
+    """Raise ValueError if a dataset item is malformed."""
+    if not isinstance(item, dict):
+        raise ValueError(f"Item {item_idx}: Must be a dictionary")
+    errors = validator(item, item_idx)
+    if errors:
+        raise ValueError("; ".join(errors))
+
+
+def _iter_jsonl(f: TextIO) -> Iterator[Any]:
+    """Yield one decoded value per non-empty line."""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_json_array(f: TextIO) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array, reading in chunks.
+
+    Each element is decoded with JSONDecoder.raw_decode as soon as it and
+    the delimiter after it are buffered. Otherwise the decode is retried
+    once more text has been read. Like json.loads, a trailing comma is
+    rejected; a file that ends inside the array is reported as an
+    unexpected end of input.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(CHUNK_SIZE)
+    eof = not buffer
+    pos = _skip_whitespace(buffer, 0)
+
+    if buffer[pos:pos + 1] != '[':
+        # Not an array: parse the whole document to report the usual errors
+        data = json.loads(buffer + f.read())
+        if not isinstance(data, list):
+            raise ValueError("Input file must contain a JSON array")
+        yield from data
+        return
+    pos += 1
+    expect_value = True
+    after_comma = False
+
+    while True:
+        pos = _skip_whitespace(buffer, pos)
+        if pos >= len(buffer):
+            if eof:
+                raise json.JSONDecodeError(_END_OF_INPUT, buffer, pos)
+            buffer, pos, eof = _read_more(f, buffer, pos)
+            continue
+
+        char = buffer[pos]
+        if char == ']':
+            if after_comma:
+                raise json.JSONDecodeError("Expecting value after ','", buffer, pos)
+            return
+        if char == ',' and not expect_value:
+            pos += 1
+            expect_value = True
+            after_comma = True
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                if e.pos >= len(buffer):
+                    raise json.JSONDecodeError(_END_OF_INPUT, buffer, e.pos) from e
+                raise
+            buffer, pos, eof = _read_more(f, buffer, pos)
+            continue
+
+        # Only accept the value once the following delimiter is buffered;
+        # otherwise a number such as "6.5" split as "6." would end early
+        next_pos = _skip_whitespace(buffer, end)
+        if next_pos >= len(buffer) or buffer[next_pos] not in ',]':
+            if eof:
+                message = _END_OF_INPUT if next_pos >= len(buffer) else "Expecting ',' delimiter"
+                raise json.JSONDecodeError(message, buffer, next_pos)
+            buffer, pos, eof = _read_more(f, buffer, pos)
+            continue
+
+        yield value
+        pos = next_pos
+        expect_value = False
+        after_comma = False
+
+
+def _read_more(f: TextIO, buffer: str, pos: int) -> tuple:
+    """Drop consumed text and append the next chunk.
+
+    Returns:
+        Tuple of (buffer, pos, eof)
+    """
+    chunk = f.read(CHUNK_SIZE)
+    return buffer[pos:] + chunk, 0, not chunk
+
+
+def _skip_whitespace(buffer: str, pos: int) -> int:
+    """Return the index of the next non-whitespace character."""
+    while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+        pos += 1
+    return pos
@@ -0,0 +1,194 @@
+"""Lexical retrieval for pruning financial report context."""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.logging_config import get_logger
+from src.utils.tokens import estimate_tokens
+from config.settings import config
+
+logger = get_logger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+
+# Question words that carry no information about which snippet is relevant
+STOPWORDS = frozenset("""
+a an and are as at be by did do does for from had has have how in is it its
+of on or the that this those to was were what when which who will with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word and number terms, without stopwords.
+
+    Thousands separators are removed so '1,200' in the text matches '1200'
+    in a question.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of terms
+    """
+    text = re.sub(r"(?<=\d),(?=\d{3})", "", str(text).lower())
+    return [term for term in _TOKEN_PATTERN.findall(text) if term not in STOPWORDS]
+
+
+class ReportIndex:
+    """BM25 index over the sentences and table rows of one financial report.
+
+    Each pre_text and post_text entry and each table data row is a snippet.
+    Table rows are indexed together with the header row, so a question about
+    a year column still finds the rows of that table. The index is built once
+    per report and reused for every question about it.
+    """
+
+    def __init__(self, financial_report: Dict[str, Any]):
+        """Build the index.
+
+        Args:
+            financial_report: Dictionary containing financial report data
+        """
+        self.report = financial_report
+        table = financial_report.get('table') or []
+        header = table[0] if table else []
+
+        # (section, position, text) for every snippet
+        self.snippets: List[Tuple[str, int, str]] = []
+        for position, text in enumerate(financial_report.get('pre_text') or []):
+            self.snippets.append(('pre_text', position, str(text)))
+        for position, row in enumerate(table[1:], 1):
+            text = " ".join(str(cell) for cell in list(header) + list(row))
+            self.snippets.append(('table', position, text))
+        for position, text in enumerate(financial_report.get('post_text') or []):
+            self.snippets.append(('post_text', position, str(text)))
+
+        self._term_counts = [Counter(tokenize(text)) for _, _, text in self.snippets]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        self._tokens = [estimate_tokens(text) for _, _, text in self.snippets]
+
+        document_frequency = Counter()
+        for counts in self._term_counts:
+            document_frequency.update(counts.keys())
+        num_snippets = len(self.snippets)
+        self._idf = {
+            term: math.log(1 + (num_snippets - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def score(self, query: str) -> List[float]:
+        """Score every snippet against a query with BM25.
+
+        Args:
+            query: Question text
+
+        Returns:
+            BM25 score for each snippet, in snippet order
+        """
+        terms = set(tokenize(query))
+        scores = []
+        for counts, length in zip(self._term_counts, self._lengths):
+            score = 0.0
+            for term in terms:
+                frequency = counts.get(term)
+                if not frequency:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self._avg_length)
+                score += self._idf[term] * frequency * (BM25_K1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+    def prune(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        token_budget: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Reduce the report to the snippets most relevant to a query.
+
+        Snippets are taken in order of decreasing score, at most top_k of
+        them, while their estimated tokens fit the budget; the best snippet
+        is kept even if it alone exceeds the budget. The selected snippets
+        keep their original order and the table keeps its header. Reports
+        that already fit, and queries that match nothing, are returned
+        unchanged.
+
+        Args:
+            query: Current question plus conversation history
+            top_k: Maximum number of snippets (uses config.retrieval_top_k if None)
+            token_budget: Maximum estimated tokens of the selected snippets
+                          (uses config.retrieval_token_budget if None)
+
+        Returns:
+            Financial report with the same keys holding only selected snippets
+        """
+        top_k = top_k or config.retrieval_top_k
+        token_budget = token_budget or config.retrieval_token_budget
+
+        if len(self.snippets) <= top_k and sum(self._tokens) <= token_budget:
+            return self.report
+
+        scores = self.score(query)
+        ranked = sorted(
+            (idx for idx, score in enumerate(scores) if score > 0),
+            key=lambda idx: -scores[idx]
+        )
+        if not ranked:
+            logger.debug("No snippet matches the question; keeping the full report")
+            return self.report
+
+        selected = set()
+        used_tokens = 0
+        for idx in ranked:
+            if len(selected) >= top_k:
+                break
+            if used_tokens + self._tokens[idx] > token_budget and selected:
+                continue
+            selected.add(idx)
+            used_tokens += self._tokens[idx]
+
+        logger.debug(
+            f"Selected {len(selected)}/{len(self.snippets)} snippets "
+            f"(~{used_tokens} of {sum(self._tokens)} tokens)"
+        )
+        return self._subset(selected)
+
+    def _subset(self, selected: set) -> Dict[str, Any]:
+        """Build a report containing only the selected snippets."""
+        kept = {'pre_text': [], 'table': [], 'post_text': []}
+        for idx in sorted(selected):
+            section, position, _ = self.snippets[idx]
+            kept[section].append(position)
+
+        pruned = dict(self.report)
+        if 'pre_text' in self.report:
+            pruned['pre_text'] = [self.report['pre_text'][p] for p in kept['pre_text']]
+        if 'post_text' in self.report:
+            pruned['post_text'] = [self.report['post_text'][p] for p in kept['post_text']]
+        if self.report.get('table'):
+            table = self.report['table']
+            pruned['table'] = [table[0]] + [table[p] for p in kept['table']]
+        return pruned
+
+
+def build_query(current_question: str, conversation_history: List[Dict]) -> str:
+    """Combine the current question with earlier questions of the conversation.
+
+    Follow-up questions like 'and in 2008?' only make sense together with
+    the questions before them.
+
+    Args:
+        current_question: Current question
+        conversation_history: Previous conversation turns
+
+    Returns:
+        Query text for ReportIndex.prune
+    """
+    previous = [turn.get('question', '') for turn in conversation_history or []]
+    return " ".join(previous + [current_question])
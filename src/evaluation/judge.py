@@ -2,22 +2,51 @@
 """LLM-based evaluation judge."""
 
 import json
-from typing import Dict, Any
-from src.api.azure_client import azure_client
+from typing import Dict, Any, List, Optional, Tuple
+from src.api.azure_client import AzureOpenAIClient, get_azure_client
 from src.evaluation.models import EvaluationResult
 from src.evaluation.prompts import EvaluationPrompts
+from src.evaluation.verdict_cache import VerdictCache
 from src.utils.logging_config import get_logger
+from src.utils.metrics import CallMetrics, record_call
+from config.settings import config
 
 logger = get_logger(__name__)
 
+# Response tokens reserved per turn in a batched judge request
+BATCH_TOKENS_PER_TURN = 200
+
 
 class LLMJudge:
     """LLM-based evaluation of financial calculation predictions."""
     
-    def __init__(self):
-        """Initialize the LLM judge."""
-        self.client = azure_client
+    def __init__(
+        self,
+        verdict_cache: Optional[VerdictCache] = None,
+        client: Optional[AzureOpenAIClient] = None
+    ):
+        """Initialize the LLM judge.
+        
+        Args:
+            verdict_cache: Cache of previous verdicts; turns found in it are
+                           not sent to the LLM again
+            client: API client (uses the shared client from get_azure_client,
+                    created on first use, if None)
+        """
+        self._client = client
         self.prompts = EvaluationPrompts()
+        self.verdict_cache = verdict_cache
+    
+    @property
+    def client(self) -> AzureOpenAIClient:
+        """API client used for judge requests."""
+        if self._client is None:
+            self._client = get_azure_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client: AzureOpenAIClient) -> None:
+        self._client = client
     
     def evaluate_prediction(
         self, 
@@ -26,25 +55,11 @@ class LLMJudge:
     ) -> EvaluationResult:
         """Evaluate a single prediction using the LLM judge."""
         try:
-            # Extract conversation data
-            conv_item = item['conversation'][conversation_idx]
-            question = conv_item['question']
-            expected_answer = float(conv_item['expected_answer'])
-            predicted_answer = float(conv_item['predicted_answer'])
-            expected_program = conv_item.get('expected_program', '')
-            predicted_program = conv_item.get('predicted_program', '')
+            turn, messages = self._build_messages(item, conversation_idx)
             
-            # Create evaluation prompt
-            prompt = self.prompts.create_evaluation_prompt(
-                question, expected_answer, predicted_answer, 
-                expected_program, predicted_program
-            )
-            
-            # Get LLM evaluation
-            messages = [
-                {"role": "system", "content": self.prompts.get_system_prompt()},
-                {"role": "user", "content": prompt}
-            ]
+            cached = self._cached_verdict(turn)
+            if cached is not None:
+                return self._build_result(item, conversation_idx, turn, cached)
             
             eval_data = self.client.create_chat_completion(
                 messages, 
@@ -52,26 +67,287 @@ class LLMJudge:
                 json=True,
             )
             
-            # Handle string response if needed
-            if isinstance(eval_data, str):
-                eval_data = json.loads(eval_data)
+            eval_data = self._parse_verdict(eval_data)
+            result = self._build_result(item, conversation_idx, turn, eval_data)
+            self._store_verdict(turn, eval_data)
+            return result
+                
+        except Exception as e:
+            logger.error(f"Error evaluating prediction: {e}")
+            return self._create_error_result(item, conversation_idx, str(e))
+    
+    async def aevaluate_prediction(
+        self, 
+        item: Dict[str, Any], 
+        conversation_idx: int
+    ) -> EvaluationResult:
+        """Evaluate a single prediction without blocking the event loop."""
+        try:
+            turn, messages = self._build_messages(item, conversation_idx)
+            
+            cached = self._cached_verdict(turn)
+            if cached is not None:
+                return self._build_result(item, conversation_idx, turn, cached)
             
-            return EvaluationResult(
-                question_id=f"{item['id']}-{conversation_idx}",
-                question=question,
-                expected_answer=expected_answer,
-                predicted_answer=predicted_answer,
-                expected_program=expected_program,
-                predicted_program=predicted_program,
-                answer_correct=eval_data.get('answer_correct', False),
-                program_correct=eval_data.get('program_correct', False),
-                reasoning=eval_data.get('reasoning', '')
+            eval_data = await self.client.acreate_chat_completion(
+                messages, 
+                temperature=0.1, 
+                json=True,
             )
+            
+            eval_data = self._parse_verdict(eval_data)
+            result = self._build_result(item, conversation_idx, turn, eval_data)
+            self._store_verdict(turn, eval_data)
+            return result
                 
         except Exception as e:
             logger.error(f"Error evaluating prediction: {e}")
             return self._create_error_result(item, conversation_idx, str(e))
     
+    def evaluate_batch(
+        self, 
+        turns: List[Tuple[Dict[str, Any], int]]
+    ) -> List[EvaluationResult]:
+        """Evaluate several predictions with a single LLM call.
+        
+        Turns without a valid verdict in the batch response (or all turns,
+        if the batch call fails) are judged one at a time instead.
+        
+        Args:
+            turns: List of (item, conversation_idx) pairs
+            
+        Returns:
+            EvaluationResults in the same order as turns
+        """
+        turn_data = self._extract_batch_turns(turns)
+        verdicts = self._cached_batch_verdicts(turn_data)
+        uncached = {p: turn for p, turn in turn_data.items() if p not in verdicts}
+        if uncached:
+            try:
+                messages, max_tokens = self._build_batch_messages(list(uncached.values()))
+                eval_data = self.client.create_chat_completion(
+                    messages, 
+                    max_tokens=max_tokens, 
+                    temperature=0.1, 
+                    json=True,
+                )
+                new_verdicts = self._parse_batch_verdicts(eval_data, uncached)
+                for position, verdict in new_verdicts.items():
+                    self._store_verdict(uncached[position], verdict)
+                verdicts.update(new_verdicts)
+            except Exception as e:
+                logger.error(f"Error evaluating batch of {len(turns)} predictions: {e}")
+        
+        results = []
+        for position, (item, conversation_idx) in enumerate(turns):
+            if position in verdicts:
+                results.append(self._build_result(
+                    item, conversation_idx, turn_data[position], verdicts[position]
+                ))
+            else:
+                results.append(self.evaluate_prediction(item, conversation_idx))
+        return results
+    
+    async def aevaluate_batch(
+        self, 
+        turns: List[Tuple[Dict[str, Any], int]]
+    ) -> List[EvaluationResult]:
+        """Evaluate several predictions with a single non-blocking LLM call."""
+        turn_data = self._extract_batch_turns(turns)
+        verdicts = self._cached_batch_verdicts(turn_data)
+        uncached = {p: turn for p, turn in turn_data.items() if p not in verdicts}
+        if uncached:
+            try:
+                messages, max_tokens = self._build_batch_messages(list(uncached.values()))
+                eval_data = await self.client.acreate_chat_completion(
+                    messages, 
+                    max_tokens=max_tokens, 
+                    temperature=0.1, 
+                    json=True,
+                )
+                new_verdicts = self._parse_batch_verdicts(eval_data, uncached)
+                for position, verdict in new_verdicts.items():
+                    self._store_verdict(uncached[position], verdict)
+                verdicts.update(new_verdicts)
+            except Exception as e:
+                logger.error(f"Error evaluating batch of {len(turns)} predictions: {e}")
+        
+        results = []
+        for position, (item, conversation_idx) in enumerate(turns):
+            if position in verdicts:
+                results.append(self._build_result(
+                    item, conversation_idx, turn_data[position], verdicts[position]
+                ))
+            else:
+                results.append(await self.aevaluate_prediction(item, conversation_idx))
+        return results
+    
+    async def aclose(self) -> None:
+        """Release the async connections opened by aevaluate_prediction."""
+        if self._client is not None:
+            await self._client.aclose()
+    
+    def _build_messages(
+        self, 
+        item: Dict[str, Any], 
+        conversation_idx: int
+    ) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
+        """Extract turn data and build the judge messages for it."""
+        turn = self._extract_turn(item, conversation_idx)
+        
+        # Create evaluation prompt
+        prompt = self.prompts.create_evaluation_prompt(
+            turn['question'], turn['expected_answer'], turn['predicted_answer'], 
+            turn['expected_program'], turn['predicted_program']
+        )
+        
+        messages = [
+            {"role": "system", "content": self.prompts.get_system_prompt()},
+            {"role": "user", "content": prompt}
+        ]
+        return turn, messages
+    
+    def _cached_verdict(self, turn: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Look up a previous verdict for a turn in the verdict cache."""
+        if self.verdict_cache is None:
+            return None
+        verdict = self.verdict_cache.get(turn)
+        if verdict is not None:
+            logger.info(f"Reusing cached verdict for {turn['question_id']}")
+            record_call(CallMetrics(cache_hit=True))
+        return verdict
+    
+    def _cached_batch_verdicts(self, turn_data: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Look up previous verdicts for a batch, keyed by batch position."""
+        verdicts = {}
+        for position, turn in turn_data.items():
+            verdict = self._cached_verdict(turn)
+            if verdict is not None:
+                verdicts[position] = verdict
+        return verdicts
+    
+    def _parse_verdict(self, eval_data: Any) -> Dict[str, Any]:
+        """Decode a single-turn judge response, which must be a JSON object."""
+        if isinstance(eval_data, str):
+            eval_data = json.loads(eval_data)
+        if not isinstance(eval_data, dict):
+            raise ValueError(f"Judge response is not a JSON object: {type(eval_data).__name__}")
+        return eval_data
+    
+    def _store_verdict(self, turn: Dict[str, Any], eval_data: Dict[str, Any]) -> None:
+        """Save a well-formed judge verdict to the verdict cache."""
+        if self.verdict_cache is None:
+            return
+        if isinstance(eval_data.get('answer_correct'), bool) and isinstance(eval_data.get('program_correct'), bool):
+            self.verdict_cache.set(turn, eval_data)
+    
+    def _extract_turn(self, item: Dict[str, Any], conversation_idx: int) -> Dict[str, Any]:
+        """Extract the fields the judge compares for a single turn."""
+        conv_item = item['conversation'][conversation_idx]
+        return {
+            'question_id': f"{item['id']}-{conversation_idx}",
+            'question': conv_item['question'],
+            'expected_answer': float(conv_item['expected_answer']),
+            'predicted_answer': float(conv_item['predicted_answer']),
+            'expected_program': conv_item.get('expected_program', ''),
+            'predicted_program': conv_item.get('predicted_program', '')
+        }
+    
+    def _extract_batch_turns(
+        self, 
+        turns: List[Tuple[Dict[str, Any], int]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Extract turn data for a batch, keyed by position in the batch.
+        
+        Turns that cannot be extracted are left out; they are judged on their
+        own, which reports the problem as an error result.
+        """
+        turn_data = {}
+        for position, (item, conversation_idx) in enumerate(turns):
+            try:
+                turn_data[position] = self._extract_turn(item, conversation_idx)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.warning(f"Cannot batch turn {conversation_idx} of {item.get('id', 'unknown')}: {e}")
+        return turn_data
+    
+    def _build_batch_messages(
+        self, 
+        turns: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """Build the judge messages and response token budget for a batch."""
+        prompt = self.prompts.create_batch_evaluation_prompt(turns)
+        
+        messages = [
+            {"role": "system", "content": self.prompts.get_system_prompt()},
+            {"role": "user", "content": prompt}
+        ]
+        max_tokens = max(config.max_tokens, BATCH_TOKENS_PER_TURN * len(turns))
+        return messages, max_tokens
+    
+    def _parse_batch_verdicts(
+        self, 
+        eval_data: Any, 
+        turn_data: Dict[int, Dict[str, Any]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Match well-formed verdicts in a batch response to the requested turns.
+        
+        A verdict must name a requested question_id and carry boolean
+        answer_correct and program_correct fields. Unknown ids are ignored
+        and ids answered more than once are treated as missing.
+        
+        Returns:
+            Dictionary mapping batch position to its verdict
+        """
+        if isinstance(eval_data, str):
+            eval_data = json.loads(eval_data)
+        entries = eval_data.get('verdicts') if isinstance(eval_data, dict) else eval_data
+        if not isinstance(entries, list):
+            raise ValueError("Batch response has no verdicts array")
+        
+        positions = {turn['question_id']: position for position, turn in turn_data.items()}
+        verdicts = {}
+        seen = set()
+        for entry in entries:
+            if not isinstance(entry, dict) or entry.get('question_id') not in positions:
+                continue
+            if not (isinstance(entry.get('answer_correct'), bool) and isinstance(entry.get('program_correct'), bool)):
+                continue
+            position = positions[entry['question_id']]
+            if position in seen:
+                verdicts.pop(position, None)
+                continue
+            seen.add(position)
+            verdicts[position] = entry
+        
+        missing = [turn['question_id'] for position, turn in turn_data.items() if position not in verdicts]
+        if missing:
+            logger.warning(f"No valid verdict for {missing} in batch response; judging them individually")
+        return verdicts
+    
+    def _build_result(
+        self, 
+        item: Dict[str, Any], 
+        conversation_idx: int, 
+        turn: Dict[str, Any], 
+        eval_data: Any
+    ) -> EvaluationResult:
+        """Build an EvaluationResult from the judge response."""
+        # Handle string response if needed
+        if isinstance(eval_data, str):
+            eval_data = json.loads(eval_data)
+        
+        return EvaluationResult(
+            question_id=f"{item['id']}-{conversation_idx}",
+            question=turn['question'],
+            expected_answer=turn['expected_answer'],
+            predicted_answer=turn['predicted_answer'],
+            expected_program=turn['expected_program'],
+            predicted_program=turn['predicted_program'],
+            answer_correct=eval_data.get('answer_correct', False),
+            program_correct=eval_data.get('program_correct', False),
+            reasoning=eval_data.get('reasoning', '')
+        )
+    
     def _create_error_result(
         self, 
         item: Dict[str, Any], 
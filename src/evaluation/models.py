@@ -18,6 +18,7 @@ class EvaluationResult:
     program_correct: bool
     reasoning: str
     error: Optional[str] = None
+    judged_by: str = "llm"  # "rule" when settled by RuleBasedJudge
 
 
 @dataclass
@@ -30,6 +31,8 @@ class EvaluationSummary:
     answer_accuracy: float
     program_accuracy: float
     overall_accuracy: float
+    rule_judged: int = 0
+    llm_judged: int = 0
 
     @classmethod
     def from_results(cls, results: list[EvaluationResult]) -> 'EvaluationSummary':
@@ -38,6 +41,7 @@ class EvaluationSummary:
         answer_correct = sum(1 for r in results if r.answer_correct)
         program_correct = sum(1 for r in results if r.program_correct)
         both_correct = sum(1 for r in results if r.answer_correct and r.program_correct)
+        rule_judged = sum(1 for r in results if r.judged_by == "rule")
         
         return cls(
             total=total,
@@ -46,5 +50,7 @@ class EvaluationSummary:
             both_correct=both_correct,
             answer_accuracy=round(answer_correct / total * 100, 2) if total > 0 else 0,
             program_accuracy=round(program_correct / total * 100, 2) if total > 0 else 0,
-            overall_accuracy=round(both_correct / total * 100, 2) if total > 0 else 0
+            overall_accuracy=round(both_correct / total * 100, 2) if total > 0 else 0,
+            rule_judged=rule_judged,
+            llm_judged=total - rule_judged
         )
\ No newline at end of file
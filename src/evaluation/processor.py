@@ -1,13 +1,18 @@
 # src/evaluation/processor.py
 """Main evaluation processor."""
 
+import asyncio
 import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from src.evaluation.judge import LLMJudge
 from src.evaluation.models import EvaluationResult, EvaluationSummary
 from src.evaluation.reporter import EvaluationReporter
+from src.evaluation.rules import RuleBasedJudge
+from src.evaluation.verdict_cache import VerdictCache
 from src.utils.logging_config import get_logger
+from src.utils.metrics import CallMetrics, TurnMetricsWriter, format_summary, track_calls, turn_record
+from config.settings import config
 
 logger = get_logger(__name__)
 
@@ -15,16 +20,24 @@ logger = get_logger(__name__)
 class EvaluationProcessor:
     """Main processor for evaluation tasks."""
     
-    def __init__(self):
-        """Initialize the evaluation processor."""
-        self.judge = LLMJudge()
+    def __init__(self, verdict_cache: Optional[VerdictCache] = None):
+        """Initialize the evaluation processor.
+        
+        Args:
+            verdict_cache: Cache of previous judge verdicts (None disables it)
+        """
+        self.judge = LLMJudge(verdict_cache)
+        self.rule_judge = RuleBasedJudge() if config.rule_judge_enabled else None
         self.reporter = EvaluationReporter()
     
     def load_predictions(self, input_file: str) -> List[Dict[str, Any]]:
-        """Load predictions from JSON file."""
+        """Load predictions from a JSON array or JSON Lines file."""
         try:
-            with open(input_file, 'r') as f:
-                predictions_data = json.load(f)
+            with open(input_file, 'r', encoding='utf-8') as f:
+                if input_file.endswith('.jsonl'):
+                    predictions_data = [json.loads(line) for line in f if line.strip()]
+                else:
+                    predictions_data = json.load(f)
             logger.info(f"Loaded {len(predictions_data)} prediction items")
             return predictions_data
         except FileNotFoundError:
@@ -34,37 +47,201 @@ class EvaluationProcessor:
             logger.error(f"Error parsing predictions JSON: {e}")
             raise
     
-    def evaluate_all_predictions(self, predictions_data: List[Dict[str, Any]]) -> List[EvaluationResult]:
-        """Evaluate all predictions in the dataset."""
-        all_results = []
+    def evaluate_all_predictions(
+        self, 
+        predictions_data: List[Dict[str, Any]], 
+        max_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        baseline: Optional[List[EvaluationResult]] = None,
+        metrics_writer: Optional[TurnMetricsWriter] = None
+    ) -> List[EvaluationResult]:
+        """Evaluate all predictions in the dataset.
+        
+        Turns whose inputs are unchanged since the baseline run reuse its
+        result, and turns settled by the rule-based judge never reach the
+        LLM. The rest are sent to the LLM judge batch_size turns per request,
+        with up to max_concurrency requests in flight. Results are returned
+        in item and turn order either way.
         
-        for item_idx, item in enumerate(predictions_data):
-            logger.info(f"Processing item {item_idx + 1}/{len(predictions_data)}: {item.get('id', 'unknown')}")
+        The call metrics of every turn are written to metrics_writer. Turns
+        judged in one batch share its request, whose metrics are counted on
+        the first turn of the batch only.
+        
+        Args:
+            predictions_data: Prediction items to evaluate
+            max_concurrency: Number of concurrent judge requests
+                             (uses config.eval_concurrency if None)
+            batch_size: Number of turns per judge request
+                        (uses config.judge_batch_size if None)
+            baseline: Results of a previous run to reuse where possible
+            metrics_writer: Receives the call metrics of each turn
             
-            # Process each conversation in the item
-            conversations = item.get('conversation', [])
-            for conv_idx, _ in enumerate(conversations):
-                logger.info(f"  Evaluating conversation {conv_idx + 1}/{len(conversations)}")
-                
-                result = self.judge.evaluate_prediction(item, conv_idx)
-                all_results.append(result)
-                
-                # Log result
-                self._log_evaluation_result(result)
+        Returns:
+            List of EvaluationResults
+        """
+        max_concurrency = max_concurrency or config.eval_concurrency
+        batch_size = batch_size or config.judge_batch_size
+        
+        turns = [
+            (item, conv_idx)
+            for item in predictions_data
+            for conv_idx in range(len(item.get('conversation', [])))
+        ]
+        reusable = self._reusable_results(baseline or [])
+        all_results = [self._baseline_result(item, conv_idx, reusable) for item, conv_idx in turns]
+        reused = sum(1 for result in all_results if result is not None)
+        sources = ['baseline' if result is not None else 'rule' for result in all_results]
+        all_results = [
+            result or self._rule_result(item, conv_idx)
+            for result, (item, conv_idx) in zip(all_results, turns)
+        ]
+        pending = [idx for idx, result in enumerate(all_results) if result is None]
+        for idx in pending:
+            sources[idx] = 'llm'
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        
+        logger.info(
+            f"Evaluating {len(turns)} turns: {reused} unchanged since baseline, "
+            f"{len(turns) - reused - len(pending)} settled by rules, "
+            f"{len(pending)} sent to the LLM judge in {len(batches)} requests"
+        )
+        
+        if max_concurrency > 1 and batches:
+            judged = asyncio.run(self._ajudge_batches(turns, batches, max_concurrency))
+        else:
+            judged = [self._tracked_judge_batch([turns[idx] for idx in batch]) for batch in batches]
+        
+        calls_by_turn: Dict[int, List[CallMetrics]] = {}
+        first_of_batch: Dict[int, int] = {}
+        for batch, (batch_results, calls) in zip(batches, judged):
+            calls_by_turn[batch[0]] = calls
+            for idx, result in zip(batch, batch_results):
+                all_results[idx] = result
+                first_of_batch[idx] = batch[0]
+        
+        if metrics_writer is not None:
+            # Records are built one at a time as the writer consumes them
+            metrics_writer.write(
+                turn_record(
+                    calls_by_turn.get(idx, []),
+                    question_id=result.question_id,
+                    source=sources[idx],
+                    batch=all_results[first_of_batch[idx]].question_id if idx in first_of_batch else None,
+                    success=result.error is None
+                )
+                for idx, result in enumerate(all_results)
+            )
+        
+        for result in all_results:
+            logger.info(f"Evaluated {result.question_id}")
+            self._log_evaluation_result(result)
         
         return all_results
     
+    async def _ajudge_batches(
+        self, 
+        turns: List[Tuple[Dict[str, Any], int]], 
+        batches: List[List[int]], 
+        max_concurrency: int
+    ) -> List[Tuple[List[EvaluationResult], List[CallMetrics]]]:
+        """Judge batches as async tasks, at most max_concurrency at a time.
+        
+        Returns:
+            Results and calls of each batch, in batch order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def judge(batch: List[int]) -> Tuple[List[EvaluationResult], List[CallMetrics]]:
+            async with semaphore:
+                # Each task runs in its own context, so calls are tracked per batch
+                with track_calls() as calls:
+                    results = await self._ajudge_batch([turns[idx] for idx in batch])
+                return results, calls
+        
+        try:
+            # gather keeps the input order regardless of completion order
+            return await asyncio.gather(*(judge(batch) for batch in batches))
+        finally:
+            await self.judge.aclose()
+    
+    def _tracked_judge_batch(
+        self, 
+        turns: List[Tuple[Dict[str, Any], int]]
+    ) -> Tuple[List[EvaluationResult], List[CallMetrics]]:
+        """Judge turns with the LLM and collect the calls made for them."""
+        with track_calls() as calls:
+            results = self._judge_batch(turns)
+        return results, calls
+    
+    def _judge_batch(self, turns: List[Tuple[Dict[str, Any], int]]) -> List[EvaluationResult]:
+        """Judge turns with the LLM, batching them when there is more than one."""
+        if len(turns) == 1:
+            return [self.judge.evaluate_prediction(*turns[0])]
+        return self.judge.evaluate_batch(turns)
+    
+    async def _ajudge_batch(self, turns: List[Tuple[Dict[str, Any], int]]) -> List[EvaluationResult]:
+        """Judge turns with the LLM without blocking the event loop."""
+        if len(turns) == 1:
+            return [await self.judge.aevaluate_prediction(*turns[0])]
+        return await self.judge.aevaluate_batch(turns)
+    
+    def _reusable_results(self, baseline: List[EvaluationResult]) -> Dict[str, EvaluationResult]:
+        """Index baseline results by question_id, skipping failed evaluations."""
+        return {r.question_id: r for r in baseline if r.error is None}
+    
+    def _baseline_result(
+        self, 
+        item: Dict[str, Any], 
+        conv_idx: int, 
+        reusable: Dict[str, EvaluationResult]
+    ) -> Optional[EvaluationResult]:
+        """Get the baseline result for a turn if none of its judge inputs changed."""
+        previous = reusable.get(f"{item.get('id', 'unknown')}-{conv_idx}")
+        if previous is None:
+            return None
+        
+        conv_item = item['conversation'][conv_idx]
+        current = {
+            'question': conv_item.get('question', ''),
+            'expected_answer': conv_item.get('expected_answer'),
+            'predicted_answer': conv_item.get('predicted_answer'),
+            'expected_program': conv_item.get('expected_program', ''),
+            'predicted_program': conv_item.get('predicted_program', '')
+        }
+        if VerdictCache.make_key(current) != VerdictCache.make_key(vars(previous)):
+            return None
+        return previous
+    
+    def _rule_result(self, item: Dict[str, Any], conv_idx: int) -> Optional[EvaluationResult]:
+        """Get the rule-based verdict for a turn, if rules are enabled and decide it."""
+        if self.rule_judge is None:
+            return None
+        return self.rule_judge.evaluate_prediction(item, conv_idx)
+    
     def _log_evaluation_result(self, result: EvaluationResult) -> None:
         """Log individual evaluation result."""
         answer_status = "✓" if result.answer_correct else "✗"
         program_status = "✓" if result.program_correct else "✗"
-        logger.info(f"  Answer: {answer_status} | Program: {program_status}")
+        logger.info(f"  Answer: {answer_status} | Program: {program_status} (judged by {result.judged_by})")
         logger.info(f"  Expected: {result.expected_answer} | Predicted: {result.predicted_answer}")
         if result.reasoning:
             logger.info(f"  Reasoning: {result.reasoning}")
     
-    def process_evaluation(self, input_file: str, output_dir: str) -> EvaluationSummary:
-        """Process complete evaluation pipeline."""
+    def process_evaluation(
+        self, 
+        input_file: str, 
+        output_dir: str, 
+        max_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        baseline_file: Optional[str] = None
+    ) -> EvaluationSummary:
+        """Process complete evaluation pipeline.
+        
+        With a baseline_file from a previous run, only turns whose inputs
+        changed are judged again, and a diff of improvements and
+        regressions is saved next to the results. API call metrics of every
+        turn are saved next to the results as well, see TurnMetricsWriter.
+        """
         logger.info("Starting LLM Judge evaluation")
         
         # Ensure output directory exists
@@ -73,14 +250,35 @@ class EvaluationProcessor:
         # Load predictions
         predictions_data = self.load_predictions(input_file)
         
+        # Load the previous run to compare against
+        baseline = self.reporter.load_results(baseline_file) if baseline_file else None
+        
+        # Call metrics are saved next to the results, named so that they do
+        # not match evaluation_results_*
+        timestamp = self.reporter.make_timestamp()
+        metrics_writer = TurnMetricsWriter(os.path.join(output_dir, f"evaluation_{timestamp}.json"))
+        
         # Evaluate all predictions
-        all_results = self.evaluate_all_predictions(predictions_data)
+        try:
+            all_results = self.evaluate_all_predictions(
+                predictions_data, max_concurrency, batch_size, baseline, metrics_writer
+            )
+        finally:
+            call_metrics = metrics_writer.close()
         
         # Generate summary
         summary = EvaluationSummary.from_results(all_results)
         
         # Save results and generate report
-        results_file = self.reporter.save_results(all_results, summary, output_dir)
+        results_file = self.reporter.save_results(all_results, summary, output_dir, timestamp)
         self.reporter.print_summary(summary, results_file)
+        for line in format_summary(call_metrics):
+            logger.info(line)
+            print(line)
+        
+        if baseline is not None:
+            diff = self.reporter.compare_results(baseline, all_results)
+            diff_file = self.reporter.save_diff(diff, results_file)
+            self.reporter.print_diff(diff, diff_file)
         
         return summary
\ No newline at end of file
@@ -5,6 +5,9 @@
 class EvaluationPrompts:
     """Collection of prompts for LLM-based evaluation."""
     
+    # Bump whenever the judging criteria change so cached verdicts are not reused
+    PROMPT_VERSION = "1"
+    
     @staticmethod
     def create_evaluation_prompt(
         question: str, 
@@ -35,6 +38,40 @@ Respond with:
 - program_correct: true/false  
 - reasoning: Brief explanation of why answers/programs are correct or incorrect, especially for format differences"""
 
+    @staticmethod
+    def create_batch_evaluation_prompt(turns: list) -> str:
+        """Create an evaluation prompt covering several predictions at once.
+        
+        Each turn is a dictionary with question_id, question, expected_answer,
+        predicted_answer, expected_program and predicted_program.
+        """
+        blocks = "\n\n".join(
+            f"""Question ID: {turn['question_id']}
+Question: {turn['question']}
+Expected Answer: {turn['expected_answer']}
+Predicted Answer: {turn['predicted_answer']}
+Expected Program: {turn['expected_program']}
+Predicted Program: {turn['predicted_program']}"""
+            for turn in turns
+        )
+        
+        return f"""Evaluate each of these {len(turns)} financial calculation predictions independently:
+
+{blocks}
+
+For each prediction determine:
+1. Is the predicted answer correct? (Consider decimal vs percentage formats - e.g., 0.14 = 14%)
+2. Is the predicted program correct? (Consider functionally equivalent calculations)
+
+Important: Answers may be equivalent even if in different formats:
+- 0.14 and 14.0 both represent 14%
+- Programs may be equivalent with different percentage conversions
+
+Respond with a JSON object containing a "verdicts" array with exactly one entry per Question ID:
+{{"verdicts": [{{"question_id": "...", "answer_correct": true/false, "program_correct": true/false, "reasoning": "..."}}]}}
+
+The reasoning should briefly explain why answers/programs are correct or incorrect, especially for format differences"""
+
     @staticmethod
     def get_system_prompt() -> str:
         """Get the system prompt for evaluation."""
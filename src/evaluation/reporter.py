@@ -4,7 +4,7 @@
 import json
 import os
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 from src.evaluation.models import EvaluationResult, EvaluationSummary
 from src.utils.logging_config import get_logger
 
@@ -18,10 +18,15 @@ class EvaluationReporter:
         self, 
         results: List[EvaluationResult], 
         summary: EvaluationSummary,
-        output_dir: str
+        output_dir: str,
+        timestamp: Optional[str] = None
     ) -> str:
-        """Save evaluation results to file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        """Save evaluation results to file.
+        
+        The file is named after timestamp (YYYYmmdd_HHMMSS, the current
+        time if None).
+        """
+        timestamp = timestamp or self.make_timestamp()
         
         # Prepare results data
         results_data = {
@@ -33,7 +38,11 @@ class EvaluationReporter:
                 "both_correct": summary.both_correct,
                 "answer_accuracy": summary.answer_accuracy,
                 "program_accuracy": summary.program_accuracy,
-                "overall_accuracy": summary.overall_accuracy
+                "overall_accuracy": summary.overall_accuracy,
+                "judged_by": {
+                    "rule": summary.rule_judged,
+                    "llm": summary.llm_judged
+                }
             },
             "results": [self._result_to_dict(r) for r in results]
         }
@@ -46,6 +55,124 @@ class EvaluationReporter:
         logger.info(f"Results saved to: {results_file}")
         return results_file
     
+    @staticmethod
+    def make_timestamp() -> str:
+        """Get the current time in the format used in results file names."""
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    def load_results(self, results_file: str) -> List[EvaluationResult]:
+        """Load the results of a previous run saved by save_results."""
+        with open(results_file, 'r', encoding='utf-8') as f:
+            results_data = json.load(f)
+        
+        results = [
+            EvaluationResult(
+                question_id=r['question_id'],
+                question=r['question'],
+                expected_answer=r['expected_answer'],
+                predicted_answer=r['predicted_answer'],
+                expected_program=r['expected_program'],
+                predicted_program=r['predicted_program'],
+                answer_correct=r['answer_correct'],
+                program_correct=r['program_correct'],
+                reasoning=r.get('reasoning', ''),
+                error=r.get('error'),
+                judged_by=r.get('judged_by', 'llm')
+            )
+            for r in results_data['results']
+        ]
+        logger.info(f"Loaded {len(results)} results from {results_file}")
+        return results
+    
+    def compare_results(
+        self, 
+        baseline: List[EvaluationResult], 
+        results: List[EvaluationResult]
+    ) -> Dict[str, Any]:
+        """Compare a run against a baseline run by question_id.
+        
+        A turn is improved if more of answer/program are correct than in
+        the baseline, regressed if fewer are, and changed if one flipped
+        each way.
+        """
+        baseline_by_id = {r.question_id: r for r in baseline}
+        result_ids = {r.question_id for r in results}
+        
+        changes = {"improved": [], "regressed": [], "changed": []}
+        added = []
+        for result in results:
+            previous = baseline_by_id.get(result.question_id)
+            if previous is None:
+                added.append(result.question_id)
+                continue
+            if (previous.answer_correct, previous.program_correct) == (result.answer_correct, result.program_correct):
+                continue
+            
+            before = int(previous.answer_correct) + int(previous.program_correct)
+            after = int(result.answer_correct) + int(result.program_correct)
+            status = "improved" if after > before else "regressed" if after < before else "changed"
+            changes[status].append({
+                "question_id": result.question_id,
+                "question": result.question,
+                "before": {
+                    "predicted_answer": previous.predicted_answer,
+                    "predicted_program": previous.predicted_program,
+                    "answer_correct": previous.answer_correct,
+                    "program_correct": previous.program_correct
+                },
+                "after": {
+                    "predicted_answer": result.predicted_answer,
+                    "predicted_program": result.predicted_program,
+                    "answer_correct": result.answer_correct,
+                    "program_correct": result.program_correct
+                }
+            })
+        
+        removed = [r.question_id for r in baseline if r.question_id not in result_ids]
+        baseline_summary = EvaluationSummary.from_results(baseline)
+        summary = EvaluationSummary.from_results(results)
+        
+        return {
+            "summary": {
+                "improved": len(changes["improved"]),
+                "regressed": len(changes["regressed"]),
+                "changed": len(changes["changed"]),
+                "added": len(added),
+                "removed": len(removed),
+                "overall_accuracy": {
+                    "baseline": baseline_summary.overall_accuracy,
+                    "current": summary.overall_accuracy
+                }
+            },
+            **changes,
+            "added": added,
+            "removed": removed
+        }
+    
+    def save_diff(self, diff: Dict[str, Any], results_file: str) -> str:
+        """Save a baseline comparison next to the results file it belongs to."""
+        results_dir, results_name = os.path.split(results_file)
+        diff_file = os.path.join(
+            results_dir, results_name.replace("evaluation_results_", "evaluation_diff_", 1)
+        )
+        with open(diff_file, 'w') as f:
+            json.dump(diff, f, indent=2)
+        
+        logger.info(f"Baseline diff saved to: {diff_file}")
+        return diff_file
+    
+    def print_diff(self, diff: Dict[str, Any], diff_file: str) -> None:
+        """Print a baseline comparison to console."""
+        summary = diff["summary"]
+        accuracy = summary["overall_accuracy"]
+        print("\nCHANGES VS BASELINE")
+        print(f"Improved: {summary['improved']} | Regressed: {summary['regressed']} | Changed: {summary['changed']}")
+        print(f"New questions: {summary['added']} | Missing questions: {summary['removed']}")
+        print(f"Both Correct: {accuracy['baseline']:.1f}% -> {accuracy['current']:.1f}%")
+        for entry in diff["regressed"]:
+            print(f"  Regressed: {entry['question_id']} {entry['question']}")
+        print(f"Diff saved to: {diff_file}")
+    
     def _result_to_dict(self, result: EvaluationResult) -> dict:
         """Convert EvaluationResult to dictionary."""
         return {
@@ -58,7 +185,8 @@ class EvaluationReporter:
             "answer_correct": result.answer_correct,
             "program_correct": result.program_correct,
             "reasoning": result.reasoning,
-            "error": result.error
+            "error": result.error,
+            "judged_by": result.judged_by
         }
     
     def print_summary(self, summary: EvaluationSummary, results_file: str) -> None:
@@ -70,6 +198,7 @@ class EvaluationReporter:
         print(f"Answer Accuracy: {summary.answer_correct}/{summary.total} ({summary.answer_accuracy:.1f}%)")
         print(f"Program Accuracy: {summary.program_correct}/{summary.total} ({summary.program_accuracy:.1f}%)")
         print(f"Both Correct: {summary.both_correct}/{summary.total} ({summary.overall_accuracy:.1f}%)")
+        print(f"Judged by rules: {summary.rule_judged} | Judged by LLM: {summary.llm_judged}")
         print(f"\nResults saved to: {results_file}")
         print("="*50)
     
@@ -0,0 +1,211 @@
+# src/evaluation/rules.py
+"""Deterministic rule-based evaluation tier."""
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from src.evaluation.models import EvaluationResult
+from src.utils.program_executor import ProgramError, parse_program, try_execute_program
+from src.utils.logging_config import get_logger
+from config.settings import config
+
+logger = get_logger(__name__)
+
+# Decimal vs percentage representations of the same value
+SCALES = (1, 100, 0.01)
+
+# Values off by a unit of magnitude (thousands, millions, billions) may be
+# the same figure reported in different units, so they are never ruled wrong
+UNIT_SCALES = SCALES + (1e3, 1e-3, 1e6, 1e-6, 1e9, 1e-9)
+
+# Operations whose operands may be given in either order
+COMMUTATIVE_OPERATIONS = frozenset({'add', 'multiply'})
+
+
+class RuleBasedJudge:
+    """Settles clear-cut predictions without calling the LLM.
+
+    A verdict is only returned when both the answer and the program can be
+    decided by rule; anything ambiguous (rounding, sign conventions,
+    programs that cannot be executed, programs that reach the expected
+    value by a different calculation) is left to the LLM judge.
+    """
+
+    def __init__(
+        self,
+        tolerance: Optional[float] = None,
+        mismatch_margin: Optional[float] = None
+    ):
+        """Initialize the rule-based judge.
+
+        Args:
+            tolerance: Relative tolerance for a match
+                       (uses config.answer_tolerance if None)
+            mismatch_margin: Relative difference beyond which values are
+                             clearly different (uses config.rule_mismatch_margin if None)
+        """
+        self.tolerance = tolerance if tolerance is not None else config.answer_tolerance
+        self.mismatch_margin = mismatch_margin if mismatch_margin is not None else config.rule_mismatch_margin
+
+    def evaluate_prediction(
+        self,
+        item: Dict[str, Any],
+        conversation_idx: int
+    ) -> Optional[EvaluationResult]:
+        """Evaluate a single prediction if it is a clear case.
+
+        Returns:
+            EvaluationResult judged by rule, or None if the LLM should decide
+        """
+        conv_item = item['conversation'][conversation_idx]
+        try:
+            expected_answer = float(conv_item['expected_answer'])
+            predicted_answer = float(conv_item['predicted_answer'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        expected_program = conv_item.get('expected_program', '')
+        predicted_program = conv_item.get('predicted_program', '')
+        # Programs of another type (e.g. a bare number) are left to the LLM
+        if not isinstance(expected_program, str) or not isinstance(predicted_program, str):
+            return None
+
+        answer_correct, answer_reason = self._judge_answer(expected_answer, predicted_answer)
+        if answer_correct is None:
+            return None
+        program_correct, program_reason = self._judge_program(expected_program, predicted_program)
+        if program_correct is None:
+            return None
+
+        return EvaluationResult(
+            question_id=f"{item.get('id', 'unknown')}-{conversation_idx}",
+            question=conv_item.get('question', ''),
+            expected_answer=expected_answer,
+            predicted_answer=predicted_answer,
+            expected_program=expected_program,
+            predicted_program=predicted_program,
+            answer_correct=answer_correct,
+            program_correct=program_correct,
+            reasoning=f"Rule-based: {answer_reason}; {program_reason}",
+            judged_by="rule"
+        )
+
+    def _judge_answer(self, expected: float, predicted: float) -> Tuple[Optional[bool], str]:
+        """Decide answer correctness, or return None if ambiguous."""
+        verdict = self._compare(expected, predicted)
+        if verdict is True:
+            return True, "answer matches expected value"
+        if verdict is False:
+            return False, "answer differs from expected value"
+        return None, ""
+
+    def _judge_program(self, expected: str, predicted: str) -> Tuple[Optional[bool], str]:
+        """Decide program correctness, or return None if ambiguous."""
+        if not predicted or not predicted.strip():
+            return False, "no program predicted"
+        if normalize_program(expected) == normalize_program(predicted):
+            return True, "programs are identical"
+
+        if same_structure(expected, predicted):
+            return True, "programs use the same operations and operands"
+
+        expected_value = try_execute_program(expected)
+        predicted_value = try_execute_program(predicted)
+        if expected_value is None or predicted_value is None:
+            return None, ""
+
+        # The same value from a different calculation (a bare literal, a
+        # collapsed chain) may not be a correct program, so only a clearly
+        # different value is ruled by rule
+        if self._compare(expected_value, predicted_value) is False:
+            return False, "programs evaluate to different results"
+        return None, ""
+
+    def _compare(self, expected: float, predicted: float) -> Optional[bool]:
+        """Compare two values allowing for decimal vs percentage scaling.
+
+        Returns:
+            True if they match, False if they are clearly different,
+            None if they are close but not within tolerance
+            (e.g. coarse rounding, an opposite sign or different units)
+        """
+        if not (math.isfinite(expected) and math.isfinite(predicted)):
+            return None
+
+        for scale in SCALES:
+            if math.isclose(expected * scale, predicted, rel_tol=self.tolerance, abs_tol=1e-9):
+                return True
+
+        for scale in UNIT_SCALES:
+            for sign in (1, -1):
+                if math.isclose(sign * expected * scale, predicted, rel_tol=self.mismatch_margin):
+                    return None
+        return False
+
+
+def normalize_program(program: str) -> str:
+    """Normalize a program for textual comparison.
+
+    Whitespace is removed and constants are written as plain numbers, so
+    'subtract(75.95, const_100)' equals 'subtract(75.95,100)'.
+    """
+    program = re.sub(r'\s+', '', program or '')
+    program = re.sub(r'const_m(\d+)', r'-\1', program)
+    program = re.sub(r'const_(\d+)', r'\1', program)
+    return re.sub(r'(\d+)\.0+\b', r'\1', program)
+
+
+def same_structure(expected: str, predicted: str) -> bool:
+    """Check whether two programs apply the same operations to the same operands.
+
+    References to earlier steps stand for the steps themselves and the
+    operands of add and multiply may come in either order, so
+    'add(160000, 80000), multiply(#0, 2)' and
+    'add(80000, 160000), multiply(2, add(160000, 80000))' have the same
+    structure. Every step counts, so a program that leaves out a step the
+    other one computes has a different structure. Programs that cannot be
+    parsed never match.
+    """
+    # Both programs share one table of operations, so equal operations get
+    # equal ids and comparing them does not expand shared references
+    nodes: Dict[Tuple[Any, ...], int] = {}
+    expected_steps = _intern_steps(expected, nodes)
+    return expected_steps is not None and expected_steps == _intern_steps(predicted, nodes)
+
+
+def _intern_steps(program: str, nodes: Dict[Tuple[Any, ...], int]) -> Optional[Tuple[Any, ...]]:
+    """Get the ids of a program's steps in nodes, or None if it cannot be parsed."""
+    try:
+        steps = parse_program(program)
+    except ProgramError:
+        return None
+
+    resolved: List[Tuple[str, Any]] = []
+    for step in steps:
+        operand = _intern_expression(step, resolved, nodes)
+        if operand is None:
+            return None
+        resolved.append(operand)
+    return tuple(resolved)
+
+
+def _intern_expression(
+    expression: Any,
+    resolved: List[Tuple[str, Any]],
+    nodes: Dict[Tuple[Any, ...], int]
+) -> Optional[Tuple[str, Any]]:
+    """Reduce a parsed expression to ('number', value) or ('operation', id)."""
+    if isinstance(expression, float):
+        return ('number', expression)
+
+    kind, payload = expression
+    if kind == 'ref':
+        return resolved[payload] if payload < len(resolved) else None
+
+    args = [_intern_expression(arg, resolved, nodes) for arg in payload]
+    if any(arg is None for arg in args):
+        return None
+    if kind in COMMUTATIVE_OPERATIONS:
+        args.sort()
+    key = (kind, *args)
+    return ('operation', nodes.setdefault(key, len(nodes)))
@@ -0,0 +1,98 @@
+# src/evaluation/verdict_cache.py
+"""Persistent cache of LLM judge verdicts."""
+
+import json
+import re
+from typing import Any, Dict, Optional
+from src.api.cache import ResponseCache
+from src.evaluation.prompts import EvaluationPrompts
+from src.evaluation.rules import normalize_program
+from src.utils.logging_config import get_logger
+from config.settings import config
+
+logger = get_logger(__name__)
+
+
+class VerdictCache:
+    """Judge verdicts keyed on the normalized inputs of the evaluation prompt.
+
+    The key covers the question, both answers and both programs after
+    normalization, plus EvaluationPrompts.PROMPT_VERSION and the judge
+    deployment, so a changed prompt or model never reuses stale verdicts.
+    Unchanged turns in a new predictions file are answered from the cache
+    whether they were judged singly or in a batch.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_size_bytes: Optional[int] = None):
+        """Open (or create) the verdict cache.
+
+        Args:
+            path: SQLite database path (uses config.verdict_cache_path if None)
+            max_size_bytes: Size budget (uses config.cache_max_bytes if None)
+        """
+        self._store = ResponseCache(
+            path or config.verdict_cache_path,
+            max_size_bytes or config.cache_max_bytes
+        )
+
+    @staticmethod
+    def make_key(turn: Dict[str, Any]) -> str:
+        """Build the cache key for a turn.
+
+        Args:
+            turn: Dictionary with question, expected_answer, predicted_answer,
+                  expected_program and predicted_program
+
+        Returns:
+            Hex SHA-256 digest of the normalized inputs
+        """
+        return ResponseCache.make_key(
+            prompt_version=EvaluationPrompts.PROMPT_VERSION,
+            judge=config.azure_openai.deployment_name,
+            question=re.sub(r'\s+', ' ', str(turn['question'])).strip(),
+            expected_answer=_normalize_number(turn['expected_answer']),
+            predicted_answer=_normalize_number(turn['predicted_answer']),
+            expected_program=normalize_program(turn['expected_program']),
+            predicted_program=normalize_program(turn['predicted_program'])
+        )
+
+    def get(self, turn: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Look up the verdict for a turn.
+
+        Returns:
+            Dictionary with answer_correct, program_correct and reasoning,
+            or None on a miss
+        """
+        value = self._store.get(self.make_key(turn))
+        return json.loads(value) if value is not None else None
+
+    def set(self, turn: Dict[str, Any], verdict: Dict[str, Any]) -> None:
+        """Store the verdict for a turn.
+
+        Args:
+            turn: Turn the verdict belongs to
+            verdict: Judge response with boolean answer_correct and
+                     program_correct fields
+        """
+        value = {
+            'answer_correct': verdict['answer_correct'],
+            'program_correct': verdict['program_correct'],
+            'reasoning': verdict.get('reasoning', '')
+        }
+        self._store.set(self.make_key(turn), json.dumps(value, ensure_ascii=False))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics (hits, misses, hit_rate, entries, size_bytes)."""
+        return self._store.stats()
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._store.close()
+
+
+def _normalize_number(value: Any) -> str:
+    """Format a number so float noise like 0.30000000000000004 does not matter."""
+    try:
+        return f"{float(value):.10g}"
+    except (TypeError, ValueError):
+        return str(value).strip()
@@ -0,0 +1,107 @@
+"""Prompt token budget enforcement."""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from src.utils.logging_config import get_logger
+from src.utils.tokens import count_message_tokens
+from config.settings import config
+
+logger = get_logger(__name__)
+
+# Builds the chat messages for a (financial_report, conversation_history) pair
+Renderer = Callable[[Dict[str, Any], List[Dict]], List[Dict[str, str]]]
+
+
+class PromptBudget:
+    """Trims prompts that exceed a token budget.
+
+    Content is removed in a fixed priority order, least useful first:
+
+    1. Older conversation turns, keeping the most recent one
+    2. post_text sentences, from the end
+    3. pre_text sentences, from the end
+    4. The most recent conversation turn
+    5. Table rows, from the end, keeping the header and first data row
+
+    The prompt is rebuilt after each removal and trimming stops as soon as
+    it fits.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None):
+        """Initialize the budget.
+
+        Args:
+            max_tokens: Maximum prompt tokens (uses config.max_prompt_tokens
+                        if None)
+        """
+        self.max_tokens = max_tokens or config.max_prompt_tokens
+
+    def fits(self, prompt_tokens: int) -> bool:
+        """Check whether a prompt of the given size is within the budget."""
+        return not self.max_tokens or prompt_tokens <= self.max_tokens
+
+    def fit(
+        self,
+        financial_report: Dict[str, Any],
+        conversation_history: List[Dict],
+        render: Renderer
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """Build the largest prompt within the budget.
+
+        Args:
+            financial_report: Financial report data
+            conversation_history: Previous conversation turns
+            render: Function building the messages from a report and history
+
+        Returns:
+            Tuple of (messages, prompt_tokens). If nothing more can be removed
+            the smallest prompt is returned even though it is over budget.
+        """
+        messages, prompt_tokens = [], 0
+        for step, (report, history) in enumerate(self._reductions(financial_report, conversation_history)):
+            messages = render(report, history)
+            prompt_tokens = count_message_tokens(messages)
+            if self.fits(prompt_tokens):
+                if step:
+                    logger.info(
+                        f"Trimmed prompt to {prompt_tokens} tokens (budget {self.max_tokens}): "
+                        f"{len(history)}/{len(conversation_history)} history turns, "
+                        f"{_size(report, 'pre_text')}/{_size(financial_report, 'pre_text')} pre_text, "
+                        f"{_size(report, 'post_text')}/{_size(financial_report, 'post_text')} post_text, "
+                        f"{_size(report, 'table')}/{_size(financial_report, 'table')} table rows"
+                    )
+                return messages, prompt_tokens
+
+        logger.warning(f"Prompt still has {prompt_tokens} tokens after trimming (budget {self.max_tokens})")
+        return messages, prompt_tokens
+
+    def _reductions(
+        self,
+        financial_report: Dict[str, Any],
+        conversation_history: List[Dict]
+    ) -> Iterator[Tuple[Dict[str, Any], List[Dict]]]:
+        """Yield the original inputs followed by ever smaller versions."""
+        report = dict(financial_report)
+        history = list(conversation_history or [])
+        yield report, history
+
+        while len(history) > 1:
+            history = history[1:]
+            yield report, history
+
+        for section in ('post_text', 'pre_text'):
+            while report.get(section):
+                report = {**report, section: report[section][:-1]}
+                yield report, history
+
+        if history:
+            history = []
+            yield report, history
+
+        while len(report.get('table') or []) > 2:
+            report = {**report, 'table': report['table'][:-1]}
+            yield report, history
+
+
+def _size(report: Dict[str, Any], section: str) -> int:
+    """Number of entries in a report section."""
+    return len(report.get(section) or [])
@@ -0,0 +1,107 @@
+"""Checkpoint journal for resumable prediction runs."""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, TextIO
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CheckpointJournal:
+    """Append-only JSONL journal of completed dataset items.
+
+    Each line holds one finished item with its statistics and is flushed to
+    disk immediately, so progress survives crashes. A torn last line from an
+    interrupted write is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the journal.
+
+        Args:
+            path: Path to the journal file
+        """
+        self.path = path
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(output_file: str) -> str:
+        """Get the journal path belonging to an output file.
+
+        Args:
+            output_file: Path to the prediction output file
+
+        Returns:
+            Journal file path
+        """
+        return f"{output_file}.checkpoint.jsonl"
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Load completed items from the journal.
+
+        Returns:
+            Dictionary mapping item id to {'item': ..., 'stats': ...}
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            logger.info(f"No checkpoint found at {self.path}")
+            return completed
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring corrupt checkpoint line {line_number} in {self.path}")
+                    continue
+                completed[entry['id']] = {'item': entry['item'], 'stats': entry['stats']}
+
+        logger.info(f"Loaded {len(completed)} completed items from checkpoint {self.path}")
+        return completed
+
+    def open(self, reset: bool = False) -> None:
+        """Open the journal for appending.
+
+        Args:
+            reset: Discard any existing journal contents
+        """
+        journal_dir = os.path.dirname(self.path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        self._file = open(self.path, 'w' if reset else 'a', encoding='utf-8')
+
+    def record(self, item_id: str, result_item: Dict, item_stats: Dict[str, Any]) -> None:
+        """Append a completed item and flush it to disk.
+
+        Args:
+            item_id: Dataset item id
+            result_item: Processed item with predictions
+            item_stats: Item processing statistics
+        """
+        line = json.dumps(
+            {'id': item_id, 'item': result_item, 'stats': item_stats},
+            ensure_ascii=False
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        """Close and delete the journal once the run has been saved."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+            logger.info(f"Removed checkpoint {self.path}")
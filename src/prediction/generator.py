@@ -1,11 +1,17 @@
 """Prediction generation for financial QA."""
 
 import json
-from typing import Dict, Any, List
-from src.api.azure_client import azure_client
-from src.data.formatter import format_financial_context, format_conversation_history
+import math
+from typing import Dict, Any, List, Optional
+from src.api.azure_client import AzureOpenAIClient, get_azure_client
+from src.data.formatter import ContextCache, format_financial_context, format_conversation_history
+from src.data.retrieval import ReportIndex, build_query
+from src.prediction.budget import PromptBudget
+from src.utils.program_executor import try_execute_program
 from src.utils.text_utils import extract_json_from_text, parse_program_answer_from_text
+from src.utils.tokens import count_message_tokens
 from src.utils.logging_config import get_logger
+from config.settings import config
 
 logger = get_logger(__name__)
 
@@ -13,15 +19,37 @@ logger = get_logger(__name__)
 class PredictionGenerator:
     """Handles prediction generation for financial QA questions."""
     
-    def __init__(self):
-        """Initialize the prediction generator."""
-        self.client = azure_client
+    def __init__(self, client: Optional[AzureOpenAIClient] = None):
+        """Initialize the prediction generator.
+        
+        Args:
+            client: API client (uses the shared client from get_azure_client,
+                    created on first use, if None)
+        """
+        self._client = client
+        self.context_cache = ContextCache()
+        self.index_cache = ContextCache()
+        self.budget = PromptBudget()
+    
+    @property
+    def client(self) -> AzureOpenAIClient:
+        """API client used for predictions."""
+        if self._client is None:
+            self._client = get_azure_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client: AzureOpenAIClient) -> None:
+        self._client = client
     
     def generate_prediction(
         self,
         financial_report: Dict[str, Any],
         conversation_history: List[Dict],
-        current_question: str
+        current_question: str,
+        context: Optional[str] = None,
+        history_text: Optional[str] = None,
+        report_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Generate prediction for a single question.
         
@@ -29,36 +57,87 @@ class PredictionGenerator:
             financial_report: Financial report data
             conversation_history: Previous conversation turns
             current_question: Current question to answer
+            context: Precompiled financial context (built from
+                     financial_report if None)
+            history_text: Precompiled conversation history (built from
+                          conversation_history if None)
+            report_id: Id of the item the report belongs to, used to reuse
+                       its formatted context across turns
             
         Returns:
-            Dictionary containing predicted_program and predicted_answer
+            Dictionary containing predicted_program and predicted_answer,
+            plus an 'error' message if the prediction could not be generated
         """
         logger.info(f"Generating prediction for question: '{current_question}'")
         logger.debug(f"Conversation history length: {len(conversation_history)}")
         
         try:
-            # Format the context
-            context = format_financial_context(financial_report)
-            history_text = format_conversation_history(conversation_history)
+            messages = self._build_messages(
+                financial_report, conversation_history, current_question,
+                context, history_text, report_id
+            )
             
-            # Create the user message
-            user_message = self._create_user_message(context, history_text, current_question)
-            logger.debug(f"User message length: {len(user_message)} characters")
+            # Get response from Azure OpenAI
+            response_text = self.client.create_chat_completion(messages)
             
-            # Get system prompt
-            system_prompt = self.client.get_system_prompt()
+            # Parse the response and check its arithmetic
+            prediction = self._parse_response(response_text)
+            prediction = self._reconcile_answer(prediction)
             
-            # Create messages
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ]
+            logger.info(f"Successfully generated prediction: {prediction}")
+            return prediction
+            
+        except Exception as e:
+            logger.error(f"Error generating prediction: {e}", exc_info=True)
+            return {
+                "predicted_program": "",
+                "predicted_answer": 0.0,
+                "error": str(e)
+            }
+    
+    async def agenerate_prediction(
+        self,
+        financial_report: Dict[str, Any],
+        conversation_history: List[Dict],
+        current_question: str,
+        context: Optional[str] = None,
+        history_text: Optional[str] = None,
+        report_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Generate prediction for a single question without blocking the event loop.
+        
+        Async counterpart of generate_prediction, same arguments and result.
+        
+        Args:
+            financial_report: Financial report data
+            conversation_history: Previous conversation turns
+            current_question: Current question to answer
+            context: Precompiled financial context (built from
+                     financial_report if None)
+            history_text: Precompiled conversation history (built from
+                          conversation_history if None)
+            report_id: Id of the item the report belongs to, used to reuse
+                       its formatted context across turns
+            
+        Returns:
+            Dictionary containing predicted_program and predicted_answer,
+            plus an 'error' message if the prediction could not be generated
+        """
+        logger.info(f"Generating prediction for question: '{current_question}'")
+        logger.debug(f"Conversation history length: {len(conversation_history)}")
+        
+        try:
+            messages = self._build_messages(
+                financial_report, conversation_history, current_question,
+                context, history_text, report_id
+            )
             
             # Get response from Azure OpenAI
-            response_text = self.client.create_chat_completion(messages)
+            response_text = await self.client.acreate_chat_completion(messages)
             
-            # Parse the response
+            # Parse the response and check its arithmetic
             prediction = self._parse_response(response_text)
+            prediction = self._reconcile_answer(prediction)
             
             logger.info(f"Successfully generated prediction: {prediction}")
             return prediction
@@ -67,9 +146,123 @@ class PredictionGenerator:
             logger.error(f"Error generating prediction: {e}", exc_info=True)
             return {
                 "predicted_program": "",
-                "predicted_answer": 0.0
+                "predicted_answer": 0.0,
+                "error": str(e)
             }
     
+    def _build_messages(
+        self,
+        financial_report: Dict[str, Any],
+        conversation_history: List[Dict],
+        current_question: str,
+        context: Optional[str] = None,
+        history_text: Optional[str] = None,
+        report_id: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for a single question.
+        
+        Args:
+            financial_report: Financial report data
+            conversation_history: Previous conversation turns
+            current_question: Current question to answer
+            context: Precompiled financial context, if available
+            history_text: Precompiled conversation history, if available
+            report_id: Id of the item the report belongs to, if known
+            
+        Prompts over config.max_prompt_tokens are rebuilt from the report
+        and history with content trimmed by PromptBudget.
+        
+        Returns:
+            List of system and user messages
+        """
+        if context is None:
+            context = self._format_context(financial_report, conversation_history, current_question, report_id)
+        if history_text is None:
+            history_text = format_conversation_history(conversation_history)
+        
+        messages = self._render_messages(context, history_text, current_question)
+        prompt_tokens = count_message_tokens(messages)
+        
+        if not self.budget.fits(prompt_tokens):
+            logger.warning(f"Prompt has {prompt_tokens} tokens, over the budget of {self.budget.max_tokens}")
+            messages, prompt_tokens = self.budget.fit(
+                self._select_report(financial_report, conversation_history, current_question, report_id),
+                conversation_history,
+                lambda report, history: self._render_messages(
+                    format_financial_context(report),
+                    format_conversation_history(history),
+                    current_question
+                )
+            )
+        
+        logger.info(f"Prompt tokens: {prompt_tokens}")
+        return messages
+    
+    def _render_messages(
+        self,
+        context: str,
+        history_text: str,
+        current_question: str
+    ) -> List[Dict[str, str]]:
+        """Assemble the system and user messages from formatted prompt parts."""
+        # Create the user message
+        user_message = self._create_user_message(context, history_text, current_question)
+        logger.debug(f"User message length: {len(user_message)} characters")
+        
+        # Get system prompt
+        system_prompt = self.client.get_system_prompt()
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ]
+    
+    def _format_context(
+        self,
+        financial_report: Dict[str, Any],
+        conversation_history: List[Dict],
+        current_question: str,
+        report_id: Optional[str] = None
+    ) -> str:
+        """Format the financial context for a question.
+        
+        With config.retrieval_enabled the report is first reduced to the
+        snippets relevant to the question and its history; otherwise the
+        full context is built once per report and reused across turns.
+        
+        Args:
+            financial_report: Financial report data
+            conversation_history: Previous conversation turns
+            current_question: Current question to answer
+            report_id: Id of the item the report belongs to (cache key)
+            
+        Returns:
+            Formatted context string
+        """
+        report = self._select_report(financial_report, conversation_history, current_question, report_id)
+        if report is not financial_report:
+            return format_financial_context(report)
+        
+        return self.context_cache.get(financial_report, format_financial_context, report_id)
+    
+    def _select_report(
+        self,
+        financial_report: Dict[str, Any],
+        conversation_history: List[Dict],
+        current_question: str,
+        report_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Reduce the report to the snippets relevant to the question.
+        
+        Returns:
+            The pruned report with config.retrieval_enabled, otherwise (or if
+            nothing was pruned) financial_report itself
+        """
+        if not config.retrieval_enabled:
+            return financial_report
+        index = self.index_cache.get(financial_report, ReportIndex, report_id)
+        return index.prune(build_query(current_question, conversation_history))
+    
     def _create_user_message(
         self,
         context: str,
@@ -100,6 +293,38 @@ Respond in this exact JSON format:
     "answer": your_numerical_answer_here
 }}"""
     
+    def _reconcile_answer(self, prediction: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the predicted answer with the result of the predicted program.
+        
+        Models often write a correct program but slip on the arithmetic. When
+        the program executes locally and its result disagrees with the answer,
+        the executed value wins. Results that only differ by a factor of 100
+        (decimal vs percentage) are left alone.
+        
+        Args:
+            prediction: Parsed prediction
+            
+        Returns:
+            Prediction with a possibly corrected predicted_answer
+        """
+        if not config.recompute_answers:
+            return prediction
+        
+        executed = try_execute_program(prediction["predicted_program"])
+        if executed is None or not math.isfinite(executed):
+            return prediction
+        
+        answer = prediction["predicted_answer"]
+        for scale in (1, 100, 0.01):
+            if math.isclose(executed * scale, answer, rel_tol=config.answer_tolerance, abs_tol=1e-9):
+                return prediction
+        
+        logger.warning(
+            f"Predicted answer {answer} disagrees with program result {executed}; "
+            f"using program result"
+        )
+        return {**prediction, "predicted_answer": executed}
+    
     def _parse_response(self, response_text: str) -> Dict[str, Any]:
         """Parse the API response to extract program and answer.
         
@@ -135,5 +360,24 @@ Respond in this exact JSON format:
         return prediction
 
 
-# Global generator instance
-prediction_generator = PredictionGenerator()
\ No newline at end of file
+# Shared generator, created on first use by get_prediction_generator
+_prediction_generator: Optional[PredictionGenerator] = None
+
+
+def get_prediction_generator() -> PredictionGenerator:
+    """Get the shared prediction generator, creating it on first use.
+    
+    Returns:
+        The shared PredictionGenerator
+    """
+    global _prediction_generator
+    if _prediction_generator is None:
+        _prediction_generator = PredictionGenerator()
+    return _prediction_generator
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the former prediction_generator global lazily."""
+    if name == 'prediction_generator':
+        return get_prediction_generator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
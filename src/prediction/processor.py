@@ -1,10 +1,18 @@
 """Dataset processing for financial QA predictions."""
 
 import json
-import os
-from typing import List, Dict, Any, Optional
-from src.prediction.generator import prediction_generator
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Sized, Tuple
+from src.data.corpus import PromptCorpus
+from src.data.formatter import ConversationHistoryBuilder
+from src.data.reader import iter_items
+from src.prediction.checkpoint import CheckpointJournal
+from src.prediction.generator import PredictionGenerator, get_prediction_generator
+from src.prediction.writer import ResultWriter, create_result_writer
 from src.utils.logging_config import get_logger
+from src.utils.metrics import TurnMetricsWriter, format_summary, track_calls, turn_record
+from src.utils.validation import validate_data_structure
 from config.settings import config
 
 logger = get_logger(__name__)
@@ -13,75 +21,143 @@ logger = get_logger(__name__)
 class DatasetProcessor:
     """Handles processing of financial QA datasets."""
     
-    def __init__(self):
-        """Initialize the dataset processor."""
-        self.generator = prediction_generator
+    def __init__(self, generator: Optional[PredictionGenerator] = None):
+        """Initialize the dataset processor.
+        
+        Args:
+            generator: Prediction generator (uses the shared generator from
+                       get_prediction_generator if None)
+        """
+        self._generator = generator
+    
+    @property
+    def generator(self) -> PredictionGenerator:
+        """Prediction generator used for every turn."""
+        if self._generator is None:
+            self._generator = get_prediction_generator()
+        return self._generator
+    
+    @generator.setter
+    def generator(self, generator: PredictionGenerator) -> None:
+        self._generator = generator
     
     def process_dataset(
         self,
         input_file: str,
         output_file: str,
-        max_items: Optional[int] = None
+        max_items: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        resume: bool = False,
+        output_format: Optional[str] = None,
+        corpus_file: Optional[str] = None
     ) -> Dict[str, Any]:
         """Process the entire dataset and generate predictions.
         
+        Completed items are appended to a checkpoint journal next to the
+        output file as they finish. The journal is removed after a run
+        without failed turns and kept otherwise (e.g. when the API quota ran
+        out). With resume=True, items already in the journal are restored
+        instead of being predicted again. With a
+        corpus_file compiled by build_corpus.py, prompt contexts are read
+        from the corpus instead of being formatted during the run. API call
+        metrics of every turn are written next to the output file, see
+        TurnMetricsWriter.
+        
         Args:
             input_file: Path to input JSON file
             output_file: Path to output JSON file
             max_items: Maximum number of items to process (None for all)
+            max_workers: Number of items processed concurrently
+                         (uses config.batch_size if None)
+            resume: Skip items completed by a previous interrupted run
+            output_format: 'json' or 'jsonl' (uses config.output_format if None)
+            corpus_file: Precompiled prompt corpus (None formats prompts on the fly)
             
         Returns:
             Dictionary with processing statistics
         """
+        max_workers = max_workers or config.batch_size
+        output_format = output_format or config.output_format
+        
         logger.info("Starting dataset processing")
         logger.info(f"Input file: {input_file}")
-        logger.info(f"Output file: {output_file}")
+        logger.info(f"Output file: {output_file} ({output_format})")
+        logger.info(f"Concurrent workers: {max_workers}")
         
         if max_items:
             logger.info(f"Processing only first {max_items} items")
         else:
             logger.info("Processing all items in dataset")
         
-        # Load and validate input data
+        # Items are read and validated lazily as they are processed
         data = self._load_input_data(input_file, max_items)
         
-        # Process each item
-        results, stats = self._process_items(data)
+        # Restore progress from an interrupted run
+        journal = CheckpointJournal(CheckpointJournal.path_for(output_file))
+        completed = journal.load() if resume else {}
+        if completed:
+            logger.info(f"Resuming: {len(completed)} items already completed")
+        journal.open(reset=not resume)
+        
+        corpus = self._open_corpus(corpus_file, input_file) if corpus_file else None
         
-        # Save results
-        self._save_results(results, output_file)
+        # Process each item, handing results to the writer in input order;
+        # the output file is only replaced once every item has been written
+        writer = create_result_writer(output_file, output_format, config.output_flush_interval)
+        metrics_writer = TurnMetricsWriter(output_file)
+        try:
+            _, stats = self._process_items(
+                data, max_workers, journal, completed, writer, corpus, metrics_writer
+            )
+            writer.close()
+        finally:
+            # Discards partial results if processing or saving failed
+            writer.abort()
+            journal.close()
+            call_metrics = metrics_writer.close()
+            if corpus is not None:
+                corpus.close()
+        
+        # The checkpoint is only needed while turns are failing
+        if stats['failed_predictions'] == 0:
+            journal.remove()
+        else:
+            logger.warning(
+                f"{stats['failed_predictions']} predictions failed; keeping checkpoint "
+                f"{journal.path} so --resume only retries the items with failed turns"
+            )
+        stats['call_metrics'] = call_metrics
         
         # Log final statistics
         self._log_final_stats(stats, output_file)
         
         return stats
     
-    def _load_input_data(self, input_file: str, max_items: Optional[int]) -> List[Dict]:
-        """Load and validate input data.
+    def _load_input_data(self, input_file: str, max_items: Optional[int]) -> Iterator[Dict]:
+        """Open the input data for incremental reading.
+        
+        Items are parsed and validated one at a time as the returned iterator
+        is consumed, and reading stops after max_items, so small runs do not
+        pay for parsing the whole file.
         
         Args:
-            input_file: Path to input JSON file
+            input_file: Path to input JSON or JSONL file
             max_items: Maximum number of items to process
             
         Returns:
-            List of data items
+            Iterator over data items
             
         Raises:
             FileNotFoundError: If input file doesn't exist
             json.JSONDecodeError: If input file is not valid JSON
+            ValueError: If an item is malformed
         """
+        items = iter_items(input_file, max_items, validator=validate_data_structure)
+        
         try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            logger.info(f"Successfully loaded {len(data)} items from input file")
-            
-            # Limit to first n items if specified
-            if max_items and max_items > 0:
-                original_count = len(data)
-                data = data[:max_items]
-                logger.info(f"Limited dataset from {original_count} to {len(data)} items")
-            
-            return data
+            for item in items:
+                yield item
+            logger.info(f"Finished reading input file {input_file}")
             
         except FileNotFoundError:
             logger.error(f"Input file {input_file} not found")
@@ -93,29 +169,84 @@ class DatasetProcessor:
             logger.error(f"Failed to load input file: {e}")
             raise
     
-    def _process_items(self, data: List[Dict]) -> tuple[List[Dict], Dict[str, Any]]:
+    def _open_corpus(self, corpus_file: str, input_file: str) -> Optional[PromptCorpus]:
+        """Open a precompiled prompt corpus if it belongs to the input file.
+        
+        Args:
+            corpus_file: Path to the corpus written by build_corpus
+            input_file: Path to the dataset being processed
+            
+        Returns:
+            The opened corpus, or None if it is missing, incompatible, or
+            was built from a different input file or table format
+        """
+        try:
+            corpus = PromptCorpus(corpus_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot use prompt corpus {corpus_file}: {e}; formatting prompts on the fly")
+            return None
+        
+        if not corpus.matches_source(input_file):
+            logger.warning(
+                f"Prompt corpus {corpus_file} was not built from the current {input_file}; "
+                f"formatting prompts on the fly"
+            )
+            corpus.close()
+            return None
+        if corpus.table_format != config.table_format:
+            logger.warning(
+                f"Prompt corpus {corpus_file} uses table format '{corpus.table_format}', "
+                f"not '{config.table_format}'; formatting prompts on the fly"
+            )
+            corpus.close()
+            return None
+        return corpus
+    
+    def _process_items(
+        self,
+        data: Iterable[Dict],
+        max_workers: int = 1,
+        journal: Optional[CheckpointJournal] = None,
+        completed: Optional[Dict[str, Dict[str, Any]]] = None,
+        writer: Optional[ResultWriter] = None,
+        corpus: Optional[PromptCorpus] = None,
+        metrics_writer: Optional[TurnMetricsWriter] = None
+    ) -> tuple[List[Dict], Dict[str, Any]]:
         """Process all items in the dataset.
         
         Args:
-            data: List of data items to process
+            data: Data items to process (a list or a lazy iterator)
+            max_workers: Number of items processed concurrently
+            journal: Checkpoint journal receiving each completed item
+            completed: Items restored from a checkpoint, keyed by item id
+            writer: Result writer receiving items in input order; when given,
+                    results are streamed to it instead of being returned
+            corpus: Precompiled prompts, looked up by item id
+            metrics_writer: Receives the call metrics of each predicted turn
             
         Returns:
             Tuple of (results, statistics)
         """
         results = []
+        total_items = 0
         total_turns = 0
         successful_predictions = 0
         failed_predictions = 0
         
-        for item_idx, item in enumerate(data):
-            item_id = item.get('id', f'item_{item_idx}')
-            logger.info(f"Processing item {item_idx + 1}/{len(data)}: {item_id}")
+        outcomes = self._iter_item_outcomes(data, max_workers, journal, completed or {}, corpus)
+        for item_idx, (result_item, item_stats) in enumerate(outcomes):
+            if writer is not None:
+                writer.write(result_item)
+            else:
+                results.append(result_item)
             
-            # Process item
-            result_item, item_stats = self._process_single_item(item, item_idx)
-            results.append(result_item)
+            # Items restored from a checkpoint made no calls in this run
+            turn_metrics = item_stats.get('turn_metrics', [])
+            if metrics_writer is not None and turn_metrics:
+                metrics_writer.write(turn_metrics)
             
             # Update statistics
+            total_items += 1
             total_turns += item_stats['turns']
             successful_predictions += item_stats['successful']
             failed_predictions += item_stats['failed']
@@ -123,7 +254,7 @@ class DatasetProcessor:
             logger.info(f"✓ Item {item_idx + 1} completed")
         
         stats = {
-            'total_items': len(results),
+            'total_items': total_items,
             'total_turns': total_turns,
             'successful_predictions': successful_predictions,
             'failed_predictions': failed_predictions,
@@ -132,38 +263,132 @@ class DatasetProcessor:
         
         return results, stats
     
-    def _process_single_item(self, item: Dict, item_idx: int) -> tuple[Dict, Dict[str, Any]]:
+    def _iter_item_outcomes(
+        self,
+        data: Iterable[Dict],
+        max_workers: int,
+        journal: Optional[CheckpointJournal] = None,
+        completed: Optional[Dict[str, Dict[str, Any]]] = None,
+        corpus: Optional[PromptCorpus] = None
+    ) -> Iterator[Tuple[Dict, Dict[str, Any]]]:
+        """Process items, running up to max_workers items at the same time.
+        
+        Turns inside a conversation stay sequential because each one depends
+        on the history of the previous turns; only whole items run in parallel.
+        Outcomes are yielded in input order regardless of completion order.
+        At most 2 * max_workers items are submitted ahead of the one being
+        yielded, so finished results do not pile up in memory.
+        
+        Args:
+            data: Data items to process (a list or a lazy iterator)
+            max_workers: Number of items processed concurrently
+            journal: Checkpoint journal receiving each completed item
+            completed: Items restored from a checkpoint, keyed by item id
+            corpus: Precompiled prompts, looked up by item id
+            
+        Yields:
+            Tuple of (processed_item, item_statistics) for each item
+        """
+        completed = completed or {}
+        # The total is unknown while the input is still being read
+        total = f"/{len(data)}" if isinstance(data, Sized) else ""
+        
+        def run(item_idx: int, item: Dict) -> Tuple[Dict, Dict[str, Any]]:
+            item_id = item.get('id', f'item_{item_idx}')
+            if item_id in completed:
+                logger.info(f"Skipping item {item_idx + 1}{total}: {item_id} (restored from checkpoint)")
+                return completed[item_id]['item'], completed[item_id]['stats']
+            
+            logger.info(f"Processing item {item_idx + 1}{total}: {item_id}")
+            result_item, item_stats = self._process_single_item(item, item_idx, corpus)
+            
+            # Items with failed turns are left out so a resumed run retries them
+            if journal is not None:
+                if item_stats['failed'] == 0:
+                    checkpoint_stats = {k: v for k, v in item_stats.items() if k != 'turn_metrics'}
+                    journal.record(item_id, result_item, checkpoint_stats)
+                else:
+                    logger.warning(f"Item {item_id} has failed turns; not checkpointed")
+            return result_item, item_stats
+        
+        if max_workers <= 1:
+            yield from (run(item_idx, item) for item_idx, item in enumerate(data))
+            return
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for item_idx, item in enumerate(data):
+                pending.append(executor.submit(run, item_idx, item))
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _process_single_item(
+        self,
+        item: Dict,
+        item_idx: int,
+        corpus: Optional[PromptCorpus] = None
+    ) -> tuple[Dict, Dict[str, Any]]:
         """Process a single item with its conversation turns.
         
         Args:
             item: Data item to process
             item_idx: Item index for logging
+            corpus: Precompiled prompts, looked up by item id
             
         Returns:
-            Tuple of (processed_item, item_statistics)
+            Tuple of (processed_item, item_statistics); the statistics
+            include the call metrics record of every turn
         """
         financial_report = item['financial_report']
         conversation = item['conversation']
         
         logger.info(f"  Item has {len(conversation)} conversation turns")
         
-        # Process each turn in the conversation
-        conversation_history = []
+        # Prebuilt prompt parts; the entry must cover every turn of the item
+        compiled = corpus.get(item.get('id')) if corpus is not None else None
+        if compiled is not None and compiled['turns'] != len(conversation):
+            logger.warning(f"  Corpus entry for {item.get('id')} does not match the item; formatting on the fly")
+            compiled = None
+        
+        # Process each turn in the conversation; the history text grows by
+        # one formatted turn at a time
+        history = ConversationHistoryBuilder()
         enhanced_conversation = []
+        turn_metrics = []
         successful = 0
         failed = 0
+        item_id = item.get('id', f'item_{item_idx}')
         
         for turn_idx, turn in enumerate(conversation):
             question = turn['question']
             logger.info(f"  Processing turn {turn_idx + 1}/{len(conversation)}: '{question[:50]}...'")
             
+            # Calls made for the turn, also when it fails
+            calls = []
+            success = False
             try:
                 # Generate prediction for current turn
-                prediction = self.generator.generate_prediction(
-                    financial_report=financial_report,
-                    conversation_history=conversation_history,
-                    current_question=question
-                )
+                prompt_parts = {'history_text': history.text}
+                if compiled is not None:
+                    prompt_parts['history_text'] = compiled['history'][turn_idx]
+                    # With retrieval the context depends on the question
+                    if not config.retrieval_enabled:
+                        prompt_parts['context'] = compiled['context']
+                with track_calls() as calls:
+                    prediction = self.generator.generate_prediction(
+                        financial_report=financial_report,
+                        conversation_history=history.turns,
+                        current_question=question,
+                        report_id=item.get('id'),
+                        **prompt_parts
+                    )
+                
+                # The generator reports API failures instead of raising
+                error = prediction.pop('error', None)
+                if error:
+                    raise RuntimeError(error)
                 
                 # Create enhanced turn with predictions
                 enhanced_turn = {
@@ -173,6 +398,7 @@ class DatasetProcessor:
                 
                 enhanced_conversation.append(enhanced_turn)
                 successful += 1
+                success = True
                 
                 logger.info(f"  ✓ Turn {turn_idx + 1} completed successfully")
                 logger.debug(f"    Program: {prediction['predicted_program']}")
@@ -190,8 +416,16 @@ class DatasetProcessor:
                 }
                 enhanced_conversation.append(enhanced_turn)
             
+            turn_metrics.append(turn_record(
+                calls,
+                question_id=f"{item_id}-{turn_idx}",
+                item_id=item_id,
+                turn=turn_idx,
+                success=success
+            ))
+            
             # Add current turn to history for next iterations
-            conversation_history.append(turn)
+            history.append(turn)
         
         # Create result item
         result_item = {
@@ -202,35 +436,12 @@ class DatasetProcessor:
         item_stats = {
             'turns': len(conversation),
             'successful': successful,
-            'failed': failed
+            'failed': failed,
+            'turn_metrics': turn_metrics
         }
         
         return result_item, item_stats
     
-    def _save_results(self, results: List[Dict], output_file: str) -> None:
-        """Save processing results to file.
-        
-        Args:
-            results: List of processed items
-            output_file: Path to output file
-            
-        Raises:
-            Exception: If saving fails
-        """
-        try:
-            # Ensure output directory exists
-            output_dir = os.path.dirname(output_file)
-            if output_dir:
-                os.makedirs(output_dir, exist_ok=True)
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-            logger.info(f"Successfully saved results to {output_file}")
-            
-        except Exception as e:
-            logger.error(f"Failed to save results: {e}")
-            raise
-    
     def _log_final_stats(self, stats: Dict[str, Any], output_file: str) -> None:
         """Log final processing statistics.
         
@@ -251,7 +462,31 @@ class DatasetProcessor:
         print(f"\nProcessing complete! Check logs for detailed information.")
         print(f"Processed {stats['total_items']} items with {stats['total_turns']} total turns")
         print(f"Success rate: {stats['success_rate']:.1f}%")
+        
+        if 'call_metrics' in stats:
+            for line in format_summary(stats['call_metrics']):
+                logger.info(line)
+                print(line)
+
+
+# Shared processor, created on first use by get_dataset_processor
+_dataset_processor: Optional[DatasetProcessor] = None
+
+
+def get_dataset_processor() -> DatasetProcessor:
+    """Get the shared dataset processor, creating it on first use.
+    
+    Returns:
+        The shared DatasetProcessor
+    """
+    global _dataset_processor
+    if _dataset_processor is None:
+        _dataset_processor = DatasetProcessor()
+    return _dataset_processor
 
 
-# Global processor instance
-dataset_processor = DatasetProcessor()
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    """Resolve the former dataset_processor global lazily."""
+    if name == 'dataset_processor':
+        return get_dataset_processor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
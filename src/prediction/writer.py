@@ -0,0 +1,164 @@
+"""Output writers for prediction results.
+
+Both writers write to a temporary file next to the output file and only
+rename it over the output file on close(), so a run that fails part way
+leaves the output of a previous run untouched. abort() discards the
+temporary file instead.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, TextIO, Union
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+OUTPUT_FORMATS = ('json', 'jsonl')
+
+
+class JsonResultWriter:
+    """Collects results and writes them as one pretty-printed JSON array on close."""
+
+    def __init__(self, output_file: str):
+        """Initialize the writer.
+
+        Args:
+            output_file: Path to output JSON file
+        """
+        self.output_file = output_file
+        self.temp_file = _temp_path_for(output_file)
+        self.count = 0
+        self._results: Optional[List[Dict[str, Any]]] = []
+
+    def write(self, result_item: Dict[str, Any]) -> None:
+        """Add a processed item.
+
+        Args:
+            result_item: Processed item with predictions
+        """
+        self._results.append(result_item)
+        self.count += 1
+
+    def close(self) -> None:
+        """Write all collected items to the output file.
+
+        Raises:
+            Exception: If saving fails
+        """
+        if self._results is None:
+            return
+        try:
+            _ensure_parent_dir(self.output_file)
+            with open(self.temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._results, f, indent=2, ensure_ascii=False)
+            os.replace(self.temp_file, self.output_file)
+            self._results = None
+            logger.info(f"Successfully saved results to {self.output_file}")
+
+        except Exception as e:
+            logger.error(f"Failed to save results: {e}")
+            _remove_quietly(self.temp_file)
+            raise
+
+    def abort(self) -> None:
+        """Discard the collected items without touching the output file."""
+        self._results = None
+
+
+class JsonlResultWriter:
+    """Streams results to a JSON Lines file, one item per line.
+
+    Memory use does not grow with the dataset: each item is written as soon
+    as it is handed over. The file is flushed every flush_interval items and
+    on close.
+    """
+
+    def __init__(self, output_file: str, flush_interval: int = 1):
+        """Open the output file.
+
+        Args:
+            output_file: Path to output JSONL file
+            flush_interval: Number of items between flushes
+        """
+        self.output_file = output_file
+        self.temp_file = _temp_path_for(output_file)
+        self.flush_interval = max(1, flush_interval)
+        self.count = 0
+
+        _ensure_parent_dir(output_file)
+        self._file: Optional[TextIO] = open(self.temp_file, 'w', encoding='utf-8')
+
+    def write(self, result_item: Dict[str, Any]) -> None:
+        """Write a processed item as one line.
+
+        Args:
+            result_item: Processed item with predictions
+        """
+        self._file.write(json.dumps(result_item, ensure_ascii=False) + "\n")
+        self.count += 1
+        if self.count % self.flush_interval == 0:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the file and move it to the output path."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.replace(self.temp_file, self.output_file)
+            logger.info(f"Successfully saved {self.count} results to {self.output_file}")
+
+    def abort(self) -> None:
+        """Close and delete the partial file without touching the output file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            _remove_quietly(self.temp_file)
+            logger.warning(f"Discarded {self.count} unsaved results for {self.output_file}")
+
+
+ResultWriter = Union[JsonResultWriter, JsonlResultWriter]
+
+
+def create_result_writer(
+    output_file: str,
+    output_format: str,
+    flush_interval: int = 1
+) -> ResultWriter:
+    """Create a writer for the given output format.
+
+    Args:
+        output_file: Path to output file
+        output_format: 'json' (single array) or 'jsonl' (one item per line)
+        flush_interval: Number of items between flushes for JSONL output
+
+    Returns:
+        JsonResultWriter or JsonlResultWriter
+
+    Raises:
+        ValueError: If output_format is not supported
+    """
+    if output_format == 'json':
+        return JsonResultWriter(output_file)
+    if output_format == 'jsonl':
+        return JsonlResultWriter(output_file, flush_interval)
+    raise ValueError(f"Unsupported output format: {output_format} (expected one of {OUTPUT_FORMATS})")
+
+
+def _temp_path_for(output_file: str) -> str:
+    """Path of the temporary file written before output_file is replaced."""
+    return f"{output_file}.tmp"
+
+
+def _remove_quietly(path: str) -> None:
+    """Delete a file, ignoring errors."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _ensure_parent_dir(path: str) -> None:
+    """Create the directory containing path if needed."""
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
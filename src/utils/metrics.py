@@ -0,0 +1,275 @@
+"""Per-call API metrics, collected per turn and aggregated per run."""
+
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds of the histogram buckets for each per-turn metric
+SECONDS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+TOKEN_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000)
+RETRY_BUCKETS = (0, 1, 2, 3, 5)
+
+HISTOGRAM_BUCKETS = {
+    'queue_wait_s': SECONDS_BUCKETS,
+    'latency_s': SECONDS_BUCKETS,
+    'prompt_tokens': TOKEN_BUCKETS,
+    'completion_tokens': TOKEN_BUCKETS,
+    'retries': RETRY_BUCKETS
+}
+
+
+@dataclass
+class CallMetrics:
+    """Measurements of one chat completion call, summed over its attempts."""
+
+    queue_wait: float = 0.0  # seconds waiting for the rate limiter
+    latency: float = 0.0  # seconds spent in API requests
+    prompt_tokens: int = 0  # as reported in response.usage
+    completion_tokens: int = 0
+    attempts: int = 0  # API requests sent (0 for a cache hit)
+    cache_hit: bool = False
+    error: Optional[str] = None
+
+    @property
+    def retries(self) -> int:
+        """Number of attempts after the first."""
+        return max(0, self.attempts - 1)
+
+
+# Calls made in the current turn; set by track_calls, per thread and per task
+_current_calls: ContextVar[Optional[List[CallMetrics]]] = ContextVar('current_calls', default=None)
+
+
+@contextmanager
+def track_calls() -> Iterator[List[CallMetrics]]:
+    """Collect the metrics of every API call made inside the block.
+
+    Context variables are private to each thread and asyncio task, so
+    concurrent turns each collect only their own calls.
+
+    Yields:
+        List receiving one CallMetrics per call
+    """
+    calls: List[CallMetrics] = []
+    token = _current_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _current_calls.reset(token)
+
+
+def record_call(metrics: CallMetrics) -> None:
+    """Report a finished call to the enclosing track_calls block, if any.
+
+    Args:
+        metrics: Measurements of the call
+    """
+    calls = _current_calls.get()
+    if calls is not None:
+        calls.append(metrics)
+
+
+def turn_record(calls: Sequence[CallMetrics], **fields: Any) -> Dict[str, Any]:
+    """Build the metrics record of one turn.
+
+    Args:
+        calls: Calls made for the turn
+        **fields: Identifying fields (question_id, ...) put first
+
+    Returns:
+        Flat dictionary with the call metrics summed over the calls
+    """
+    return {
+        **fields,
+        'calls': len(calls),
+        'cache_hits': sum(1 for call in calls if call.cache_hit),
+        'queue_wait_s': round(sum(call.queue_wait for call in calls), 6),
+        'latency_s': round(sum(call.latency for call in calls), 6),
+        'prompt_tokens': sum(call.prompt_tokens for call in calls),
+        'completion_tokens': sum(call.completion_tokens for call in calls),
+        'retries': sum(call.retries for call in calls),
+        'errors': sum(1 for call in calls if call.error)
+    }
+
+
+def histogram(values: Sequence[float], bounds: Sequence[float]) -> Dict[str, Any]:
+    """Summarize values as bucket counts and percentiles.
+
+    Args:
+        values: Observed values
+        bounds: Upper bounds of the buckets, ascending
+
+    Returns:
+        Dictionary with count, mean, p50, p95, p99, max and buckets, where
+        buckets maps '<=bound' (and '>last') to the number of values
+    """
+    ordered = sorted(values)
+    buckets = {f"<={bound:g}": 0 for bound in bounds}
+    buckets[f">{bounds[-1]:g}"] = 0
+    for value in ordered:
+        label = next((f"<={bound:g}" for bound in bounds if value <= bound), f">{bounds[-1]:g}")
+        buckets[label] += 1
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+        'p50': _percentile(ordered, 50),
+        'p95': _percentile(ordered, 95),
+        'p99': _percentile(ordered, 99),
+        'max': ordered[-1] if ordered else 0.0,
+        'buckets': buckets
+    }
+
+
+def _percentile(ordered: Sequence[float], pct: float) -> float:
+    """Get a nearest-rank percentile of sorted values (0.0 if empty)."""
+    if not ordered:
+        return 0.0
+    return ordered[max(1, math.ceil(len(ordered) * pct / 100)) - 1]
+
+
+class TurnMetricsAggregate:
+    """Running totals of per-turn records, summarized without keeping them.
+
+    Only the values of the histogram metrics are kept, for the percentiles.
+    Histograms only cover turns that sent at least one API request, so
+    cache hits and turns settled without the LLM do not dilute them.
+    """
+
+    # Counters summed over all turns
+    TOTALS = ('calls', 'cache_hits', 'retries', 'errors', 'prompt_tokens', 'completion_tokens')
+
+    def __init__(self):
+        """Initialize empty totals."""
+        self.turns = 0
+        self.turns_with_requests = 0
+        self.totals = dict.fromkeys(self.TOTALS, 0)
+        self.values: Dict[str, List[float]] = {name: [] for name in HISTOGRAM_BUCKETS}
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Add one record built by turn_record."""
+        self.turns += 1
+        for name in self.TOTALS:
+            self.totals[name] += record[name]
+        if record['calls'] > record['cache_hits']:
+            self.turns_with_requests += 1
+            for name, values in self.values.items():
+                values.append(record[name])
+
+    def summary(self) -> Dict[str, Any]:
+        """Get the run totals and histograms.
+
+        Returns:
+            Dictionary with turn, call, cache hit, retry and error counts,
+            token totals and a histogram per metric
+        """
+        calls = self.totals['calls']
+        cache_hits = self.totals['cache_hits']
+        return {
+            'turns': self.turns,
+            'turns_with_requests': self.turns_with_requests,
+            'calls': calls,
+            'cache_hits': cache_hits,
+            'cache_hit_rate': cache_hits / calls if calls else 0.0,
+            'retries': self.totals['retries'],
+            'errors': self.totals['errors'],
+            'prompt_tokens': self.totals['prompt_tokens'],
+            'completion_tokens': self.totals['completion_tokens'],
+            'histograms': {
+                name: histogram(self.values[name], bounds)
+                for name, bounds in HISTOGRAM_BUCKETS.items()
+            }
+        }
+
+
+def summarize_turns(records: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate per-turn records into run totals and histograms.
+
+    Args:
+        records: Records built by turn_record
+
+    Returns:
+        Summary, see TurnMetricsAggregate.summary
+    """
+    aggregate = TurnMetricsAggregate()
+    for record in records:
+        aggregate.add(record)
+    return aggregate.summary()
+
+
+def format_summary(summary: Dict[str, Any]) -> List[str]:
+    """Format a summary from summarize_turns as human-readable lines."""
+    lines = [
+        f"API calls: {summary['calls']} for {summary['turns']} turns "
+        f"({summary['cache_hits']} cache hits, {summary['cache_hit_rate']:.1%}; "
+        f"{summary['retries']} retries; {summary['errors']} errors)",
+        f"Tokens: {summary['prompt_tokens']} prompt, {summary['completion_tokens']} completion"
+    ]
+    for name, hist in summary['histograms'].items():
+        if hist['count']:
+            lines.append(
+                f"{name}: p50 {hist['p50']:g} | p95 {hist['p95']:g} | p99 {hist['p99']:g} | "
+                f"max {hist['max']:g} (n={hist['count']})"
+            )
+    return lines
+
+
+class TurnMetricsWriter:
+    """Writes per-turn metrics records next to a results file.
+
+    Records are appended to '<results>_metrics.jsonl' as they arrive and
+    only their running aggregate is kept in memory; close() writes its
+    summary to '<results>_metrics_summary.json'. Safe to use from several
+    threads.
+    """
+
+    def __init__(self, results_file: str):
+        """Open the records file, replacing a previous one.
+
+        Args:
+            results_file: Predictions or evaluation results file the
+                          metrics belong to
+        """
+        self.records_path, self.summary_path = self.paths_for(results_file)
+        self.aggregate = TurnMetricsAggregate()
+        self._lock = threading.Lock()
+        self._file = open(self.records_path, 'w', encoding='utf-8')
+
+    @staticmethod
+    def paths_for(results_file: str) -> Tuple[str, str]:
+        """Get the (records, summary) paths belonging to a results file."""
+        base = os.path.splitext(results_file)[0]
+        return f"{base}_metrics.jsonl", f"{base}_metrics_summary.json"
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append turn records.
+
+        Args:
+            records: Records built by turn_record
+        """
+        with self._lock:
+            for record in records:
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self.aggregate.add(record)
+            self._file.flush()
+
+    def close(self) -> Dict[str, Any]:
+        """Close the records file and write the summary.
+
+        Returns:
+            Summary of all written records, see summarize_turns
+        """
+        with self._lock:
+            self._file.close()
+            summary = self.aggregate.summary()
+        with open(self.summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Call metrics saved to: {self.records_path}")
+        return summary
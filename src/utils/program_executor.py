@@ -0,0 +1,232 @@
+"""Interpreter for ConvFinQA calculation programs."""
+
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Parsed expression: a number, a ('ref', step) back-reference or an
+# (operation, args) call
+Expression = Union[float, Tuple[str, object]]
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<ref>\#\d+)
+      | (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?%?)
+      | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+      | (?P<punct>[(),])
+    )""", re.VERBOSE)
+
+_CONST_PATTERN = re.compile(r"const_(m?)(\d+(?:_\d+)?)")
+
+# Deepest nesting of calls inside one step; real programs nest a few levels,
+# and deeper input would exhaust the interpreter's recursion limit
+MAX_NESTING_DEPTH = 32
+
+
+class ProgramError(ValueError):
+    """Raised when a program cannot be parsed or evaluated."""
+
+
+def _divide(a: float, b: float) -> float:
+    """Divide a by b, rejecting division by zero."""
+    if b == 0:
+        raise ProgramError("Division by zero")
+    return a / b
+
+
+def _exp(a: float, b: float) -> float:
+    """Raise a to the power b."""
+    try:
+        return math.pow(a, b)
+    except (OverflowError, ValueError) as e:
+        raise ProgramError(f"Invalid exponentiation exp({a}, {b}): {e}") from e
+
+
+OPERATIONS: Dict[str, Callable[[float, float], float]] = {
+    'add': operator.add,
+    'subtract': operator.sub,
+    'multiply': operator.mul,
+    'divide': _divide,
+    'exp': _exp,
+    'greater': lambda a, b: 1.0 if a > b else 0.0,
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_program(program: str) -> Tuple[Expression, ...]:
+    """Parse a program into its steps.
+
+    A program is a comma-separated list of steps such as
+    "subtract(206588, 181001), divide(#0, 181001)". Arguments may be
+    numbers (optionally with a trailing '%'), constants like const_100 or
+    const_m1, '#n' references to the result of step n, or nested calls
+    (at most MAX_NESTING_DEPTH deep).
+
+    Args:
+        program: Program string
+
+    Returns:
+        Tuple of parsed steps
+
+    Raises:
+        ProgramError: If the program is empty, malformed or nested too deeply
+    """
+    tokens = _tokenize(program)
+    if not tokens:
+        raise ProgramError("Empty program")
+
+    steps = []
+    pos = 0
+    while True:
+        expression, pos = _parse_expression(tokens, pos)
+        steps.append(expression)
+        if pos == len(tokens):
+            return tuple(steps)
+        if tokens[pos] != ('punct', ','):
+            raise ProgramError(f"Expected ',' between steps, got {tokens[pos][1]!r}")
+        pos += 1
+
+
+@lru_cache(maxsize=4096)
+def execute_program(program: str) -> float:
+    """Evaluate a program and return the result of its last step.
+
+    Results are cached per program string, so re-checking the same program
+    (e.g. across conversation turns or evaluation runs) costs nothing.
+
+    Args:
+        program: Program string
+
+    Returns:
+        Numerical result; greater() yields 1.0 for true and 0.0 for false
+
+    Raises:
+        ProgramError: If the program is malformed, uses an unknown operation,
+                      references a later step or divides by zero
+    """
+    results: List[float] = []
+    for step in parse_program(program):
+        results.append(_evaluate(step, results))
+    return results[-1]
+
+
+def try_execute_program(program: str) -> Optional[float]:
+    """Evaluate a program, returning None instead of raising.
+
+    Args:
+        program: Program string
+
+    Returns:
+        Numerical result, or None if the program cannot be executed
+        (including values that are not strings)
+    """
+    if not isinstance(program, str) or not program.strip():
+        return None
+    try:
+        return execute_program(program)
+    except ProgramError as e:
+        logger.debug(f"Could not execute program '{program}': {e}")
+        return None
+
+
+def _tokenize(program: str) -> List[Tuple[str, str]]:
+    """Split a program into (kind, text) tokens."""
+    tokens = []
+    pos = 0
+    program = program.rstrip()
+    while pos < len(program):
+        match = _TOKEN_PATTERN.match(program, pos)
+        if not match or match.end() == pos:
+            raise ProgramError(f"Unexpected character {program[pos]!r} at position {pos}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def _parse_expression(tokens: List[Tuple[str, str]], pos: int, depth: int = 0) -> Tuple[Expression, int]:
+    """Parse one expression starting at tokens[pos].
+
+    Args:
+        tokens: Tokens of the program
+        pos: Position of the expression
+        depth: Number of calls the expression is nested in
+
+    Returns:
+        Tuple of (expression, position after it)
+    """
+    if depth > MAX_NESTING_DEPTH:
+        raise ProgramError(f"Calls nested more than {MAX_NESTING_DEPTH} deep")
+    if pos >= len(tokens):
+        raise ProgramError("Unexpected end of program")
+
+    kind, text = tokens[pos]
+    if kind == 'number':
+        return _parse_number(text), pos + 1
+    if kind == 'ref':
+        return ('ref', int(text[1:])), pos + 1
+    if kind != 'name':
+        raise ProgramError(f"Unexpected {text!r}")
+
+    if text.startswith('const_'):
+        return _parse_const(text), pos + 1
+
+    if text not in OPERATIONS:
+        raise ProgramError(f"Unsupported operation '{text}'")
+    if pos + 1 >= len(tokens) or tokens[pos + 1] != ('punct', '('):
+        raise ProgramError(f"Expected '(' after '{text}'")
+
+    args = []
+    pos += 2
+    while True:
+        arg, pos = _parse_expression(tokens, pos, depth + 1)
+        args.append(arg)
+        if pos >= len(tokens):
+            raise ProgramError(f"Unclosed call to '{text}'")
+        if tokens[pos] == ('punct', ')'):
+            pos += 1
+            break
+        if tokens[pos] != ('punct', ','):
+            raise ProgramError(f"Expected ',' or ')' in call to '{text}'")
+        pos += 1
+
+    if len(args) != 2:
+        raise ProgramError(f"'{text}' takes 2 arguments, got {len(args)}")
+    return (text, tuple(args)), pos
+
+
+def _parse_number(text: str) -> float:
+    """Convert a numeric token, treating a trailing '%' as a percentage."""
+    if text.endswith('%'):
+        return float(text[:-1]) / 100
+    return float(text)
+
+
+def _parse_const(text: str) -> float:
+    """Convert a constant such as const_100 or const_m1."""
+    match = _CONST_PATTERN.fullmatch(text)
+    if not match:
+        raise ProgramError(f"Unknown constant '{text}'")
+    sign, digits = match.groups()
+    value = float(digits.replace('_', '.'))
+    return -value if sign else value
+
+
+def _evaluate(expression: Expression, results: List[float]) -> float:
+    """Evaluate an expression given the results of earlier steps."""
+    if isinstance(expression, float):
+        return expression
+
+    kind, payload = expression
+    if kind == 'ref':
+        if payload >= len(results):
+            raise ProgramError(f"Reference #{payload} points to a step that has not run yet")
+        return results[payload]
+
+    a, b = (_evaluate(arg, results) for arg in payload)
+    return OPERATIONS[kind](a, b)
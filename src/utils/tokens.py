@@ -0,0 +1,137 @@
+"""Token estimation utilities."""
+
+import threading
+from typing import Any, Dict, List, Optional
+from src.utils.logging_config import get_logger
+from config.settings import config
+
+logger = get_logger(__name__)
+
+# Average characters per token for English prose and numbers
+CHARS_PER_TOKEN = 4
+
+# Fixed per-message overhead of the chat format (role, separators)
+TOKENS_PER_MESSAGE = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimate the number of prompt tokens for a list of chat messages.
+
+    Args:
+        messages: List of message dictionaries with 'role' and 'content'
+
+    Returns:
+        Estimated prompt token count
+    """
+    return sum(
+        TOKENS_PER_MESSAGE + estimate_tokens(message.get('content') or '')
+        for message in messages
+    )
+
+
+_encoding: Optional[Any] = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of a text with the model's tokenizer.
+
+    Uses the tiktoken encoding named by config.token_encoding. When tiktoken
+    is not installed or the encoding is not in the local tiktoken cache
+    (it is only downloaded with config.token_encoding_download), falls back
+    to estimate_tokens.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Token count
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Count the prompt tokens for a list of chat messages.
+
+    Args:
+        messages: List of message dictionaries with 'role' and 'content'
+
+    Returns:
+        Prompt token count
+    """
+    return sum(
+        TOKENS_PER_MESSAGE + count_tokens(message.get('content') or '')
+        for message in messages
+    )
+
+
+def tokenizer_available() -> bool:
+    """Check whether count_tokens uses the tokenizer or the estimate."""
+    return _get_encoding() is not None
+
+
+def _get_encoding() -> Optional[Any]:
+    """Load the tiktoken encoding once; None if it is unavailable."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    _encoding = _load_encoding(config.token_encoding)
+                except Exception as e:
+                    logger.warning(
+                        f"Tokenizer '{config.token_encoding}' unavailable ({e}); "
+                        f"estimating {CHARS_PER_TOKEN} characters per token"
+                    )
+                _encoding_loaded = True
+    return _encoding
+
+
+def _load_encoding(name: str) -> Any:
+    """Load a tiktoken encoding, from the local cache only unless downloads are enabled.
+
+    tiktoken fetches encodings it has not cached yet over HTTP, which would
+    stall the first prompt on hosts without network access.
+
+    Raises:
+        ImportError: If tiktoken is not installed
+        FileNotFoundError: If the encoding is not cached and downloads are disabled
+    """
+    import tiktoken
+    if config.token_encoding_download:
+        return tiktoken.get_encoding(name)
+
+    from tiktoken import load
+    read_file = load.read_file
+
+    def read_local_file(blobpath: str) -> bytes:
+        if '://' in blobpath:
+            raise FileNotFoundError(f"{blobpath} is not cached locally and downloads are disabled")
+        return read_file(blobpath)
+
+    # tiktoken only calls read_file for files missing from its cache
+    load.read_file = read_local_file
+    try:
+        return tiktoken.get_encoding(name)
+    finally:
+        load.read_file = read_file
@@ -4,6 +4,7 @@ import os
 import json
 from typing import List
 from config.settings import config
+from src.data.reader import iter_items
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -28,12 +29,16 @@ def validate_environment() -> None:
 def validate_input_file(file_path: str) -> None:
     """Validate that input file exists and is readable.
     
+    Only the start of the file is parsed, so this stays cheap for large
+    datasets; item structure is checked while the dataset is processed.
+    
     Args:
-        file_path: Path to input file
+        file_path: Path to input file (JSON array or JSON Lines)
         
     Raises:
         FileNotFoundError: If input file doesn't exist
         json.JSONDecodeError: If input file is not valid JSON
+        ValueError: If the file is not a JSON array or is empty
     """
     if not os.path.exists(file_path):
         logger.error(f"Input file {file_path} not found")
@@ -43,18 +48,14 @@ def validate_input_file(file_path: str) -> None:
     
     logger.info(f"Input file found: {file_path}")
     
-    # Validate JSON format
+    # Validate JSON format by reading the first item
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if not isinstance(data, list):
-            raise ValueError("Input file must contain a JSON array")
+        first_items = list(iter_items(file_path, max_items=1))
         
-        if len(data) == 0:
+        if not first_items:
             raise ValueError("Input file contains no data")
         
-        logger.info(f"Input file validation passed: {len(data)} items found")
+        logger.info("Input file validation passed")
         
     except json.JSONDecodeError as e:
         logger.error(f"Input file is not valid JSON: {e}")
@@ -0,0 +1,43 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+
+
+@pytest.fixture
+def make_item():
+    """Factory for ConvFinQA items with the given number of turns.
+
+    By default turns carry expected values only, as in the input dataset.
+    With predictions=True every turn also carries a prediction the rule
+    judge cannot settle (-100 for an expected 100), so it reaches the LLM
+    judge. With table=True the report also has a table and post-text.
+    """
+    def make(item_id, num_turns=2, predictions=False, table=False):
+        financial_report = {'pre_text': [f'Report {item_id}']}
+        if table:
+            financial_report['table'] = [['Year', '2009', '2008'], ['Revenue', '$1,200', '(300)']]
+            financial_report['post_text'] = ['End of report.']
+
+        if predictions:
+            conversation = [
+                {
+                    'question': f'{item_id} question {turn_idx}',
+                    'expected_answer': 100.0,
+                    'predicted_answer': -100.0,
+                    'expected_program': '100',
+                    'predicted_program': '-100'
+                }
+                for turn_idx in range(num_turns)
+            ]
+        else:
+            conversation = [
+                {
+                    'question': f'{item_id} question {turn_idx}',
+                    'expected_program': str(turn_idx),
+                    'expected_answer': float(turn_idx)
+                }
+                for turn_idx in range(num_turns)
+            ]
+
+        return {'id': item_id, 'financial_report': financial_report, 'conversation': conversation}
+    return make
@@ -1,10 +1,20 @@
 """Tests for src/api/azure_client.py"""
 
+import asyncio
+import httpx
+import openai
+import os
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import tempfile
+from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from openai import AzureOpenAI
 
-from src.api.azure_client import AzureOpenAIClient, azure_client
+from src.api import azure_client as azure_client_module
+from src.api.azure_client import (
+    AzureOpenAIClient, RateLimiter, TokenBucket, enable_response_cache, get_azure_client, set_azure_client
+)
+from src.api.cache import ResponseCache
+from src.utils.metrics import track_calls
 
 
 class TestAzureOpenAIClient:
@@ -21,25 +31,30 @@ class TestAzureOpenAIClient:
         mock_config.azure_openai.api_version = '2024-02-01'
         mock_config.azure_openai.deployment_name = 'test-deployment'
         
-        # Create client
+        # Create client; the SDK client is only built on first use
         client = AzureOpenAIClient()
+        mock_config.azure_openai.validate.assert_not_called()
+        mock_azure_openai.assert_not_called()
         
         # Verify initialization
+        assert client.client == mock_azure_openai.return_value
+        assert client.client == mock_azure_openai.return_value
         mock_config.azure_openai.validate.assert_called_once()
         mock_azure_openai.assert_called_once_with(
             api_key='test-key',
             azure_endpoint='https://test.openai.azure.com',
-            api_version='2024-02-01'
+            api_version='2024-02-01',
+            max_retries=0
         )
-        assert client.client == mock_azure_openai.return_value
     
     @patch('src.api.azure_client.config')
     def test_init_validation_failure(self, mock_config):
-        """Test initialization with validation failure."""
+        """Test that invalid configuration fails on first use, not construction."""
         mock_config.azure_openai.validate.side_effect = ValueError("Missing API key")
         
+        client = AzureOpenAIClient()
         with pytest.raises(ValueError, match="Missing API key"):
-            AzureOpenAIClient()
+            client.client
     
     @patch('src.api.azure_client.config')
     @patch('src.api.azure_client.AzureOpenAI')
@@ -199,19 +214,485 @@ class TestAzureOpenAIClient:
         assert result == 'response with whitespace'
 
 
+
+class TestAsyncAzureOpenAIClient:
+    """Test cases for the async AzureOpenAIClient API."""
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AsyncAzureOpenAI')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_acreate_chat_completion_success(self, mock_azure_openai, mock_async_azure_openai, mock_config):
+        """Test successful async chat completion."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.azure_openai.deployment_name = 'test-deployment'
+        mock_config.max_tokens = 1000
+        mock_config.temperature = 0.1
+        mock_config.max_connections = 10
+        mock_config.max_keepalive_connections = 5
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = ' {"answer": 42} '
+        
+        mock_async_client = Mock()
+        mock_async_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        mock_async_azure_openai.return_value = mock_async_client
+        
+        client = AzureOpenAIClient()
+        messages = [{"role": "user", "content": "test question"}]
+        result = asyncio.run(client.acreate_chat_completion(messages, json=True))
+        
+        assert result == '{"answer": 42}'
+        mock_async_client.chat.completions.create.assert_awaited_once_with(
+            messages=messages,
+            max_tokens=1000,
+            temperature=0.1,
+            model='test-deployment',
+            response_format={"type": "json_object"}
+        )
+        mock_azure_openai.return_value.chat.completions.create.assert_not_called()
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AsyncAzureOpenAI')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_async_client_shared_within_event_loop(self, mock_azure_openai, mock_async_azure_openai, mock_config):
+        """Test that concurrent calls on one loop share a single pooled client."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.max_connections = 10
+        mock_config.max_keepalive_connections = 5
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = 'ok'
+        mock_async_azure_openai.return_value.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+        
+        client = AzureOpenAIClient()
+        messages = [{"role": "user", "content": "test"}]
+        
+        async def run_many():
+            return await asyncio.gather(
+                *(client.acreate_chat_completion(messages) for _ in range(5))
+            )
+        
+        results = asyncio.run(run_many())
+        
+        assert results == ['ok'] * 5
+        mock_async_azure_openai.assert_called_once()
+        http_client = mock_async_azure_openai.call_args.kwargs['http_client']
+        assert http_client is not None
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AsyncAzureOpenAI')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_async_client_closed_with_its_event_loop(self, mock_azure_openai, mock_async_azure_openai, mock_config):
+        """Test that each event loop's client is closed before the loop ends."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.max_connections = 10
+        mock_config.max_keepalive_connections = 5
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = 'ok'
+        sdk_clients = []
+        
+        def make_sdk_client(**kwargs):
+            sdk_client = Mock()
+            sdk_client.chat.completions.create = AsyncMock(return_value=mock_response)
+            sdk_client.close = AsyncMock()
+            sdk_clients.append(sdk_client)
+            return sdk_client
+        
+        mock_async_azure_openai.side_effect = make_sdk_client
+        client = AzureOpenAIClient()
+        messages = [{"role": "user", "content": "test"}]
+        
+        asyncio.run(client.acreate_chat_completion(messages))
+        asyncio.run(client.acreate_chat_completion(messages))
+        
+        assert len(sdk_clients) == 2
+        for sdk_client in sdk_clients:
+            sdk_client.close.assert_awaited_once()
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AsyncAzureOpenAI')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_acreate_chat_completion_api_error(self, mock_azure_openai, mock_async_azure_openai, mock_config):
+        """Test async chat completion with API error."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.max_connections = 10
+        mock_config.max_keepalive_connections = 5
+        mock_async_azure_openai.return_value.chat.completions.create = AsyncMock(
+            side_effect=Exception("API Error")
+        )
+        
+        client = AzureOpenAIClient()
+        messages = [{"role": "user", "content": "test question"}]
+        
+        with pytest.raises(Exception, match="API Error"):
+            asyncio.run(client.acreate_chat_completion(messages))
+
+
+
+
+class TestAzureOpenAIClientCache:
+    """Test cases for the response cache in AzureOpenAIClient."""
+    
+    @pytest.fixture
+    def cache(self):
+        """Temporary response cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(os.path.join(temp_dir, 'responses.sqlite'), 10 ** 6)
+            yield cache
+            cache.close()
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_identical_request_served_from_cache(self, mock_azure_openai, mock_config, cache):
+        """Test that a repeated request does not call the API again."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.azure_openai.deployment_name = 'test-deployment'
+        mock_config.max_tokens = 1000
+        mock_config.temperature = 0.1
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = 'cached answer'
+        mock_client = mock_azure_openai.return_value
+        mock_client.chat.completions.create.return_value = mock_response
+        
+        client = AzureOpenAIClient(cache=cache)
+        messages = [{"role": "user", "content": "test question"}]
+        
+        assert client.create_chat_completion(messages) == 'cached answer'
+        assert client.create_chat_completion(messages) == 'cached answer'
+        
+        mock_client.chat.completions.create.assert_called_once()
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_different_parameters_miss_cache(self, mock_azure_openai, mock_config, cache):
+        """Test that requests differing in parameters are cached separately."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.azure_openai.deployment_name = 'test-deployment'
+        mock_config.max_tokens = 1000
+        mock_config.temperature = 0.1
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = '{}'
+        mock_client = mock_azure_openai.return_value
+        mock_client.chat.completions.create.return_value = mock_response
+        
+        client = AzureOpenAIClient(cache=cache)
+        messages = [{"role": "user", "content": "test question"}]
+        
+        client.create_chat_completion(messages)
+        client.create_chat_completion(messages, json=True)
+        client.create_chat_completion(messages, temperature=0.5)
+        
+        assert mock_client.chat.completions.create.call_count == 3
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AsyncAzureOpenAI')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_async_request_served_from_cache(self, mock_azure_openai, mock_async_azure_openai, mock_config, cache):
+        """Test that sync and async calls share the cache."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.azure_openai.deployment_name = 'test-deployment'
+        mock_config.max_tokens = 1000
+        mock_config.temperature = 0.1
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = 'shared'
+        mock_azure_openai.return_value.chat.completions.create.return_value = mock_response
+        mock_async_azure_openai.return_value.chat.completions.create = AsyncMock()
+        
+        client = AzureOpenAIClient(cache=cache)
+        messages = [{"role": "user", "content": "test question"}]
+        
+        client.create_chat_completion(messages)
+        result = asyncio.run(client.acreate_chat_completion(messages))
+        
+        assert result == 'shared'
+        mock_async_azure_openai.return_value.chat.completions.create.assert_not_awaited()
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket class."""
+    
+    def test_reserve_within_capacity(self):
+        """Test that reservations within capacity need no wait."""
+        bucket = TokenBucket(60)
+        now = bucket.updated_at
+        
+        assert bucket.reserve(30, now) == 0.0
+        assert bucket.reserve(30, now) == 0.0
+    
+    def test_reserve_beyond_capacity_returns_wait(self):
+        """Test that overdrawing the bucket returns the refill time."""
+        bucket = TokenBucket(60)  # refills 1 token per second
+        now = bucket.updated_at
+        
+        bucket.reserve(60, now)
+        wait = bucket.reserve(2, now)
+        
+        assert wait == pytest.approx(2.0)
+    
+    def test_refill_over_time(self):
+        """Test that tokens are replenished as time passes."""
+        bucket = TokenBucket(60)
+        now = bucket.updated_at
+        
+        bucket.reserve(60, now)
+        assert bucket.reserve(5, now + 5) == 0.0
+    
+    def test_refill_capped_at_capacity(self):
+        """Test that the bucket never exceeds its capacity."""
+        bucket = TokenBucket(60)
+        now = bucket.updated_at
+        
+        bucket.refund(100, now + 1000)
+        assert bucket.tokens == 60
+    
+    def test_refund_negative_amount(self):
+        """Test that a negative refund takes additional tokens."""
+        bucket = TokenBucket(60)
+        now = bucket.updated_at
+        
+        bucket.refund(-70, now)
+        assert bucket.reserve(0, now) == pytest.approx(10.0)
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter class."""
+    
+    def test_disabled_limiter(self):
+        """Test that a limiter without quotas never waits."""
+        limiter = RateLimiter()
+        
+        assert limiter.enabled is False
+        assert limiter.acquire(10 ** 9) == 0.0
+    
+    @patch('src.api.azure_client.time.sleep')
+    def test_requests_per_minute_limit(self, mock_sleep):
+        """Test that requests beyond the RPM quota are delayed."""
+        limiter = RateLimiter(requests_per_minute=2)
+        
+        assert limiter.acquire(0) == 0.0
+        assert limiter.acquire(0) == 0.0
+        wait = limiter.acquire(0)
+        
+        assert wait > 0
+        mock_sleep.assert_called_once_with(wait)
+    
+    @patch('src.api.azure_client.time.sleep')
+    def test_tokens_per_minute_limit(self, mock_sleep):
+        """Test that requests beyond the TPM quota are delayed."""
+        limiter = RateLimiter(tokens_per_minute=600)  # 10 tokens per second
+        
+        assert limiter.acquire(600) == 0.0
+        wait = limiter.acquire(100)
+        
+        assert wait == pytest.approx(10.0, rel=0.01)
+    
+    @patch('src.api.azure_client.time.sleep')
+    def test_record_usage_refunds_overestimate(self, mock_sleep):
+        """Test that actual usage below the estimate frees quota."""
+        limiter = RateLimiter(tokens_per_minute=600)
+        
+        limiter.acquire(600)
+        limiter.record_usage(estimated_tokens=600, actual_tokens=100)
+        
+        assert limiter.acquire(400) == 0.0
+        mock_sleep.assert_not_called()
+    
+    def test_aacquire_waits_asynchronously(self):
+        """Test async acquisition sleeps on the event loop."""
+        limiter = RateLimiter(requests_per_minute=6000)  # 100 per second
+        
+        async def acquire_twice():
+            await limiter.aacquire(0)
+            limiter.request_bucket.tokens = 0
+            return await limiter.aacquire(0)
+        
+        wait = asyncio.run(acquire_twice())
+        assert wait == pytest.approx(0.01, rel=0.1)
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_client_reserves_and_records_usage(self, mock_azure_openai, mock_config):
+        """Test that the client reserves quota and corrects it from usage."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.max_tokens = 100
+        mock_config.temperature = 0.1
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = 'ok'
+        mock_response.usage.total_tokens = 42
+        mock_azure_openai.return_value.chat.completions.create.return_value = mock_response
+        
+        client = AzureOpenAIClient()
+        client.rate_limiter = Mock()
+        client.create_chat_completion([{"role": "user", "content": "x" * 40}])
+        
+        estimated = client.rate_limiter.acquire.call_args[0][0]
+        assert estimated == 100 + 4 + 10
+        client.rate_limiter.record_usage.assert_called_once_with(estimated, 42)
+
+
+class TestCallMetrics:
+    """Test cases for the call metrics reported by AzureOpenAIClient."""
+    
+    @pytest.fixture
+    def mock_response(self):
+        """Chat completion response with token usage."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = 'ok'
+        mock_response.usage.prompt_tokens = 30
+        mock_response.usage.completion_tokens = 12
+        mock_response.usage.total_tokens = 42
+        return mock_response
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_usage_and_timing_recorded(self, mock_azure_openai, mock_config, mock_response):
+        """Test that a call reports its token usage and time."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.max_tokens = 100
+        mock_config.temperature = 0.1
+        mock_azure_openai.return_value.chat.completions.create.return_value = mock_response
+        
+        client = AzureOpenAIClient()
+        client.rate_limiter = RateLimiter(None, None)
+        with track_calls() as calls:
+            client.create_chat_completion([{"role": "user", "content": "test"}])
+        
+        assert len(calls) == 1
+        assert calls[0].prompt_tokens == 30
+        assert calls[0].completion_tokens == 12
+        assert calls[0].attempts == 1
+        assert calls[0].retries == 0
+        assert calls[0].latency > 0
+        assert calls[0].cache_hit is False
+    
+    @patch('src.api.retry.time.sleep')
+    @patch('src.api.retry.config')
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_retries_counted(self, mock_azure_openai, mock_config, mock_retry_config, mock_sleep, mock_response):
+        """Test that attempts after a transient error count as retries."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.max_tokens = 100
+        mock_config.temperature = 0.1
+        mock_retry_config.retry_attempts = 3
+        mock_retry_config.retry_delay = 1.0
+        mock_retry_config.retry_max_delay = 60.0
+        response = httpx.Response(503, request=httpx.Request('POST', 'https://test.openai.azure.com'))
+        mock_azure_openai.return_value.chat.completions.create.side_effect = [
+            openai.InternalServerError("HTTP 503", response=response, body=None),
+            mock_response
+        ]
+        
+        client = AzureOpenAIClient()
+        client.rate_limiter = RateLimiter(None, None)
+        with track_calls() as calls:
+            client.create_chat_completion([{"role": "user", "content": "test"}])
+        
+        assert calls[0].attempts == 2
+        assert calls[0].retries == 1
+        assert calls[0].error is None
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_failed_call_recorded(self, mock_azure_openai, mock_config):
+        """Test that a call failing for good is still reported."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.max_tokens = 100
+        mock_config.temperature = 0.1
+        mock_azure_openai.return_value.chat.completions.create.side_effect = ValueError("bad request")
+        
+        client = AzureOpenAIClient()
+        with track_calls() as calls:
+            with pytest.raises(ValueError):
+                client.create_chat_completion([{"role": "user", "content": "test"}])
+        
+        assert calls[0].error == "bad request"
+        assert calls[0].attempts == 1
+    
+    @patch('src.api.azure_client.config')
+    @patch('src.api.azure_client.AzureOpenAI')
+    def test_cache_hit_recorded(self, mock_azure_openai, mock_config, mock_response):
+        """Test that a cached response is reported as a cache hit without requests."""
+        mock_config.azure_openai.validate.return_value = None
+        mock_config.azure_openai.deployment_name = 'test-deployment'
+        mock_config.max_tokens = 100
+        mock_config.temperature = 0.1
+        mock_azure_openai.return_value.chat.completions.create.return_value = mock_response
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ResponseCache(os.path.join(temp_dir, 'responses.sqlite'), 10 ** 6)
+            client = AzureOpenAIClient(cache=cache)
+            messages = [{"role": "user", "content": "test"}]
+            with track_calls() as calls:
+                client.create_chat_completion(messages)
+                client.create_chat_completion(messages)
+            cache.close()
+        
+        assert [call.cache_hit for call in calls] == [False, True]
+        assert calls[1].attempts == 0
+        assert calls[1].prompt_tokens == 0
+
+
 class TestGlobalAzureClient:
-    """Test cases for global azure_client instance."""
+    """Test cases for the shared client created by get_azure_client."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_shared_client(self):
+        """Start and end every test without a shared client or cache."""
+        set_azure_client(None)
+        with patch.object(azure_client_module, '_response_cache', None):
+            yield
+        set_azure_client(None)
     
     def test_global_client_exists(self):
-        """Test that global azure_client instance exists."""
-        assert azure_client is not None
+        """Test that the shared client is created once, on first use."""
+        assert azure_client_module._azure_client is None
+        
+        azure_client = get_azure_client()
+        
         assert isinstance(azure_client, AzureOpenAIClient)
+        assert get_azure_client() is azure_client
+        assert azure_client_module.azure_client is azure_client
+    
+    def test_set_azure_client(self):
+        """Test that an injected client replaces the shared one."""
+        stub = Mock()
+        set_azure_client(stub)
+        
+        assert get_azure_client() is stub
+    
+    def test_enable_response_cache_before_first_use(self):
+        """Test that enabling the cache does not create the client."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = enable_response_cache(os.path.join(temp_dir, 'cache.db'))
+            
+            assert azure_client_module._azure_client is None
+            assert get_azure_client().cache is cache
+            cache.close()
     
     @patch('src.api.azure_client.config')
     @patch('src.api.azure_client.AzureOpenAI')
     def test_global_client_methods(self, mock_azure_openai, mock_config):
         """Test that global client has expected methods."""
         mock_config.azure_openai.validate.return_value = None
+        azure_client = get_azure_client()
         
         assert hasattr(azure_client, 'create_chat_completion')
         assert hasattr(azure_client, 'get_system_prompt')
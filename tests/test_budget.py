@@ -0,0 +1,82 @@
+"""Tests for src/prediction/budget.py"""
+
+import pytest
+from unittest.mock import patch
+
+from src.prediction.budget import PromptBudget
+
+
+def render(report, history):
+    """Render one message whose content has one 'token' per entry."""
+    words = (
+        [f"h{i}" for i, _ in enumerate(history)]
+        + report.get('pre_text', [])
+        + [row[0] for row in report.get('table', [])]
+        + report.get('post_text', [])
+    )
+    return [{"role": "user", "content": " ".join(words)}]
+
+
+@pytest.fixture(autouse=True)
+def word_counter():
+    """Count message tokens as words, ignoring per-message overhead."""
+    with patch(
+        'src.prediction.budget.count_message_tokens',
+        side_effect=lambda messages: sum(len(m["content"].split()) for m in messages)
+    ):
+        yield
+
+
+@pytest.fixture
+def report():
+    """Report with two sentences each side and three table rows."""
+    return {
+        'pre_text': ['pre1', 'pre2'],
+        'table': [['header'], ['row1'], ['row2'], ['row3']],
+        'post_text': ['post1', 'post2']
+    }
+
+
+HISTORY = [{'question': 'q1'}, {'question': 'q2'}, {'question': 'q3'}]
+
+
+class TestPromptBudget:
+    """Test cases for PromptBudget class."""
+
+    def test_within_budget_unchanged(self, report):
+        """Test that prompts within the budget are not trimmed."""
+        messages, tokens = PromptBudget(max_tokens=20).fit(report, HISTORY, render)
+
+        assert tokens == 11
+        assert messages == render(report, HISTORY)
+
+    @pytest.mark.parametrize("max_tokens, expected", [
+        (10, "h0 h1 pre1 pre2 header row1 row2 row3 post1 post2"),  # oldest history turn
+        (9, "h0 pre1 pre2 header row1 row2 row3 post1 post2"),      # keeps the last turn
+        (7, "h0 pre1 pre2 header row1 row2 row3"),                  # post_text next
+        (5, "h0 header row1 row2 row3"),                            # then pre_text
+        (4, "header row1 row2 row3"),                               # then the last turn
+        (2, "header row1"),                                         # table rows last
+    ])
+    def test_trim_priority(self, report, max_tokens, expected):
+        """Test that content is removed in the documented order."""
+        messages, tokens = PromptBudget(max_tokens=max_tokens).fit(report, HISTORY, render)
+
+        assert messages[0]["content"] == expected
+        assert tokens <= max_tokens
+        assert report['table'] == [['header'], ['row1'], ['row2'], ['row3']]  # input untouched
+
+    def test_over_budget_after_trimming(self, report):
+        """Test that the smallest prompt is returned when nothing fits."""
+        messages, tokens = PromptBudget(max_tokens=1).fit(report, HISTORY, render)
+
+        assert messages[0]["content"] == "header row1"
+        assert tokens == 2
+
+    def test_fits(self):
+        """Test the budget check, including a disabled budget."""
+        assert PromptBudget(max_tokens=10).fits(10)
+        assert not PromptBudget(max_tokens=10).fits(11)
+        with patch('src.prediction.budget.config') as mock_config:
+            mock_config.max_prompt_tokens = None
+            assert PromptBudget().fits(10 ** 9)
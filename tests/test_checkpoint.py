@@ -0,0 +1,92 @@
+"""Tests for src/prediction/checkpoint.py"""
+
+import json
+import os
+import tempfile
+import pytest
+
+from src.prediction.checkpoint import CheckpointJournal
+
+
+@pytest.fixture
+def journal_path():
+    """Temporary journal path."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield os.path.join(temp_dir, 'predictions.json.checkpoint.jsonl')
+
+
+class TestCheckpointJournal:
+    """Test cases for CheckpointJournal class."""
+    
+    def test_path_for(self):
+        """Test journal path derived from the output file."""
+        assert CheckpointJournal.path_for('out/predictions.json') == 'out/predictions.json.checkpoint.jsonl'
+    
+    def test_load_missing_journal(self, journal_path):
+        """Test loading when no journal exists."""
+        assert CheckpointJournal(journal_path).load() == {}
+    
+    def test_record_and_load(self, journal_path):
+        """Test that recorded items are restored."""
+        journal = CheckpointJournal(journal_path)
+        journal.open()
+        journal.record('a', {'id': 'a', 'conversation': []}, {'turns': 0, 'successful': 0, 'failed': 0})
+        journal.record('b', {'id': 'b', 'conversation': []}, {'turns': 1, 'successful': 1, 'failed': 0})
+        journal.close()
+        
+        completed = CheckpointJournal(journal_path).load()
+        
+        assert list(completed) == ['a', 'b']
+        assert completed['b']['item'] == {'id': 'b', 'conversation': []}
+        assert completed['b']['stats']['turns'] == 1
+    
+    def test_records_are_flushed_immediately(self, journal_path):
+        """Test that entries are readable before the journal is closed."""
+        journal = CheckpointJournal(journal_path)
+        journal.open()
+        journal.record('a', {'id': 'a'}, {'turns': 0, 'successful': 0, 'failed': 0})
+        
+        assert 'a' in CheckpointJournal(journal_path).load()
+        journal.close()
+    
+    def test_append_keeps_previous_entries(self, journal_path):
+        """Test reopening without reset appends."""
+        journal = CheckpointJournal(journal_path)
+        journal.open()
+        journal.record('a', {'id': 'a'}, {})
+        journal.close()
+        
+        journal.open()
+        journal.record('b', {'id': 'b'}, {})
+        journal.close()
+        
+        assert list(journal.load()) == ['a', 'b']
+    
+    def test_reset_discards_previous_entries(self, journal_path):
+        """Test reopening with reset starts a fresh journal."""
+        journal = CheckpointJournal(journal_path)
+        journal.open()
+        journal.record('a', {'id': 'a'}, {})
+        journal.close()
+        
+        journal.open(reset=True)
+        journal.close()
+        
+        assert journal.load() == {}
+    
+    def test_torn_last_line_ignored(self, journal_path):
+        """Test that a partially written line from a crash is skipped."""
+        with open(journal_path, 'w') as f:
+            f.write(json.dumps({'id': 'a', 'item': {'id': 'a'}, 'stats': {}}) + "\n")
+            f.write('{"id": "b", "item": {"id"')
+        
+        assert list(CheckpointJournal(journal_path).load()) == ['a']
+    
+    def test_remove(self, journal_path):
+        """Test deleting the journal."""
+        journal = CheckpointJournal(journal_path)
+        journal.open()
+        journal.record('a', {'id': 'a'}, {})
+        journal.remove()
+        
+        assert not os.path.exists(journal_path)
@@ -0,0 +1,103 @@
+"""Tests for src/data/corpus.py"""
+
+import json
+import os
+import pytest
+
+from src.data.corpus import CORPUS_VERSION, PromptCorpus, build_corpus, compile_item
+from src.data.formatter import format_conversation_history, format_financial_context
+
+
+def write_dataset(tmp_path, items):
+    """Write items to input.json in tmp_path and return its path."""
+    input_file = str(tmp_path / 'input.json')
+    with open(input_file, 'w', encoding='utf-8') as f:
+        json.dump(items, f)
+    return input_file
+
+
+class TestCompileItem:
+    """Test cases for compile_item function."""
+
+    def test_compile_item(self, make_item):
+        """Test that entries hold the prompt parts the generator would build."""
+        item = make_item('item0', num_turns=3, table=True)
+
+        entry = compile_item(item)
+
+        assert entry['id'] == 'item0'
+        assert entry['turns'] == 3
+        assert entry['context'] == format_financial_context(item['financial_report'])
+        assert entry['table'] == [{'Year': 'Revenue', '2009': 1200, '2008': -300}]
+        assert entry['history'][0] == ""
+        assert entry['history'][2] == format_conversation_history(item['conversation'][:2])
+
+
+class TestPromptCorpus:
+    """Test cases for build_corpus and PromptCorpus."""
+
+    def test_random_access_by_item_id(self, tmp_path, make_item):
+        """Test that any item can be fetched from the built corpus."""
+        items = [make_item(f'item{i}', num_turns=i + 1, table=True) for i in range(5)]
+        input_file = write_dataset(tmp_path, items)
+        corpus_file = str(tmp_path / 'corpus' / 'train.corpus.jsonl')
+
+        stats = build_corpus(input_file, corpus_file)
+
+        assert stats == {'items': 5, 'turns': 15, 'size_bytes': os.path.getsize(corpus_file)}
+        with PromptCorpus(corpus_file) as corpus:
+            assert len(corpus) == 5
+            assert corpus.table_format == 'json'
+            assert 'item3' in corpus
+            assert corpus.get('item3') == compile_item(items[3])
+            assert corpus.get('item0') == compile_item(items[0])
+            assert corpus.get('missing') is None
+
+    def test_max_items(self, tmp_path, make_item):
+        """Test compiling only the first items of a dataset."""
+        input_file = write_dataset(tmp_path, [make_item(f'item{i}', table=True) for i in range(4)])
+        corpus_file = str(tmp_path / 'corpus.jsonl')
+
+        build_corpus(input_file, corpus_file, max_items=2)
+
+        with PromptCorpus(corpus_file) as corpus:
+            assert list(corpus) == ['item0', 'item1']
+
+    def test_empty_dataset(self, tmp_path):
+        """Test that an empty corpus can be opened."""
+        input_file = write_dataset(tmp_path, [])
+        corpus_file = str(tmp_path / 'corpus.jsonl')
+
+        build_corpus(input_file, corpus_file)
+
+        with PromptCorpus(corpus_file) as corpus:
+            assert len(corpus) == 0
+            assert corpus.get('item0') is None
+
+    def test_matches_source(self, tmp_path, make_item):
+        """Test detecting a corpus built from another version of the input."""
+        input_file = write_dataset(tmp_path, [make_item('item0', table=True)])
+        corpus_file = str(tmp_path / 'corpus.jsonl')
+        build_corpus(input_file, corpus_file)
+
+        with PromptCorpus(corpus_file) as corpus:
+            assert corpus.matches_source(input_file)
+            write_dataset(tmp_path, [make_item('item0', table=True), make_item('item1', table=True)])
+            assert not corpus.matches_source(input_file)
+            assert not corpus.matches_source(str(tmp_path / 'missing.json'))
+
+    def test_incompatible_version(self, tmp_path, make_item):
+        """Test that corpora from another CORPUS_VERSION are rejected."""
+        input_file = write_dataset(tmp_path, [make_item('item0', table=True)])
+        corpus_file = str(tmp_path / 'corpus.jsonl')
+        build_corpus(input_file, corpus_file)
+
+        index_file = PromptCorpus.index_path_for(corpus_file)
+        with open(index_file) as f:
+            index = json.load(f)
+        index['version'] = CORPUS_VERSION + 1
+        with open(index_file, 'w') as f:
+            json.dump(index, f)
+
+        with pytest.raises(ValueError, match="rebuild"):
+            PromptCorpus(corpus_file)
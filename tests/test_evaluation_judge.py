@@ -0,0 +1,217 @@
+"""Tests for src/evaluation/judge.py"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from src.evaluation.judge import LLMJudge
+from src.evaluation.verdict_cache import VerdictCache
+from src.utils.metrics import track_calls
+
+
+def verdict(question_id, correct=True):
+    """Build a verdict entry for a batch response."""
+    return {
+        'question_id': question_id,
+        'answer_correct': correct,
+        'program_correct': correct,
+        'reasoning': f'reasoning for {question_id}'
+    }
+
+
+@pytest.fixture
+def judge():
+    """LLMJudge with a mocked Azure OpenAI client."""
+    mock_client = Mock()
+    mock_client.get_system_prompt.return_value = "System prompt"
+    return LLMJudge(client=mock_client)
+
+
+class TestEvaluateBatch:
+    """Test cases for LLMJudge.evaluate_batch."""
+
+    def test_single_request_for_batch(self, judge, make_item):
+        """Test that all turns are judged with one call."""
+        item = make_item('a', 3, predictions=True)
+        judge.client.create_chat_completion.return_value = json.dumps(
+            {'verdicts': [verdict('a-2', False), verdict('a-0'), verdict('a-1')]}
+        )
+
+        results = judge.evaluate_batch([(item, 0), (item, 1), (item, 2)])
+
+        assert judge.client.create_chat_completion.call_count == 1
+        assert [r.question_id for r in results] == ['a-0', 'a-1', 'a-2']
+        assert [r.answer_correct for r in results] == [True, True, False]
+        assert results[2].reasoning == 'reasoning for a-2'
+
+        messages = judge.client.create_chat_completion.call_args[0][0]
+        prompt = messages[1]['content']
+        assert 'Question ID: a-0' in prompt and 'Question ID: a-2' in prompt
+        assert judge.client.create_chat_completion.call_args[1]['json'] is True
+
+    def test_missing_and_malformed_verdicts_fall_back(self, judge, make_item):
+        """Test that turns without a valid verdict are judged individually."""
+        item = make_item('a', 4, predictions=True)
+        batch_response = json.dumps({'verdicts': [
+            verdict('a-0'),
+            {'question_id': 'a-1', 'answer_correct': 'yes', 'program_correct': True},
+            verdict('a-3'),
+            verdict('a-3', False),
+            verdict('unknown-0'),
+        ]})
+        single_response = json.dumps({'answer_correct': False, 'program_correct': False, 'reasoning': 'single'})
+        judge.client.create_chat_completion.side_effect = [batch_response, single_response, single_response, single_response]
+
+        results = judge.evaluate_batch([(item, i) for i in range(4)])
+
+        # One batch call, then a-1 (malformed), a-2 (missing), a-3 (duplicate)
+        assert judge.client.create_chat_completion.call_count == 4
+        assert results[0].answer_correct is True
+        assert [r.reasoning for r in results[1:]] == ['single', 'single', 'single']
+
+    def test_failed_batch_falls_back_to_single_turns(self, judge, make_item):
+        """Test that a batch call error falls back for every turn."""
+        item = make_item('a', 2, predictions=True)
+        single_response = json.dumps({'answer_correct': True, 'program_correct': True, 'reasoning': 'single'})
+        judge.client.create_chat_completion.side_effect = [Exception("API error"), single_response, single_response]
+
+        results = judge.evaluate_batch([(item, 0), (item, 1)])
+
+        assert [r.reasoning for r in results] == ['single', 'single']
+        assert all(r.error is None for r in results)
+
+    def test_invalid_batch_json_falls_back(self, judge, make_item):
+        """Test that a response without a verdicts array falls back."""
+        item = make_item('a', 2, predictions=True)
+        single_response = json.dumps({'answer_correct': True, 'program_correct': True, 'reasoning': 'single'})
+        judge.client.create_chat_completion.side_effect = [
+            json.dumps({'answer_correct': True}), single_response, single_response
+        ]
+
+        results = judge.evaluate_batch([(item, 0), (item, 1)])
+
+        assert [r.reasoning for r in results] == ['single', 'single']
+
+    def test_unparseable_turn_reported_as_error(self, judge, make_item):
+        """Test that a turn with a non-numeric answer is excluded from the batch."""
+        item = make_item('a', 2, predictions=True)
+        item['conversation'][1]['expected_answer'] = 'no'
+        judge.client.create_chat_completion.return_value = json.dumps({'verdicts': [verdict('a-0')]})
+
+        results = judge.evaluate_batch([(item, 0), (item, 1)])
+
+        assert results[0].error is None
+        assert results[1].error is not None
+        assert 'a-1' not in judge.client.create_chat_completion.call_args_list[0][0][0][1]['content']
+
+    def test_aevaluate_batch(self, judge, make_item):
+        """Test the async batch judge with a fallback turn."""
+        item = make_item('a', 2, predictions=True)
+        single_response = json.dumps({'answer_correct': False, 'program_correct': True, 'reasoning': 'single'})
+        judge.client.acreate_chat_completion = AsyncMock(side_effect=[
+            json.dumps({'verdicts': [verdict('a-1')]}), single_response
+        ])
+
+        results = asyncio.run(judge.aevaluate_batch([(item, 0), (item, 1)]))
+
+        assert [r.question_id for r in results] == ['a-0', 'a-1']
+        assert results[0].reasoning == 'single'
+        assert results[1].reasoning == 'reasoning for a-1'
+        assert judge.client.acreate_chat_completion.await_count == 2
+
+
+class TestVerdictCaching:
+    """Test cases for LLMJudge with a verdict cache."""
+
+    @pytest.fixture
+    def cached_judge(self, judge, tmp_path):
+        """LLMJudge backed by a temporary verdict cache."""
+        judge.verdict_cache = VerdictCache(str(tmp_path / 'verdicts.sqlite'), 1024 * 1024)
+        yield judge
+        judge.verdict_cache.close()
+
+    def test_unchanged_turn_not_rejudged(self, cached_judge, make_item):
+        """Test that a repeated turn is answered from the cache."""
+        item = make_item('a', 1, predictions=True)
+        cached_judge.client.create_chat_completion.return_value = json.dumps(
+            {'answer_correct': True, 'program_correct': False, 'reasoning': 'judged'}
+        )
+
+        first = cached_judge.evaluate_prediction(item, 0)
+        # Same inputs under a different id, as in a new predictions file
+        second = cached_judge.evaluate_prediction({**item, 'id': 'b'}, 0)
+
+        assert cached_judge.client.create_chat_completion.call_count == 1
+        assert second.question_id == 'b-0'
+        assert (second.answer_correct, second.program_correct, second.reasoning) == \
+            (first.answer_correct, first.program_correct, first.reasoning)
+
+    def test_malformed_verdict_not_cached(self, cached_judge, make_item):
+        """Test that responses without boolean fields are not cached."""
+        item = make_item('a', 1, predictions=True)
+        cached_judge.client.create_chat_completion.return_value = json.dumps({'reasoning': 'unsure'})
+
+        cached_judge.evaluate_prediction(item, 0)
+        cached_judge.evaluate_prediction(item, 0)
+
+        assert cached_judge.client.create_chat_completion.call_count == 2
+
+    def test_non_object_verdict_reported_as_error(self, cached_judge, make_item):
+        """Test that a JSON reply that is not an object is an error and not cached."""
+        item = make_item('a', 1, predictions=True)
+        cached_judge.client.create_chat_completion.return_value = json.dumps([True, True])
+        cached_judge.client.acreate_chat_completion = AsyncMock(return_value=[True, True])
+
+        result = cached_judge.evaluate_prediction(item, 0)
+        async_result = asyncio.run(cached_judge.aevaluate_prediction(item, 0))
+
+        assert result.error == "Judge response is not a JSON object: list"
+        assert async_result.error == result.error
+        assert cached_judge.verdict_cache.get(cached_judge._extract_turn(item, 0)) is None
+
+    def test_batch_only_sends_uncached_turns(self, cached_judge, make_item):
+        """Test that cached turns are left out of the batch request."""
+        item = make_item('a', 3, predictions=True)
+        item['conversation'][2]['predicted_answer'] = 7.0
+        cached_judge.client.create_chat_completion.return_value = json.dumps(
+            {'verdicts': [verdict('a-0'), verdict('a-1'), verdict('a-2')]}
+        )
+        cached_judge.evaluate_batch([(item, 0), (item, 1)])
+
+        cached_judge.client.create_chat_completion.return_value = json.dumps(
+            {'verdicts': [verdict('a-2', False)]}
+        )
+        results = cached_judge.evaluate_batch([(item, 0), (item, 1), (item, 2)])
+
+        prompt = cached_judge.client.create_chat_completion.call_args[0][0][1]['content']
+        assert 'Question ID: a-2' in prompt
+        assert 'Question ID: a-0' not in prompt
+        assert [r.answer_correct for r in results] == [True, True, False]
+
+    def test_cached_verdict_recorded_as_cache_hit(self, cached_judge, make_item):
+        """Test that a verdict from the cache is reported as a cache hit."""
+        item = make_item('a', 1, predictions=True)
+        cached_judge.client.create_chat_completion.return_value = json.dumps(
+            {'answer_correct': True, 'program_correct': True, 'reasoning': 'judged'}
+        )
+        cached_judge.evaluate_prediction(item, 0)
+
+        with track_calls() as calls:
+            cached_judge.evaluate_prediction(item, 0)
+
+        assert [(call.cache_hit, call.attempts) for call in calls] == [(True, 0)]
+
+
+class TestClient:
+    """Test cases for the judge's API client."""
+
+    @patch('src.evaluation.judge.get_azure_client')
+    def test_client_created_on_first_use(self, mock_get_client):
+        """Test that the shared client is only fetched for LLM requests."""
+        judge = LLMJudge()
+        asyncio.run(judge.aclose())
+        mock_get_client.assert_not_called()
+
+        assert judge.client is mock_get_client.return_value
+        mock_get_client.assert_called_once()
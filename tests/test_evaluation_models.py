@@ -244,4 +244,27 @@ class TestEvaluationSummary:
         assert summary.both_correct == 0
         assert summary.answer_accuracy == 100.0
         assert summary.program_accuracy == 0.0
-        assert summary.overall_accuracy == 0.0
\ No newline at end of file
+        assert summary.overall_accuracy == 0.0
+    
+    def test_from_results_counts_judge_tiers(self):
+        """Test counting results settled by rules and by the LLM."""
+        results = [
+            EvaluationResult(
+                question_id=f"test-{i}",
+                question="Q",
+                expected_answer=1.0,
+                predicted_answer=1.0,
+                expected_program="1",
+                predicted_program="1",
+                answer_correct=True,
+                program_correct=True,
+                reasoning="",
+                judged_by=judged_by
+            )
+            for i, judged_by in enumerate(["rule", "rule", "llm"])
+        ]
+        
+        summary = EvaluationSummary.from_results(results)
+        
+        assert summary.rule_judged == 2
+        assert summary.llm_judged == 1
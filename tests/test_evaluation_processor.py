@@ -0,0 +1,236 @@
+"""Tests for src/evaluation/processor.py"""
+
+import asyncio
+import json
+import os
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.evaluation.models import EvaluationResult, EvaluationSummary
+from src.evaluation.processor import EvaluationProcessor
+from src.utils.metrics import CallMetrics, TurnMetricsWriter, record_call
+
+
+def make_result(item, conversation_idx):
+    """Build the EvaluationResult the mocked LLM judge returns."""
+    return EvaluationResult(
+        question_id=f"{item['id']}-{conversation_idx}",
+        question=item['conversation'][conversation_idx]['question'],
+        expected_answer=100.0,
+        predicted_answer=-100.0,
+        expected_program='100',
+        predicted_program='-100',
+        answer_correct=True,
+        program_correct=True,
+        reasoning='sign convention'
+    )
+
+
+@pytest.fixture
+def processor():
+    """EvaluationProcessor with a mocked LLM judge."""
+    processor = EvaluationProcessor()
+    processor.judge = Mock()
+    processor.judge.evaluate_prediction.side_effect = make_result
+    processor.judge.aclose = AsyncMock()
+    return processor
+
+
+class TestEvaluateAllPredictions:
+    """Test cases for EvaluationProcessor.evaluate_all_predictions."""
+
+    def test_sequential_evaluation(self, processor, make_item):
+        """Test judging turns one at a time."""
+        data = [make_item('a', 2, predictions=True), make_item('b', 1, predictions=True)]
+
+        results = processor.evaluate_all_predictions(data, max_concurrency=1)
+
+        assert [r.question_id for r in results] == ['a-0', 'a-1', 'b-0']
+        processor.judge.aclose.assert_not_called()
+
+    def test_concurrent_evaluation_preserves_order(self, processor, make_item):
+        """Test that results keep turn order when later turns finish first."""
+        async def judge(item, conversation_idx):
+            # Earlier turns take longer
+            await asyncio.sleep(0.01 * (3 - conversation_idx))
+            return make_result(item, conversation_idx)
+
+        processor.judge.aevaluate_prediction = AsyncMock(side_effect=judge)
+        data = [make_item('a', 3, predictions=True), make_item('b', 3, predictions=True)]
+
+        results = processor.evaluate_all_predictions(data, max_concurrency=4)
+
+        assert [r.question_id for r in results] == ['a-0', 'a-1', 'a-2', 'b-0', 'b-1', 'b-2']
+        processor.judge.evaluate_prediction.assert_not_called()
+        processor.judge.aclose.assert_awaited_once()
+
+    def test_concurrency_limit(self, processor, make_item):
+        """Test that no more than max_concurrency turns are judged at once."""
+        in_flight = 0
+        peak = 0
+
+        async def judge(item, conversation_idx):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_result(item, conversation_idx)
+
+        processor.judge.aevaluate_prediction = AsyncMock(side_effect=judge)
+        data = [make_item(f'item{i}', 2, predictions=True) for i in range(5)]
+
+        results = processor.evaluate_all_predictions(data, max_concurrency=3)
+
+        assert len(results) == 10
+        assert peak == 3
+
+    def test_rule_judged_turns_skip_llm(self, processor, make_item):
+        """Test that turns settled by rules are not sent to the LLM judge."""
+        processor.judge.aevaluate_prediction = AsyncMock(side_effect=make_result)
+        item = make_item('a', 2, predictions=True)
+        item['conversation'][0]['predicted_answer'] = 100.0
+        item['conversation'][0]['predicted_program'] = '100'
+
+        results = processor.evaluate_all_predictions([item], max_concurrency=2)
+
+        assert [r.judged_by for r in results] == ['rule', 'llm']
+        processor.judge.aevaluate_prediction.assert_awaited_once_with(item, 1)
+
+    def test_batched_evaluation(self, processor, make_item):
+        """Test that LLM turns are grouped into batches of batch_size."""
+        processor.judge.evaluate_batch.side_effect = lambda turns: [make_result(*t) for t in turns]
+        data = [make_item('a', 3, predictions=True), make_item('b', 2, predictions=True)]
+
+        results = processor.evaluate_all_predictions(data, max_concurrency=1, batch_size=2)
+
+        assert [r.question_id for r in results] == ['a-0', 'a-1', 'a-2', 'b-0', 'b-1']
+        batches = [[f"{item['id']}-{idx}" for item, idx in c[0][0]] for c in processor.judge.evaluate_batch.call_args_list]
+        assert batches == [['a-0', 'a-1'], ['a-2', 'b-0']]
+        # The leftover single turn is judged on its own
+        processor.judge.evaluate_prediction.assert_called_once_with(data[1], 1)
+
+    def test_concurrent_batched_evaluation(self, processor, make_item):
+        """Test batches running as concurrent async tasks."""
+        async def judge_batch(turns):
+            await asyncio.sleep(0.01 * (5 - len(turns)))
+            return [make_result(*t) for t in turns]
+
+        processor.judge.aevaluate_batch = AsyncMock(side_effect=judge_batch)
+        data = [make_item(f'item{i}', 2, predictions=True) for i in range(4)]
+
+        results = processor.evaluate_all_predictions(data, max_concurrency=2, batch_size=3)
+
+        assert [r.question_id for r in results] == [f'item{i}-{t}' for i in range(4) for t in range(2)]
+        assert processor.judge.aevaluate_batch.await_count == 3
+
+
+class TestTurnMetrics:
+    """Test cases for the call metrics recorded per evaluated turn."""
+
+    def test_batch_calls_counted_once(self, processor, tmp_path, make_item):
+        """Test that a batch's request is counted on its first turn only."""
+        async def judge_batch(turns):
+            record_call(CallMetrics(latency=0.5, prompt_tokens=100, attempts=1))
+            return [make_result(*t) for t in turns]
+
+        processor.judge.aevaluate_batch = AsyncMock(side_effect=judge_batch)
+        item = make_item('a', 3, predictions=True)
+        item['conversation'][0]['predicted_answer'] = 100.0
+        item['conversation'][0]['predicted_program'] = '100'
+
+        metrics_writer = TurnMetricsWriter(str(tmp_path / 'evaluation.json'))
+        processor.evaluate_all_predictions([item], max_concurrency=2, batch_size=2, metrics_writer=metrics_writer)
+        summary = metrics_writer.close()
+
+        with open(metrics_writer.records_path) as f:
+            written = [json.loads(line) for line in f]
+        records = {r['question_id']: r for r in written}
+        assert [r['source'] for r in written] == ['rule', 'llm', 'llm']
+        assert summary['turns'] == 3
+        assert records['a-0']['calls'] == 0
+        assert records['a-1']['calls'] == 1
+        assert records['a-1']['prompt_tokens'] == 100
+        assert records['a-2']['calls'] == 0
+        assert records['a-2']['batch'] == 'a-1'
+
+    def test_process_evaluation_writes_metrics(self, processor, tmp_path, make_item):
+        """Test the metrics files saved next to the evaluation results."""
+        def judge(item, conversation_idx):
+            record_call(CallMetrics(latency=0.5, attempts=2))
+            return make_result(item, conversation_idx)
+
+        processor.judge.evaluate_prediction.side_effect = judge
+        input_file = tmp_path / 'predictions.json'
+        input_file.write_text(json.dumps([make_item('a', 2, predictions=True)]))
+
+        processor.process_evaluation(str(input_file), str(tmp_path / 'out'), max_concurrency=1)
+
+        files = os.listdir(tmp_path / 'out')
+        records_file = next(f for f in files if f.endswith('_metrics.jsonl'))
+        summary_file = next(f for f in files if f.endswith('_metrics_summary.json'))
+        with open(tmp_path / 'out' / records_file) as f:
+            records = [json.loads(line) for line in f]
+        with open(tmp_path / 'out' / summary_file) as f:
+            summary = json.load(f)
+
+        assert not records_file.startswith('evaluation_results_')
+        assert [r['question_id'] for r in records] == ['a-0', 'a-1']
+        assert summary['retries'] == 2
+        assert summary['histograms']['latency_s']['count'] == 2
+
+
+class TestBaselineEvaluation:
+    """Test cases for evaluating against a previous run."""
+
+    def test_unchanged_turns_reuse_baseline(self, processor, make_item):
+        """Test that only turns with changed predictions are judged again."""
+        data = [make_item('a', 3, predictions=True)]
+        baseline = [make_result(data[0], idx) for idx in range(3)]
+        baseline[1].reasoning = 'from baseline'
+        data[0]['conversation'][2]['predicted_program'] = '-100.5'
+
+        results = processor.evaluate_all_predictions(data, max_concurrency=1, baseline=baseline)
+
+        assert [r.question_id for r in results] == ['a-0', 'a-1', 'a-2']
+        assert results[1].reasoning == 'from baseline'
+        processor.judge.evaluate_prediction.assert_called_once_with(data[0], 2)
+
+    def test_failed_baseline_results_are_rejudged(self, processor, make_item):
+        """Test that baseline results with errors are not reused."""
+        data = [make_item('a', 1, predictions=True)]
+        baseline = [make_result(data[0], 0)]
+        baseline[0].error = 'API timeout'
+
+        processor.evaluate_all_predictions(data, max_concurrency=1, baseline=baseline)
+
+        processor.judge.evaluate_prediction.assert_called_once_with(data[0], 0)
+
+    def test_process_evaluation_writes_diff(self, processor, tmp_path, make_item):
+        """Test the merged results and diff files of a baseline run."""
+        data = [make_item('a', 2, predictions=True)]
+        baseline = [make_result(data[0], idx) for idx in range(2)]
+        baseline[0].answer_correct = False
+        baseline_file = processor.reporter.save_results(
+            baseline, EvaluationSummary.from_results(baseline), str(tmp_path)
+        )
+        data[0]['conversation'][0]['predicted_answer'] = -99.0
+        input_file = tmp_path / 'predictions.json'
+        input_file.write_text(json.dumps(data))
+        output_dir = tmp_path / 'new'
+
+        processor.process_evaluation(
+            str(input_file), str(output_dir), max_concurrency=1, baseline_file=baseline_file
+        )
+
+        diff_files = [f for f in os.listdir(output_dir) if f.startswith('evaluation_diff_')]
+        results_files = [f for f in os.listdir(output_dir) if f.startswith('evaluation_results_')]
+        with open(output_dir / diff_files[0]) as f:
+            diff = json.load(f)
+        with open(output_dir / results_files[0]) as f:
+            merged = json.load(f)
+
+        assert [e['question_id'] for e in diff['improved']] == ['a-0']
+        assert diff['summary']['regressed'] == 0
+        assert [r['question_id'] for r in merged['results']] == ['a-0', 'a-1']
+        processor.judge.evaluate_prediction.assert_called_once_with(data[0], 0)
@@ -197,4 +197,27 @@ class TestEvaluationPrompts:
         
         # Results should be the same
         assert prompt == prompt2
-        assert system_prompt == system_prompt2
\ No newline at end of file
+        assert system_prompt == system_prompt2
+    
+    def test_create_batch_evaluation_prompt(self):
+        """Test creating a prompt that covers several turns."""
+        turns = [
+            {
+                "question_id": f"item-{i}",
+                "question": f"Question {i}",
+                "expected_answer": 1.0,
+                "predicted_answer": 2.0,
+                "expected_program": "1",
+                "predicted_program": "2"
+            }
+            for i in range(3)
+        ]
+        
+        prompt = EvaluationPrompts.create_batch_evaluation_prompt(turns)
+        
+        assert "3 financial calculation predictions" in prompt
+        for i in range(3):
+            assert f"Question ID: item-{i}" in prompt
+            assert f"Question {i}" in prompt
+        assert '"verdicts"' in prompt
+        assert "question_id" in prompt
@@ -0,0 +1,120 @@
+"""Tests for src/evaluation/reporter.py"""
+
+import json
+import os
+import pytest
+import tempfile
+
+from src.evaluation.models import EvaluationResult, EvaluationSummary
+from src.evaluation.reporter import EvaluationReporter
+
+
+def make_result(question_id, answer_correct=True, program_correct=True, **overrides):
+    """Build an EvaluationResult."""
+    fields = dict(
+        question_id=question_id,
+        question=f"Question {question_id}",
+        expected_answer=1.0,
+        predicted_answer=1.0,
+        expected_program="1",
+        predicted_program="1",
+        answer_correct=answer_correct,
+        program_correct=program_correct,
+        reasoning="reasoning"
+    )
+    fields.update(overrides)
+    return EvaluationResult(**fields)
+
+
+@pytest.fixture
+def reporter():
+    """EvaluationReporter instance."""
+    return EvaluationReporter()
+
+
+class TestLoadResults:
+    """Test cases for EvaluationReporter.load_results."""
+    
+    def test_round_trip(self, reporter):
+        """Test that saved results load back unchanged."""
+        results = [
+            make_result("a-0", judged_by="rule"),
+            make_result("a-1", False, False, error="API timeout")
+        ]
+        summary = EvaluationSummary.from_results(results)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_file = reporter.save_results(results, summary, temp_dir)
+            loaded = reporter.load_results(results_file)
+        
+        assert loaded == results
+    
+    def test_results_file_named_after_timestamp(self, reporter):
+        """Test that a given timestamp names the results file."""
+        results = [make_result("a-0")]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_file = reporter.save_results(
+                results, EvaluationSummary.from_results(results), temp_dir, "20250101_120000"
+            )
+            with open(results_file) as f:
+                saved = json.load(f)
+        
+        assert os.path.basename(results_file) == "evaluation_results_20250101_120000.json"
+        assert saved["timestamp"] == "20250101_120000"
+    
+    def test_older_results_without_judged_by(self, reporter):
+        """Test loading results saved before judge tiers were recorded."""
+        result = vars(make_result("a-0"))
+        del result["judged_by"]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_file = os.path.join(temp_dir, "evaluation_results_old.json")
+            with open(results_file, "w") as f:
+                json.dump({"results": [result]}, f)
+            
+            loaded = reporter.load_results(results_file)
+        
+        assert loaded[0].judged_by == "llm"
+
+
+class TestCompareResults:
+    """Test cases for EvaluationReporter.compare_results."""
+    
+    def test_classifies_changes(self, reporter):
+        """Test improved, regressed, changed, added and removed turns."""
+        baseline = [
+            make_result("a-0", False, False),
+            make_result("a-1", True, True),
+            make_result("a-2", True, False),
+            make_result("a-3", True, True),
+            make_result("gone-0", True, True),
+        ]
+        results = [
+            make_result("a-0", True, True, predicted_answer=2.0),
+            make_result("a-1", False, True),
+            make_result("a-2", False, True),
+            make_result("a-3", True, True),
+            make_result("new-0", True, True),
+        ]
+        
+        diff = reporter.compare_results(baseline, results)
+        
+        assert [e["question_id"] for e in diff["improved"]] == ["a-0"]
+        assert [e["question_id"] for e in diff["regressed"]] == ["a-1"]
+        assert [e["question_id"] for e in diff["changed"]] == ["a-2"]
+        assert diff["added"] == ["new-0"]
+        assert diff["removed"] == ["gone-0"]
+        assert diff["improved"][0]["before"]["predicted_answer"] == 1.0
+        assert diff["improved"][0]["after"]["predicted_answer"] == 2.0
+        assert diff["summary"]["overall_accuracy"] == {"baseline": 60.0, "current": 60.0}
+    
+    def test_save_diff_next_to_results(self, reporter):
+        """Test that the diff file is named after the results file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_file = os.path.join(temp_dir, "evaluation_results_20250101_000000.json")
+            
+            diff_file = reporter.save_diff({"summary": {}}, results_file)
+            
+            assert diff_file == os.path.join(temp_dir, "evaluation_diff_20250101_000000.json")
+            assert os.path.exists(diff_file)
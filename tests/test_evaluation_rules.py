@@ -0,0 +1,219 @@
+"""Tests for src/evaluation/rules.py"""
+
+import pytest
+from unittest.mock import Mock
+
+from src.evaluation.models import EvaluationResult
+from src.evaluation.processor import EvaluationProcessor
+from src.evaluation.rules import RuleBasedJudge, normalize_program, same_structure
+from src.utils.program_executor import execute_program
+
+
+def make_item(expected_answer, predicted_answer, expected_program, predicted_program):
+    """Build a prediction item with a single turn."""
+    return {
+        'id': 'item',
+        'conversation': [{
+            'question': 'What was the change?',
+            'expected_answer': expected_answer,
+            'predicted_answer': predicted_answer,
+            'expected_program': expected_program,
+            'predicted_program': predicted_program
+        }]
+    }
+
+
+@pytest.fixture
+def judge():
+    """RuleBasedJudge with explicit tolerances."""
+    return RuleBasedJudge(tolerance=1e-3, mismatch_margin=0.05)
+
+
+class TestRuleBasedJudge:
+    """Test cases for RuleBasedJudge class."""
+
+    def test_exact_match(self, judge):
+        """Test identical answers and programs."""
+        item = make_item(25587.0, 25587.0, 'subtract(206588, 181001)', 'subtract(206588, 181001)')
+
+        result = judge.evaluate_prediction(item, 0)
+
+        assert result.question_id == 'item-0'
+        assert result.answer_correct is True
+        assert result.program_correct is True
+        assert result.judged_by == 'rule'
+        assert result.reasoning.startswith('Rule-based:')
+
+    def test_percentage_scaling(self, judge):
+        """Test that 0.14136 and 14.136 are treated as the same answer."""
+        item = make_item(
+            0.14136, 14.1364,
+            'subtract(206588, 181001), divide(#0, 181001)',
+            'subtract(206588, 181001), divide(#0, 181001)'
+        )
+
+        result = judge.evaluate_prediction(item, 0)
+
+        assert result.answer_correct is True
+        assert result.program_correct is True
+
+    def test_constants_equal_plain_numbers(self, judge):
+        """Test that const_100 and 100.0 make programs identical."""
+        item = make_item(-24.05, -24.05, 'subtract(75.95, const_100)', 'subtract(75.95, 100.0)')
+
+        result = judge.evaluate_prediction(item, 0)
+
+        assert result.program_correct is True
+        assert 'identical' in result.reasoning
+
+    def test_same_operations_and_operands(self, judge):
+        """Test that nesting and the order of add operands do not matter."""
+        item = make_item(
+            310000.0, 310000.0, 'add(160000, 80000), add(#0, 70000)', 'add(80000, 160000), add(70000, #0)'
+        )
+
+        result = judge.evaluate_prediction(item, 0)
+
+        assert result.program_correct is True
+        assert 'same operations' in result.reasoning
+
+    @pytest.mark.parametrize("expected_program, predicted_program", [
+        ('multiply(1.5, const_1000)', '1500'),                                     # bare literal
+        ('add(160000, 80000), add(#0, 70000)', 'add(240000, 70000)'),              # collapsed chain
+        ('subtract(206588, 181001), divide(#0, 181001)', 'divide(25587, 181001)'),  # hard-coded step
+        ('subtract(5, 3)', 'subtract(3, 5), multiply(#0, const_m1)'),
+        ('subtract(75.95, const_100), subtract(102.11, const_100)', 'subtract(102.11, const_100)'),  # dropped step
+    ])
+    def test_same_value_different_structure_deferred(self, judge, expected_program, predicted_program):
+        """Test that programs reaching the same value by another calculation are left to the LLM judge."""
+        value = execute_program(expected_program)
+        item = make_item(value, value, expected_program, predicted_program)
+
+        assert judge.evaluate_prediction(item, 0) is None
+
+    def test_clearly_wrong_prediction(self, judge):
+        """Test that far-off answers and programs are ruled incorrect."""
+        item = make_item(-2620.0, 379.0, 'subtract(5363, 7983)', 'subtract(5742, 5363)')
+
+        result = judge.evaluate_prediction(item, 0)
+
+        assert result.answer_correct is False
+        assert result.program_correct is False
+
+    def test_missing_program_is_wrong(self, judge):
+        """Test that a failed prediction with no program is ruled incorrect."""
+        item = make_item(5363.0, 0.0, '5363', '')
+
+        result = judge.evaluate_prediction(item, 0)
+
+        assert result.answer_correct is False
+        assert result.program_correct is False
+
+    @pytest.mark.parametrize("expected, predicted", [
+        (-2620.0, 2620.0),    # opposite sign
+        (0.01269, 1.3),       # coarse rounding of a percentage
+        (0.5, 500.0),         # different units
+    ])
+    def test_ambiguous_answers_deferred(self, judge, expected, predicted):
+        """Test that borderline answers are left to the LLM judge."""
+        item = make_item(expected, predicted, '1', '1')
+
+        assert judge.evaluate_prediction(item, 0) is None
+
+    def test_unexecutable_program_deferred(self, judge):
+        """Test that programs which cannot run are left to the LLM judge."""
+        item = make_item(5.0, 5.0, 'add(2, 3)', 'table_sum(revenue, none)')
+
+        assert judge.evaluate_prediction(item, 0) is None
+
+    @pytest.mark.parametrize("predicted_program", [
+        "add(1, " * 5000 + "1" + ")" * 5000,  # nested too deeply
+        "add(#0, 1)",                          # refers to itself
+    ])
+    def test_runaway_program_deferred(self, judge, predicted_program):
+        """Test that programs the interpreter rejects are left to the LLM judge."""
+        item = make_item(5.0, 5.0, 'add(2, 3)', predicted_program)
+
+        assert judge.evaluate_prediction(item, 0) is None
+
+    def test_non_numeric_answer_deferred(self, judge):
+        """Test that yes/no answers are left to the LLM judge."""
+        item = make_item('no', 0.0, 'greater(1, 2)', 'greater(1, 2)')
+
+        assert judge.evaluate_prediction(item, 0) is None
+
+    def test_non_string_program_deferred(self, judge):
+        """Test that a program the generator emitted as a number is left to the LLM judge."""
+        item = make_item(206588.0, 206588.0, '206588', 206588)
+
+        assert judge.evaluate_prediction(item, 0) is None
+
+    def test_missing_id_and_question(self, judge):
+        """Test that items without an id or question are still judged."""
+        item = make_item(5.0, 5.0, 'add(2, 3)', 'add(2, 3)')
+        del item['id']
+        del item['conversation'][0]['question']
+
+        result = judge.evaluate_prediction(item, 0)
+
+        assert result.question_id == 'unknown-0'
+        assert result.question == ''
+        assert result.answer_correct is True
+
+
+class TestNormalizeProgram:
+    """Test cases for normalize_program function."""
+
+    def test_normalize_program(self):
+        """Test whitespace, constant and trailing-zero normalization."""
+        assert normalize_program(' subtract(75.95, const_100) ') == 'subtract(75.95,100)'
+        assert normalize_program('multiply(#0, const_m1)') == 'multiply(#0,-1)'
+        assert normalize_program('divide(1.05, 2.0)') == 'divide(1.05,2)'
+
+
+class TestSameStructure:
+    """Test cases for same_structure function."""
+
+    def test_references_match_nested_calls(self):
+        """Test that a step reference stands for the step it points to."""
+        assert same_structure('subtract(5, const_3), divide(#0, 3)', 'subtract(5, 3), divide(subtract(5, 3), 3)')
+        assert not same_structure('subtract(5, const_3), divide(#0, 3)', 'divide(subtract(5, 3), 3)')
+
+    def test_only_commutative_operands_reordered(self):
+        """Test that add operands may be swapped but subtract operands may not."""
+        assert same_structure('add(2, 1)', 'add(1, 2)')
+        assert same_structure('add(1, 1), multiply(#0, 3)', 'add(1, 1), multiply(3, #0)')
+        assert not same_structure('subtract(2, 1)', 'subtract(1, 2)')
+
+    @pytest.mark.parametrize("program", ['table_sum(revenue, none)', 'add(#0, 1)', ''])
+    def test_unparseable_program(self, program):
+        """Test that malformed programs and forward references never match."""
+        assert not same_structure(program, program)
+
+    def test_shared_references_not_expanded(self):
+        """Test that steps reusing earlier steps twice are compared in linear time."""
+        program = 'add(1, 1), ' + ', '.join(f'add(#{i}, #{i})' for i in range(200))
+
+        assert same_structure(program, program)
+        assert not same_structure(program, program.replace('add(1, 1)', 'add(1, 2)', 1))
+
+
+class TestEvaluationProcessorTiers:
+    """Test cases for rule-first evaluation in EvaluationProcessor."""
+
+    def test_llm_only_called_for_ambiguous_turns(self):
+        """Test that the LLM judge only sees turns the rules cannot settle."""
+        processor = EvaluationProcessor()
+        processor.judge = Mock()
+        processor.judge.evaluate_prediction.return_value = EvaluationResult(
+            question_id='item-1', question='q', expected_answer=-2620.0,
+            predicted_answer=2620.0, expected_program='1', predicted_program='1',
+            answer_correct=True, program_correct=True, reasoning='sign convention'
+        )
+        item = make_item(1.0, 1.0, 'add(0, 1)', 'add(0, 1)')
+        item['conversation'].append({**item['conversation'][0], 'expected_answer': -2620.0, 'predicted_answer': 2620.0})
+
+        results = processor.evaluate_all_predictions([item], max_concurrency=1)
+
+        assert [r.judged_by for r in results] == ['rule', 'llm']
+        processor.judge.evaluate_prediction.assert_called_once_with(item, 1)
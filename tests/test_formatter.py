@@ -2,10 +2,15 @@
 
 import json
 import pytest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from src.data.formatter import (
     format_table_as_json_objects,
+    format_table_as_compact_json,
+    format_table_as_markdown,
+    format_table_as_csv,
+    ContextCache,
+    ConversationHistoryBuilder,
     format_financial_context,
     format_conversation_history
 )
@@ -159,6 +164,48 @@ class TestFormatTableAsJsonObjects:
         assert parsed == expected
 
 
+class TestCompactTableFormats:
+    """Test cases for the compact table serializers."""
+    
+    TABLE = [
+        ['', '2009', '2008'],
+        ['net sales', '$1,200', '(300)'],
+        ['segment | total', '5.5']
+    ]
+    
+    def test_compact_json(self):
+        """Test keyed JSON without whitespace."""
+        result = format_table_as_compact_json(self.TABLE)
+        
+        assert '\n' not in result
+        assert json.loads(result) == json.loads(format_table_as_json_objects(self.TABLE))
+    
+    def test_markdown(self):
+        """Test markdown grid with parsed numbers and escaped pipes."""
+        result = format_table_as_markdown(self.TABLE)
+        
+        assert result.split('\n') == [
+            '|  | 2009 | 2008 |',
+            '|---|---|---|',
+            '| net sales | 1200 | -300 |',
+            '| segment \\| total | 5.5 |  |'
+        ]
+    
+    def test_csv(self):
+        """Test CSV with a single header line."""
+        result = format_table_as_csv(self.TABLE)
+        
+        assert result == ',2009,2008\nnet sales,1200,-300\nsegment | total,5.5,'
+    
+    @pytest.mark.parametrize("serializer", [
+        format_table_as_compact_json, format_table_as_markdown, format_table_as_csv
+    ])
+    def test_header_only_table(self, serializer):
+        """Test that tables without data rows serialize to an empty string."""
+        assert serializer([['Year', '2009']]) == ""
+        assert serializer([]) == ""
+
+
 class TestFormatFinancialContext:
     """Test cases for format_financial_context function."""
     
@@ -254,6 +301,52 @@ class TestFormatFinancialContext:
         assert 'Some text' in result
         # Empty table should not add JSON section
         assert 'Financial Data (JSON):' not in result
+    
+    @pytest.mark.parametrize("table_format", ['json', 'compact_json', 'markdown', 'csv'])
+    def test_header_only_table_has_no_section(self, table_format):
+        """Test that a table reduced to its header adds no empty section."""
+        financial_report = {
+            'table': [['', '2009', '2008']],
+            'post_text': ['Some text']
+        }
+        
+        result = format_financial_context(financial_report, table_format)
+        
+        assert 'Financial Data' not in result
+        assert result == 'FINANCIAL REPORT CONTEXT:\n\nAdditional Information:\n- Some text\n'
+
+
+class TestTableFormatSelection:
+    """Test cases for choosing the table format of the financial context."""
+    
+    REPORT = {'pre_text': ['Intro'], 'table': [['Account', 'Amount'], ['Revenue', '100']]}
+    
+    @pytest.mark.parametrize("table_format, label, table_line", [
+        ('json', 'JSON', '"Amount": 100'),
+        ('compact_json', 'JSON', '[{"Account":"Revenue","Amount":100}]'),
+        ('markdown', 'Markdown', '| Revenue | 100 |'),
+        ('csv', 'CSV', 'Revenue,100'),
+    ])
+    def test_table_format_argument(self, table_format, label, table_line):
+        """Test each table format with its section label."""
+        result = format_financial_context(self.REPORT, table_format)
+        
+        assert f'Financial Data ({label}):' in result
+        assert table_line in result
+    
+    @patch('src.data.formatter.config')
+    def test_table_format_from_config(self, mock_config):
+        """Test that config.table_format is the default."""
+        mock_config.table_format = 'csv'
+        
+        result = format_financial_context(self.REPORT)
+        
+        assert 'Financial Data (CSV):' in result
+    
+    def test_unknown_table_format(self):
+        """Test that an unknown format is rejected."""
+        with pytest.raises(ValueError, match="Unknown table format"):
+            format_financial_context(self.REPORT, 'xml')
 
 
 class TestFormatConversationHistory:
@@ -340,4 +433,116 @@ class TestFormatConversationHistory:
         assert 'Program: 75000' in result
         assert 'Answer: 75000.0' in result
         # Should not have Q2
-        assert 'Q2:' not in result
\ No newline at end of file
+        assert 'Q2:' not in result
+
+
+class TestConversationHistoryBuilder:
+    """Test cases for ConversationHistoryBuilder class."""
+    
+    CONVERSATION = [
+        {'question': 'What was revenue?', 'expected_program': '100', 'expected_answer': 100.0},
+        {'question': 'And costs?'},
+        {'question': 'What is the margin?', 'expected_program': 'divide(#0, #1)', 'expected_answer': 0.5}
+    ]
+    
+    def test_matches_format_conversation_history(self):
+        """Test that each prefix equals the history formatted from scratch."""
+        builder = ConversationHistoryBuilder()
+        
+        for turn_idx, turn in enumerate(self.CONVERSATION):
+            assert builder.text == format_conversation_history(self.CONVERSATION[:turn_idx])
+            assert len(builder) == turn_idx
+            builder.append(turn)
+        
+        assert builder.text == format_conversation_history(self.CONVERSATION)
+        assert builder.turns == self.CONVERSATION
+    
+    def test_each_turn_formatted_once(self):
+        """Test that appending a turn does not reformat earlier turns."""
+        builder = ConversationHistoryBuilder()
+        
+        with patch('src.data.formatter._format_history_turn', return_value="turn\n") as mock_format:
+            for turn in self.CONVERSATION:
+                builder.append(turn)
+                builder.text
+        
+        assert mock_format.call_count == len(self.CONVERSATION)
+
+
+class TestContextCache:
+    """Test cases for ContextCache class."""
+    
+    def test_context_built_once_per_report(self):
+        """Test that repeated lookups for one report reuse the context."""
+        formatter = Mock(return_value="context")
+        cache = ContextCache(max_size=4)
+        report = {'pre_text': ['a'], 'table': [['Year', '2009'], ['Revenue', '100']]}
+        
+        results = [cache.get(report, formatter) for _ in range(5)]
+        
+        assert results == ["context"] * 5
+        formatter.assert_called_once_with(report)
+        assert cache.stats()['hits'] == 4
+        assert cache.stats()['misses'] == 1
+    
+    def test_equal_reports_share_entry(self):
+        """Test that the key depends on report content, not identity."""
+        formatter = Mock(return_value="context")
+        cache = ContextCache(max_size=4)
+        
+        cache.get({'pre_text': ['a'], 'post_text': ['b']}, formatter)
+        cache.get({'post_text': ['b'], 'pre_text': ['a']}, formatter)
+        cache.get({'pre_text': ['a'], 'post_text': ['c']}, formatter)
+        
+        assert formatter.call_count == 2
+    
+    def test_least_recently_used_evicted(self):
+        """Test bounded LRU eviction."""
+        formatter = Mock(side_effect=lambda report: report['pre_text'][0])
+        cache = ContextCache(max_size=2)
+        first, second, third = ({'pre_text': [name]} for name in ('a', 'b', 'c'))
+        
+        cache.get(first, formatter)
+        cache.get(second, formatter)
+        cache.get(first, formatter)  # second becomes least recently used
+        cache.get(third, formatter)
+        
+        assert cache.stats()['entries'] == 2
+        cache.get(first, formatter)
+        assert formatter.call_count == 3
+        cache.get(second, formatter)
+        assert formatter.call_count == 4
+    
+    def test_zero_size_disables_cache(self):
+        """Test that max_size=0 formats on every call."""
+        formatter = Mock(return_value="context")
+        cache = ContextCache(max_size=0)
+        
+        cache.get({}, formatter)
+        cache.get({}, formatter)
+        
+        assert formatter.call_count == 2
+        assert cache.stats()['entries'] == 0
+    
+    def test_default_formatter(self):
+        """Test that the default formatter is format_financial_context."""
+        report = {'pre_text': ['Revenue grew.'], 'table': [['Year', '2009'], ['Revenue', '100']]}
+        
+        assert ContextCache(max_size=1).get(report) == format_financial_context(report)
+    
+    def test_key_includes_table_format(self):
+        """Test that contexts for different table formats are cached separately."""
+        assert ContextCache.make_key('item', 'json') != ContextCache.make_key('item', 'csv')
+    
+    def test_report_id_key_skips_hashing(self):
+        """Test that lookups with an item id never hash the report."""
+        formatter = Mock(return_value="context")
+        cache = ContextCache(max_size=4)
+        report = {'pre_text': ['a']}
+        
+        with patch.object(ContextCache, 'content_id') as mock_content_id:
+            results = [cache.get(report, formatter, report_id='item0') for _ in range(3)]
+        
+        assert results == ["context"] * 3
+        formatter.assert_called_once_with(report)
+        mock_content_id.assert_not_called()
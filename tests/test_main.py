@@ -0,0 +1,43 @@
+"""Tests for main.py"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+import main
+
+
+@pytest.fixture
+def entry_point(tmp_path):
+    """main() with the dataset processor and input checks mocked."""
+    mock_config = Mock()
+    mock_config.cache_enabled = True
+    mock_config.output_format = 'json'
+    mock_config.default_output_file = str(tmp_path / 'predictions.json')
+
+    with patch('main.config', mock_config), \
+         patch('main.setup_logging'), \
+         patch('main.validate_input_file'), \
+         patch('main.get_dataset_processor'), \
+         patch('main.enable_response_cache') as mock_enable_cache, \
+         patch('main.validate_environment') as mock_validate:
+        mock_enable_cache.return_value.stats.return_value = {'hits': 0, 'misses': 0}
+        yield mock_validate
+
+
+class TestMain:
+    """Test cases for main function."""
+
+    def test_cached_replay_needs_no_credentials(self, entry_point):
+        """Test that credentials are not required up front when the response cache is used."""
+        main.main(max_examples=1)
+
+        entry_point.assert_not_called()
+
+    def test_credentials_checked_without_cache(self, entry_point):
+        """Test that a run without the response cache checks credentials before starting."""
+        entry_point.side_effect = ValueError("Missing required environment variables")
+
+        with pytest.raises(SystemExit):
+            main.main(max_examples=1, use_cache=False)
+
+        entry_point.assert_called_once()
@@ -0,0 +1,186 @@
+"""Tests for src/utils/metrics.py"""
+
+import asyncio
+import json
+import os
+import pytest
+import threading
+
+from src.utils.metrics import (
+    CallMetrics, TurnMetricsAggregate, TurnMetricsWriter, format_summary, histogram, record_call,
+    summarize_turns, track_calls, turn_record
+)
+
+
+class TestTrackCalls:
+    """Test cases for track_calls and record_call functions."""
+
+    def test_collects_calls_in_block(self):
+        """Test that calls made inside the block are collected."""
+        with track_calls() as calls:
+            record_call(CallMetrics(attempts=1))
+            record_call(CallMetrics(cache_hit=True))
+        record_call(CallMetrics(attempts=1))
+
+        assert len(calls) == 2
+
+    def test_no_block_ignored(self):
+        """Test that calls outside any block are dropped silently."""
+        record_call(CallMetrics(attempts=1))
+
+    def test_threads_tracked_separately(self):
+        """Test that concurrent threads only see their own calls."""
+        barrier = threading.Barrier(2)
+        counts = {}
+
+        def work(name, n):
+            with track_calls() as calls:
+                barrier.wait()
+                for _ in range(n):
+                    record_call(CallMetrics(attempts=1))
+            counts[name] = len(calls)
+
+        threads = [threading.Thread(target=work, args=(name, n)) for name, n in (('a', 1), ('b', 3))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counts == {'a': 1, 'b': 3}
+
+    def test_async_tasks_tracked_separately(self):
+        """Test that concurrent asyncio tasks only see their own calls."""
+        async def work(n):
+            with track_calls() as calls:
+                for _ in range(n):
+                    record_call(CallMetrics(attempts=1))
+                    await asyncio.sleep(0)
+            return len(calls)
+
+        async def main():
+            return await asyncio.gather(work(1), work(3))
+
+        assert asyncio.run(main()) == [1, 3]
+
+
+class TestTurnRecord:
+    """Test cases for turn_record function."""
+
+    def test_sums_calls(self):
+        """Test that a turn record sums the metrics of its calls."""
+        calls = [
+            CallMetrics(queue_wait=0.5, latency=1.0, prompt_tokens=100, completion_tokens=20, attempts=3),
+            CallMetrics(cache_hit=True),
+            CallMetrics(latency=0.25, attempts=1, error="timeout")
+        ]
+
+        record = turn_record(calls, question_id='a-0')
+
+        assert record == {
+            'question_id': 'a-0',
+            'calls': 3,
+            'cache_hits': 1,
+            'queue_wait_s': 0.5,
+            'latency_s': 1.25,
+            'prompt_tokens': 100,
+            'completion_tokens': 20,
+            'retries': 2,
+            'errors': 1
+        }
+
+    def test_no_calls(self):
+        """Test the record of a turn settled without the API."""
+        record = turn_record([], question_id='a-0')
+        assert record['calls'] == 0
+        assert record['latency_s'] == 0
+
+
+class TestHistogram:
+    """Test cases for histogram function."""
+
+    def test_buckets_and_percentiles(self):
+        """Test bucket counts and nearest-rank percentiles."""
+        hist = histogram([float(v) for v in range(1, 101)], (10, 50))
+
+        assert hist['count'] == 100
+        assert hist['p50'] == 50
+        assert hist['p95'] == 95
+        assert hist['p99'] == 99
+        assert hist['max'] == 100
+        assert hist['mean'] == pytest.approx(50.5)
+        assert hist['buckets'] == {'<=10': 10, '<=50': 40, '>50': 50}
+
+    def test_empty(self):
+        """Test that no values give zeros."""
+        hist = histogram([], (1,))
+        assert hist['count'] == 0
+        assert hist['p99'] == 0.0
+        assert hist['buckets'] == {'<=1': 0, '>1': 0}
+
+
+class TestSummarizeTurns:
+    """Test cases for summarize_turns and format_summary functions."""
+
+    def test_histograms_skip_turns_without_requests(self):
+        """Test that cache hits and rule-settled turns are counted but not timed."""
+        records = [
+            turn_record([CallMetrics(latency=2.0, prompt_tokens=300, attempts=2)]),
+            turn_record([CallMetrics(cache_hit=True)]),
+            turn_record([])
+        ]
+
+        summary = summarize_turns(records)
+
+        assert summary['turns'] == 3
+        assert summary['turns_with_requests'] == 1
+        assert summary['calls'] == 2
+        assert summary['cache_hit_rate'] == 0.5
+        assert summary['retries'] == 1
+        assert summary['histograms']['latency_s']['count'] == 1
+        assert summary['histograms']['latency_s']['buckets']['<=2'] == 1
+        assert summary['histograms']['prompt_tokens']['buckets']['<=500'] == 1
+
+    def test_aggregate_keeps_only_histogram_values(self):
+        """Test that the running aggregate holds values, not records."""
+        records = [turn_record([CallMetrics(latency=0.5, attempts=1)], question_id=f'a-{i}') for i in range(3)]
+        aggregate = TurnMetricsAggregate()
+        for record in records:
+            aggregate.add(record)
+
+        assert aggregate.summary() == summarize_turns(records)
+        assert aggregate.values['latency_s'] == [0.5, 0.5, 0.5]
+        assert all(isinstance(value, (int, float)) for values in aggregate.values.values() for value in values)
+
+    def test_format_summary(self):
+        """Test the human-readable summary lines."""
+        summary = summarize_turns([turn_record([CallMetrics(latency=1.5, attempts=1)])])
+        lines = format_summary(summary)
+
+        assert lines[0] == "API calls: 1 for 1 turns (0 cache hits, 0.0%; 0 retries; 0 errors)"
+        assert any(line.startswith("latency_s: p50 1.5") for line in lines)
+
+
+class TestTurnMetricsWriter:
+    """Test cases for TurnMetricsWriter class."""
+
+    def test_writes_records_and_summary(self, tmp_path):
+        """Test the records and summary files next to the results file."""
+        writer = TurnMetricsWriter(str(tmp_path / 'predictions.json'))
+        writer.write([turn_record([CallMetrics(attempts=1)], question_id='a-0')])
+        writer.write([turn_record([], question_id='a-1')])
+        summary = writer.close()
+
+        with open(tmp_path / 'predictions_metrics.jsonl') as f:
+            records = [json.loads(line) for line in f]
+        with open(tmp_path / 'predictions_metrics_summary.json') as f:
+            saved_summary = json.load(f)
+
+        assert [r['question_id'] for r in records] == ['a-0', 'a-1']
+        assert saved_summary == summary
+        assert summary['turns'] == 2
+
+    def test_paths_for(self):
+        """Test the sidecar paths for a results file."""
+        assert TurnMetricsWriter.paths_for(os.path.join('out', 'run.jsonl')) == (
+            os.path.join('out', 'run_metrics.jsonl'), os.path.join('out', 'run_metrics_summary.json')
+        )
@@ -0,0 +1,231 @@
+"""Tests for src/api/mock_server.py"""
+
+import http.client
+import json
+import pytest
+import time
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+from src.api.azure_client import AzureOpenAIClient, RateLimiter
+from src.api.mock_server import (
+    FaultInjector, LatencyModel, MockResponder, MockServer, load_answers
+)
+from src.evaluation.prompts import EvaluationPrompts
+from src.prediction.generator import PredictionGenerator
+
+
+@pytest.fixture
+def answers():
+    """Expected answers for two conversations sharing a question."""
+    return {
+        'what was the change?': [
+            {'expected_program': 'subtract(1200, 1100)', 'expected_answer': 100},
+            {'expected_program': 'subtract(75, 50)', 'expected_answer': 25}
+        ],
+        'what was revenue in 2009?': [
+            {'expected_program': '1200', 'expected_answer': 1200}
+        ]
+    }
+
+
+def post(url, payload):
+    """POST JSON and return (status, headers, body)."""
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode('utf-8'), headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, json.loads(e.read())
+
+
+class TestLatencyModel:
+    """Test cases for LatencyModel class."""
+
+    @pytest.mark.parametrize('distribution', ['fixed', 'uniform', 'normal', 'lognormal', 'exponential'])
+    def test_samples_not_negative(self, distribution):
+        """Test that every distribution yields non-negative latencies."""
+        model = LatencyModel(distribution, mean=0.1, spread=0.2, seed=1)
+        assert all(model.sample() >= 0 for _ in range(200))
+
+    def test_fixed(self):
+        """Test that the fixed distribution always returns the mean."""
+        assert LatencyModel('fixed', mean=0.25).sample() == 0.25
+
+    def test_invalid_distribution(self):
+        """Test that unknown distributions are rejected."""
+        with pytest.raises(ValueError, match="Unknown latency distribution"):
+            LatencyModel('pareto')
+
+
+class TestFaultInjector:
+    """Test cases for FaultInjector class."""
+
+    def test_rates(self):
+        """Test that failures are injected at roughly the configured rates."""
+        faults = FaultInjector(rate_limit_rate=0.2, error_rate=0.1, seed=1)
+        picks = [faults.pick(1) for _ in range(5000)]
+
+        assert 0.17 < picks.count(429) / len(picks) < 0.23
+        assert 0.08 < sum(1 for p in picks if p and p >= 500) / len(picks) < 0.12
+
+    def test_max_concurrent(self):
+        """Test that requests beyond the concurrency limit are throttled."""
+        faults = FaultInjector(max_concurrent=2)
+        assert faults.pick(2) is None
+        assert faults.pick(3) == 429
+
+    def test_retry_after_headers(self):
+        """Test Retry-After headers on throttling responses only."""
+        faults = FaultInjector(retry_after=0.5)
+        assert faults.headers_for(429) == {'Retry-After': '1', 'retry-after-ms': '500'}
+        assert faults.headers_for(500) == {}
+        assert FaultInjector().headers_for(429) == {}
+
+    def test_invalid_rate(self):
+        """Test that rates outside [0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            FaultInjector(rate_limit_rate=1.5)
+
+
+class TestMockResponder:
+    """Test cases for MockResponder class."""
+
+    def prediction_messages(self, context, question):
+        """Build prediction messages the way PredictionGenerator does."""
+        user_message = PredictionGenerator(client=object())._create_user_message(context, "", question)
+        return [{'role': 'system', 'content': 'System'}, {'role': 'user', 'content': user_message}]
+
+    def test_expected_answer(self, answers):
+        """Test that known questions get the expected program and answer."""
+        responder = MockResponder(answers)
+        content = responder.respond(self.prediction_messages("revenue 1,200", 'what was revenue in 2009?'))
+        assert json.loads(content) == {'program': '1200', 'answer': 1200}
+
+    def test_ambiguous_question_uses_context(self, answers):
+        """Test that the turn whose constants appear in the prompt is chosen."""
+        responder = MockResponder(answers)
+        content = responder.respond(self.prediction_messages("values 75 and 50", 'what was the change?'))
+        assert json.loads(content)['answer'] == 25
+
+    def test_unknown_question_canned(self, answers):
+        """Test that unknown questions get the canned response."""
+        responder = MockResponder(answers, canned_response={'program': 'x', 'answer': 1})
+        content = responder.respond(self.prediction_messages("", 'something else?'))
+        assert json.loads(content) == {'program': 'x', 'answer': 1}
+
+    def test_wrong_answers(self, answers):
+        """Test that accuracy=0 returns a consistent but wrong prediction."""
+        responder = MockResponder(answers, accuracy=0.0)
+        content = json.loads(responder.respond(self.prediction_messages("1200 1100", 'what was the change?')))
+        assert content['program'] == 'subtract(1200, 1100), multiply(#0, 1.1)'
+        assert content['answer'] == pytest.approx(110)
+
+    def test_single_judge_prompt(self):
+        """Test verdicts for a single judge prompt."""
+        prompt = EvaluationPrompts.create_evaluation_prompt(
+            'q?', 0.14, 14.0, 'divide(14, 100)', 'divide(28, 200)'
+        )
+        verdict = json.loads(MockResponder().respond([{'role': 'user', 'content': prompt}]))
+        assert verdict['answer_correct'] is True
+        assert verdict['program_correct'] is True
+
+    def test_batch_judge_prompt(self):
+        """Test one verdict per question id for a batched judge prompt."""
+        turns = [
+            {'question_id': 'a-0', 'question': 'q?', 'expected_answer': 100, 'predicted_answer': 100,
+             'expected_program': 'subtract(1200, 1100)', 'predicted_program': 'subtract(1200, 1100)'},
+            {'question_id': 'a-1', 'question': 'q?', 'expected_answer': 100, 'predicted_answer': 90,
+             'expected_program': 'subtract(1200, 1100)', 'predicted_program': 'subtract(1200, 1110)'}
+        ]
+        prompt = EvaluationPrompts.create_batch_evaluation_prompt(turns)
+        verdicts = json.loads(MockResponder().respond([{'role': 'user', 'content': prompt}]))['verdicts']
+        assert [(v['question_id'], v['answer_correct'], v['program_correct']) for v in verdicts] == [
+            ('a-0', True, True), ('a-1', False, False)
+        ]
+
+    def test_load_answers(self, tmp_path):
+        """Test collecting expected answers from a dataset."""
+        dataset = tmp_path / 'data.json'
+        dataset.write_text(json.dumps([{
+            'id': 'a',
+            'conversation': [{'question': ' q? ', 'expected_program': '1', 'expected_answer': 1}]
+        }]))
+        assert load_answers(str(dataset)) == {'q?': [{'expected_program': '1', 'expected_answer': 1}]}
+
+
+class TestMockServer:
+    """Test cases for MockServer class."""
+
+    def test_chat_completion(self, answers):
+        """Test a chat completion response on the Azure deployment path."""
+        with MockServer(responder=MockResponder(answers)) as server:
+            status, _, body = post(
+                f"{server.url}/openai/deployments/mock/chat/completions?api-version=2024-02-01",
+                {'model': 'mock', 'messages': [{'role': 'user', 'content': 'CURRENT QUESTION: what was revenue in 2009?'}]}
+            )
+
+        assert status == 200
+        assert json.loads(body['choices'][0]['message']['content'])['answer'] == 1200
+        assert body['usage']['total_tokens'] == body['usage']['prompt_tokens'] + body['usage']['completion_tokens']
+        assert server.stats() == {'requests': 1, 'status_counts': {200: 1}}
+
+    def test_injected_failure(self):
+        """Test an injected 429 with Retry-After headers."""
+        with MockServer(faults=FaultInjector(rate_limit_rate=1.0, retry_after=2)) as server:
+            status, headers, body = post(f"{server.url}/chat/completions", {'messages': []})
+
+        assert status == 429
+        assert headers['Retry-After'] == '2'
+        assert body['error']['code'] == '429'
+
+    def test_keep_alive_adds_no_latency(self):
+        """Test that responses on a reused connection are not held back by delayed ACKs."""
+        with MockServer() as server:
+            connection = http.client.HTTPConnection(server.url.split('//', 1)[1])
+            durations = []
+            for _ in range(10):
+                start = time.perf_counter()
+                connection.request('POST', '/chat/completions', body=json.dumps({'messages': []}))
+                connection.getresponse().read()
+                durations.append(time.perf_counter() - start)
+            connection.close()
+
+        assert sorted(durations)[5] < 0.02
+
+    def test_unknown_path(self):
+        """Test that other paths return 404."""
+        with MockServer() as server:
+            status, _, _ = post(f"{server.url}/embeddings", {})
+        assert status == 404
+
+    def test_client_retries_against_server(self, answers):
+        """Test that AzureOpenAIClient retries injected throttling and succeeds."""
+        faults = FaultInjector(retry_after=0.01)
+        # Fail the first request only
+        picks = iter([429])
+        faults.pick = lambda in_flight: next(picks, None)
+
+        with MockServer(responder=MockResponder(answers), faults=faults) as server, \
+                patch('src.api.azure_client.config') as mock_config, \
+                patch('src.api.retry.config') as mock_retry_config:
+            mock_config.azure_openai.api_key = 'mock'
+            mock_config.azure_openai.endpoint = server.url
+            mock_config.azure_openai.api_version = '2024-02-01'
+            mock_config.azure_openai.deployment_name = 'mock'
+            mock_config.max_tokens = 100
+            mock_config.temperature = 0.1
+            mock_retry_config.retry_attempts = 2
+            mock_retry_config.retry_max_delay = 60.0
+            client = AzureOpenAIClient()
+            client.rate_limiter = RateLimiter(None, None)
+
+            content = client.create_chat_completion(
+                [{'role': 'user', 'content': 'CURRENT QUESTION: what was revenue in 2009?'}]
+            )
+
+        assert json.loads(content)['answer'] == 1200
+        assert server.stats()['status_counts'] == {429: 1, 200: 1}
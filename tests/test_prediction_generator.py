@@ -1,22 +1,41 @@
 """Tests for src/prediction/generator.py"""
 
+import asyncio
 import json
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, AsyncMock, patch, MagicMock
 
-from src.prediction.generator import PredictionGenerator, prediction_generator
+from src.prediction import generator as generator_module
+from src.prediction.generator import PredictionGenerator, get_prediction_generator
+from src.utils.tokens import count_message_tokens
+
+
+def mock_client_factory():
+    """Mock standing in for get_azure_client and the client it returns."""
+    mock_client = MagicMock()
+    mock_client.return_value = mock_client
+    return mock_client
 
 
 class TestPredictionGenerator:
     """Test cases for PredictionGenerator class."""
     
-    @patch('src.prediction.generator.azure_client')
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
     def test_init(self, mock_azure_client):
         """Test PredictionGenerator initialization."""
         generator = PredictionGenerator()
+        mock_azure_client.assert_not_called()
         assert generator.client == mock_azure_client
     
-    @patch('src.prediction.generator.azure_client')
+    def test_init_with_client(self):
+        """Test that an injected client is used instead of the shared one."""
+        client = Mock()
+        with patch('src.prediction.generator.get_azure_client') as mock_get_client:
+            generator = PredictionGenerator(client=client)
+            assert generator.client is client
+        mock_get_client.assert_not_called()
+    
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
     @patch('src.prediction.generator.format_financial_context')
     @patch('src.prediction.generator.format_conversation_history')
     def test_generate_prediction_success(self, mock_format_history, mock_format_context, mock_azure_client):
@@ -44,7 +63,105 @@ class TestPredictionGenerator:
         mock_format_history.assert_called_once_with(conversation_history)
         mock_azure_client.create_chat_completion.assert_called_once()
     
-    @patch('src.prediction.generator.azure_client')
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
+    @patch('src.prediction.generator.format_financial_context')
+    def test_context_formatted_once_per_report(self, mock_format_context, mock_azure_client):
+        """Test that later turns of a conversation reuse the formatted context."""
+        mock_format_context.return_value = "Financial context"
+        mock_azure_client.get_system_prompt.return_value = "System prompt"
+        mock_azure_client.create_chat_completion.return_value = '{"program": "add(1, 2)", "answer": 3}'
+        financial_report = {"table": [["Revenue", "300"]]}
+
+        generator = PredictionGenerator()
+        for question in ["First?", "Second?", "Third?"]:
+            generator.generate_prediction(financial_report, [], question)
+
+        mock_format_context.assert_called_once_with(financial_report)
+        for call in mock_azure_client.create_chat_completion.call_args_list:
+            assert "Financial context" in call.args[0][1]["content"]
+
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
+    @patch('src.prediction.generator.format_financial_context')
+    def test_context_cached_by_report_id(self, mock_format_context, mock_azure_client):
+        """Test that the item id is used as the context cache key."""
+        mock_format_context.return_value = "Financial context"
+        mock_azure_client.get_system_prompt.return_value = "System prompt"
+        mock_azure_client.create_chat_completion.return_value = '{"program": "add(1, 2)", "answer": 3}'
+        financial_report = {"table": [["Revenue", "300"]]}
+
+        generator = PredictionGenerator()
+        with patch.object(generator.context_cache, 'content_id') as mock_content_id:
+            for question in ["First?", "Second?"]:
+                generator.generate_prediction(financial_report, [], question, report_id="item0")
+
+        mock_format_context.assert_called_once_with(financial_report)
+        mock_content_id.assert_not_called()
+
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
+    @patch('src.prediction.generator.format_financial_context')
+    @patch('src.prediction.generator.format_conversation_history')
+    def test_precompiled_prompt_parts(self, mock_format_history, mock_format_context, mock_azure_client):
+        """Test that precompiled context and history skip formatting."""
+        mock_azure_client.get_system_prompt.return_value = "System prompt"
+        mock_azure_client.create_chat_completion.return_value = '{"program": "add(1, 2)", "answer": 3}'
+
+        generator = PredictionGenerator()
+        generator.generate_prediction(
+            {"table": []}, [], "What is the total?",
+            context="Compiled context", history_text="Compiled history"
+        )
+
+        mock_format_context.assert_not_called()
+        mock_format_history.assert_not_called()
+        user_message = mock_azure_client.create_chat_completion.call_args.args[0][1]["content"]
+        assert "Compiled context" in user_message
+        assert "Compiled history" in user_message
+
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
+    @patch('src.prediction.generator.config')
+    def test_retrieval_prunes_context(self, mock_config, mock_azure_client):
+        """Test that retrieval sends only the snippets relevant to the question."""
+        mock_config.retrieval_enabled = True
+        mock_config.recompute_answers = False
+        mock_azure_client.get_system_prompt.return_value = "System prompt"
+        mock_azure_client.create_chat_completion.return_value = '{"program": "1200", "answer": 1200}'
+        financial_report = {
+            'pre_text': ['interest expense increased .', 'weather reduced sales .'],
+            'table': [['', '2009'], ['net revenue', '1200'], ['headcount', '45']]
+        }
+
+        generator = PredictionGenerator()
+        with patch('src.data.retrieval.config') as retrieval_config:
+            retrieval_config.retrieval_top_k = 1
+            retrieval_config.retrieval_token_budget = 1000
+            generator.generate_prediction(financial_report, [], "What was net revenue?")
+
+        user_message = mock_azure_client.create_chat_completion.call_args.args[0][1]["content"]
+        assert '"": "net revenue"' in user_message
+        assert 'headcount' not in user_message
+        assert 'weather' not in user_message
+
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
+    def test_over_budget_prompt_trimmed(self, mock_azure_client):
+        """Test that prompts over the token budget drop older history first."""
+        mock_azure_client.get_system_prompt.return_value = "System prompt"
+        mock_azure_client.create_chat_completion.return_value = '{"program": "1", "answer": 1}'
+        history = [
+            {"question": f"old question {i} " + "padding " * 50, "expected_answer": i}
+            for i in range(3)
+        ]
+
+        generator = PredictionGenerator()
+        full = generator._build_messages({"pre_text": ["Revenue grew."]}, history, "Why?")
+        generator.budget.max_tokens = count_message_tokens(full) - 10
+        trimmed = generator._build_messages({"pre_text": ["Revenue grew."]}, history, "Why?")
+
+        assert "old question 0" in full[1]["content"]
+        assert "old question 0" not in trimmed[1]["content"]
+        assert "old question 2" in trimmed[1]["content"]
+        assert "Revenue grew." in trimmed[1]["content"]
+
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
     def test_generate_prediction_api_error(self, mock_azure_client):
         """Test prediction generation with API error."""
         # Setup mock to raise exception
@@ -57,8 +174,9 @@ class TestPredictionGenerator:
         # Should return default values on error
         assert result["predicted_program"] == ""
         assert result["predicted_answer"] == 0.0
+        assert result["error"] == "API error"
     
-    @patch('src.prediction.generator.azure_client')
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
     def test_generate_prediction_json_response(self, mock_azure_client):
         """Test prediction with valid JSON response."""
         mock_azure_client.get_system_prompt.return_value = "System prompt"
@@ -75,7 +193,7 @@ class TestPredictionGenerator:
         assert result["predicted_program"] == "divide(500, 1000)"
         assert result["predicted_answer"] == 0.5
     
-    @patch('src.prediction.generator.azure_client')
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
     @patch('src.prediction.generator.parse_program_answer_from_text')
     def test_generate_prediction_fallback_parsing(self, mock_parse_fallback, mock_azure_client):
         """Test prediction with fallback parsing."""
@@ -92,6 +210,34 @@ class TestPredictionGenerator:
         assert result["predicted_answer"] == 42.0
         mock_parse_fallback.assert_called_once_with("Invalid JSON response")
     
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
+    def test_agenerate_prediction_success(self, mock_azure_client):
+        """Test async prediction generation."""
+        mock_azure_client.get_system_prompt.return_value = "System prompt"
+        mock_azure_client.acreate_chat_completion = AsyncMock(
+            return_value='{"program": "add(100, 200)", "answer": 300}'
+        )
+        
+        generator = PredictionGenerator()
+        result = asyncio.run(generator.agenerate_prediction({}, [], "What is the total?"))
+        
+        assert result["predicted_program"] == "add(100, 200)"
+        assert result["predicted_answer"] == 300.0
+        mock_azure_client.acreate_chat_completion.assert_awaited_once()
+        mock_azure_client.create_chat_completion.assert_not_called()
+    
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
+    def test_agenerate_prediction_api_error(self, mock_azure_client):
+        """Test async prediction generation with API error."""
+        mock_azure_client.get_system_prompt.return_value = "System prompt"
+        mock_azure_client.acreate_chat_completion = AsyncMock(side_effect=Exception("API error"))
+        
+        generator = PredictionGenerator()
+        result = asyncio.run(generator.agenerate_prediction({}, [], "Test question"))
+        
+        assert result["predicted_program"] == ""
+        assert result["predicted_answer"] == 0.0
+    
     def test_create_user_message(self):
         """Test user message creation."""
         generator = PredictionGenerator()
@@ -173,8 +319,55 @@ class TestPredictionGenerator:
         
         assert result["predicted_program"] == ""
         assert result["predicted_answer"] == 0.0
-    
-    @patch('src.prediction.generator.azure_client')
+
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
+    def test_generate_prediction_corrects_arithmetic_slip(self, mock_azure_client):
+        """Test that the executed program result replaces a wrong answer."""
+        mock_azure_client.get_system_prompt.return_value = "System prompt"
+        mock_azure_client.create_chat_completion.return_value = (
+            '{"program": "subtract(206588, 181001)", "answer": 25687}'
+        )
+
+        generator = PredictionGenerator()
+        result = generator.generate_prediction({}, [], "What was the change?")
+
+        assert result["predicted_program"] == "subtract(206588, 181001)"
+        assert result["predicted_answer"] == 25587.0
+
+    def test_reconcile_answer_keeps_matching_answers(self):
+        """Test that rounded and percentage-scaled answers are kept."""
+        generator = PredictionGenerator()
+
+        rounded = {"predicted_program": "divide(25587, 181001)", "predicted_answer": 0.14136}
+        as_percentage = {"predicted_program": "divide(25587, 181001)", "predicted_answer": 14.136}
+
+        assert generator._reconcile_answer(rounded) == rounded
+        assert generator._reconcile_answer(as_percentage) == as_percentage
+
+    def test_reconcile_answer_ignores_unexecutable_programs(self):
+        """Test that programs that cannot run leave the answer untouched."""
+        generator = PredictionGenerator()
+        prediction = {"predicted_program": "table_sum(revenue, none)", "predicted_answer": 5.0}
+
+        assert generator._reconcile_answer(prediction) == prediction
+
+    def test_reconcile_answer_ignores_non_string_programs(self):
+        """Test that a numeric program from the model JSON is not an error."""
+        generator = PredictionGenerator()
+        prediction = {"predicted_program": 206588, "predicted_answer": 206588.0}
+
+        assert generator._reconcile_answer(prediction) == prediction
+
+    @patch('src.prediction.generator.config')
+    def test_reconcile_answer_disabled(self, mock_config):
+        """Test that answers are kept when recomputation is disabled."""
+        mock_config.recompute_answers = False
+        generator = PredictionGenerator()
+        prediction = {"predicted_program": "add(1, 2)", "predicted_answer": 4.0}
+
+        assert generator._reconcile_answer(prediction) == prediction
+
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
     def test_generate_prediction_with_complex_data(self, mock_azure_client):
         """Test prediction generation with complex input data."""
         mock_azure_client.get_system_prompt.return_value = "System prompt"
@@ -214,7 +407,7 @@ class TestPredictionGenerator:
         assert result["predicted_program"] == "complex_calc()"
         assert result["predicted_answer"] == 12345.67
     
-    @patch('src.prediction.generator.azure_client')
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
     def test_generate_prediction_empty_inputs(self, mock_azure_client):
         """Test prediction generation with empty inputs."""
         mock_azure_client.get_system_prompt.return_value = "System prompt"
@@ -228,15 +421,18 @@ class TestPredictionGenerator:
 
 
 class TestGlobalPredictionGenerator:
-    """Test cases for global prediction_generator instance."""
+    """Test cases for the shared generator created by get_prediction_generator."""
     
     def test_global_generator_exists(self):
-        """Test that global prediction_generator instance exists."""
-        assert prediction_generator is not None
+        """Test that the shared generator is created once and reused."""
+        prediction_generator = get_prediction_generator()
         assert isinstance(prediction_generator, PredictionGenerator)
+        assert get_prediction_generator() is prediction_generator
+        assert generator_module.prediction_generator is prediction_generator
     
     def test_global_generator_methods(self):
         """Test that global generator has expected methods."""
+        prediction_generator = get_prediction_generator()
         assert hasattr(prediction_generator, 'generate_prediction')
         assert callable(prediction_generator.generate_prediction)
         
@@ -250,7 +446,7 @@ class TestGlobalPredictionGenerator:
 class TestPredictionGeneratorIntegration:
     """Integration test cases for PredictionGenerator."""
     
-    @patch('src.prediction.generator.azure_client')
+    @patch('src.prediction.generator.get_azure_client', new_callable=mock_client_factory)
     def test_full_prediction_flow(self, mock_azure_client):
         """Test full prediction generation flow."""
         # Setup mock responses
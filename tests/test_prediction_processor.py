@@ -0,0 +1,418 @@
+"""Tests for src/prediction/processor.py"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import tempfile
+from unittest.mock import Mock, patch
+
+from src.data.corpus import build_corpus
+from src.data.formatter import format_conversation_history
+from src.prediction.checkpoint import CheckpointJournal
+from src.prediction.processor import DatasetProcessor, get_dataset_processor
+from src.utils.metrics import CallMetrics, TurnMetricsWriter, record_call
+
+
+@pytest.fixture
+def processor():
+    """DatasetProcessor with a mocked prediction generator."""
+    processor = DatasetProcessor()
+    processor.generator = Mock()
+    processor.generator.generate_prediction.return_value = {
+        "predicted_program": "1",
+        "predicted_answer": 1.0
+    }
+    return processor
+
+
+class TestProcessItems:
+    """Test cases for DatasetProcessor._process_items."""
+
+    def test_serial_processing(self, processor, make_item):
+        """Test processing with a single worker."""
+        data = [make_item('a', 2), make_item('b', 3)]
+
+        results, stats = processor._process_items(data, max_workers=1)
+
+        assert [r['id'] for r in results] == ['a', 'b']
+        assert stats['total_items'] == 2
+        assert stats['total_turns'] == 5
+        assert stats['successful_predictions'] == 5
+        assert stats['failed_predictions'] == 0
+        assert stats['success_rate'] == 100
+
+    def test_concurrent_processing_preserves_input_order(self, processor, make_item):
+        """Test that results keep input order when later items finish first."""
+        def slow_first_item(financial_report, conversation_history, current_question, **prompt_parts):
+            if current_question.startswith('item0 '):
+                time.sleep(0.05)
+            return {"predicted_program": current_question, "predicted_answer": 1.0}
+
+        processor.generator.generate_prediction.side_effect = slow_first_item
+        data = [make_item(f'item{i}', 2) for i in range(6)]
+
+        results, stats = processor._process_items(data, max_workers=4)
+
+        assert [r['id'] for r in results] == [f'item{i}' for i in range(6)]
+        for result in results:
+            programs = [turn['predicted_program'] for turn in result['conversation']]
+            assert programs == [turn['question'] for turn in result['conversation']]
+        assert stats['total_turns'] == 12
+
+    def test_concurrent_processing_runs_items_in_parallel(self, processor, make_item):
+        """Test that several items are in flight at the same time."""
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def track_concurrency(financial_report, conversation_history, current_question, **prompt_parts):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return {"predicted_program": "", "predicted_answer": 0.0}
+
+        processor.generator.generate_prediction.side_effect = track_concurrency
+        data = [make_item(f'item{i}', 1) for i in range(4)]
+
+        processor._process_items(data, max_workers=4)
+
+        assert peak > 1
+
+    def test_turns_within_item_receive_growing_history(self, processor, make_item):
+        """Test that each turn sees the previous turns of its conversation only."""
+        history_lengths = {}
+        lock = threading.Lock()
+
+        def record_history(financial_report, conversation_history, current_question, **prompt_parts):
+            with lock:
+                history_lengths[current_question] = [t['question'] for t in conversation_history]
+                history_texts[current_question] = prompt_parts['history_text']
+            return {"predicted_program": "", "predicted_answer": 0.0}
+
+        history_texts = {}
+        processor.generator.generate_prediction.side_effect = record_history
+        data = [make_item('a', 3), make_item('b', 2)]
+
+        processor._process_items(data, max_workers=2)
+
+        assert history_lengths['a question 2'] == ['a question 0', 'a question 1']
+        assert history_lengths['b question 1'] == ['b question 0']
+        assert history_texts['a question 0'] == ""
+        assert history_texts['a question 2'] == format_conversation_history(data[0]['conversation'][:2])
+
+    def test_turn_failure_is_counted(self, processor, make_item):
+        """Test that a failing turn is recorded with empty predictions."""
+        processor.generator.generate_prediction.side_effect = [
+            {"predicted_program": "1", "predicted_answer": 1.0},
+            Exception("API error")
+        ]
+        data = [make_item('a', 2)]
+
+        results, stats = processor._process_items(data, max_workers=1)
+
+        assert stats['successful_predictions'] == 1
+        assert stats['failed_predictions'] == 1
+        assert results[0]['conversation'][1]['predicted_program'] == ""
+        assert results[0]['conversation'][1]['predicted_answer'] == 0.0
+
+
+class TestProcessDataset:
+    """Test cases for DatasetProcessor.process_dataset."""
+
+    def test_process_dataset_end_to_end(self, processor, make_item):
+        """Test loading, processing and saving a small dataset."""
+        data = [make_item(f'item{i}', 2) for i in range(3)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, 'output.json')
+            with open(input_file, 'w') as f:
+                json.dump(data, f)
+
+            stats = processor.process_dataset(
+                input_file, output_file, max_items=2, max_workers=2
+            )
+
+            with open(output_file) as f:
+                saved = json.load(f)
+
+        assert stats['total_items'] == 2
+        assert [item['id'] for item in saved] == ['item0', 'item1']
+        assert saved[0]['conversation'][0]['predicted_answer'] == 1.0
+
+    def test_process_dataset_with_corpus(self, processor, make_item):
+        """Test that prompts are taken from a precompiled corpus."""
+        data = [make_item(f'item{i}', 2) for i in range(2)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, 'output.json')
+            corpus_file = os.path.join(temp_dir, 'input.corpus.jsonl')
+            with open(input_file, 'w') as f:
+                json.dump(data, f)
+            build_corpus(input_file, corpus_file)
+
+            processor.process_dataset(input_file, output_file, max_workers=2, corpus_file=corpus_file)
+
+        calls = processor.generator.generate_prediction.call_args_list
+        assert len(calls) == 4
+        assert sorted(call.kwargs['report_id'] for call in calls) == ['item0', 'item0', 'item1', 'item1']
+        assert all('Report item' in call.kwargs['context'] for call in calls)
+        assert calls[0].kwargs['history_text'] == ""
+        assert 'question 0' in calls[1].kwargs['history_text']
+
+    def test_stale_corpus_ignored(self, processor, make_item):
+        """Test that a corpus built from a different input is not used."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, 'output.json')
+            corpus_file = os.path.join(temp_dir, 'input.corpus.jsonl')
+            with open(input_file, 'w') as f:
+                json.dump([make_item('item0', 1)], f)
+            build_corpus(input_file, corpus_file)
+            with open(input_file, 'w') as f:
+                json.dump([make_item('item0', 1), make_item('item1', 1)], f)
+
+            processor.process_dataset(input_file, output_file, max_workers=1, corpus_file=corpus_file)
+
+        for call in processor.generator.generate_prediction.call_args_list:
+            assert 'context' not in call.kwargs
+
+    def test_checkpoint_removed_after_successful_run(self, processor, make_item):
+        """Test that the checkpoint journal is deleted once results are saved."""
+        data = [make_item('item0', 1)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, 'output.json')
+            with open(input_file, 'w') as f:
+                json.dump(data, f)
+
+            processor.process_dataset(input_file, output_file, max_workers=1)
+
+            assert not os.path.exists(CheckpointJournal.path_for(output_file))
+
+    def test_resume_skips_checkpointed_items(self, processor, make_item):
+        """Test that a crashed run resumes without re-predicting finished items."""
+        data = [make_item(f'item{i}', 2) for i in range(3)]
+
+        def crash_on_item2(financial_report, conversation_history, current_question, **prompt_parts):
+            if current_question.startswith('item2 '):
+                raise KeyboardInterrupt
+            return {"predicted_program": "1", "predicted_answer": 1.0}
+
+        processor.generator.generate_prediction.side_effect = crash_on_item2
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, 'output.json')
+            with open(input_file, 'w') as f:
+                json.dump(data, f)
+
+            with pytest.raises(KeyboardInterrupt):
+                processor.process_dataset(input_file, output_file, max_workers=1)
+            assert not os.path.exists(output_file)
+
+            processor.generator.generate_prediction.side_effect = None
+            stats = processor.process_dataset(input_file, output_file, max_workers=1, resume=True)
+
+            with open(output_file) as f:
+                saved = json.load(f)
+
+        assert [item['id'] for item in saved] == ['item0', 'item1', 'item2']
+        # 4 turns + the crashing turn in the first run, only item2 in the second
+        assert processor.generator.generate_prediction.call_count == 4 + 1 + 2
+        assert stats['total_turns'] == 6
+
+    def test_items_with_failed_turns_not_checkpointed(self, processor, make_item):
+        """Test that items with failed predictions are retried on resume."""
+        processor.generator.generate_prediction.return_value = {
+            "predicted_program": "",
+            "predicted_answer": 0.0,
+            "error": "quota exceeded"
+        }
+        data = [make_item('item0', 1)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal = CheckpointJournal(os.path.join(temp_dir, 'journal.jsonl'))
+            journal.open()
+            results, stats = processor._process_items(data, 1, journal, {})
+            journal.close()
+
+            assert journal.load() == {}
+        assert stats['failed_predictions'] == 1
+        assert 'error' not in results[0]['conversation'][0]
+
+    def test_resume_after_run_with_failed_turns(self, processor, make_item):
+        """Test that a run ending with failed turns keeps its checkpoint for resume."""
+        data = [make_item(f'item{i}', 1) for i in range(4)]
+
+        def quota_exhausted_on_item2(financial_report, conversation_history, current_question, **prompt_parts):
+            if current_question.startswith('item2 '):
+                return {"predicted_program": "", "predicted_answer": 0.0, "error": "429 quota exceeded"}
+            return {"predicted_program": "1", "predicted_answer": 1.0}
+
+        processor.generator.generate_prediction.side_effect = quota_exhausted_on_item2
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, 'output.json')
+            with open(input_file, 'w') as f:
+                json.dump(data, f)
+
+            stats = processor.process_dataset(input_file, output_file, max_workers=1)
+            assert stats['failed_predictions'] == 1
+            assert os.path.exists(CheckpointJournal.path_for(output_file))
+
+            processor.generator.generate_prediction.reset_mock(side_effect=True)
+            stats = processor.process_dataset(input_file, output_file, max_workers=1, resume=True)
+
+            assert not os.path.exists(CheckpointJournal.path_for(output_file))
+
+        assert processor.generator.generate_prediction.call_count == 1
+        assert stats['failed_predictions'] == 0
+
+    def test_process_dataset_jsonl_output(self, processor, make_item):
+        """Test streaming results as JSON Lines in input order."""
+        data = [make_item(f'item{i}', 1) for i in range(5)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, 'output.jsonl')
+            with open(input_file, 'w') as f:
+                json.dump(data, f)
+
+            stats = processor.process_dataset(
+                input_file, output_file, max_workers=3, output_format='jsonl'
+            )
+
+            with open(output_file) as f:
+                saved = [json.loads(line) for line in f]
+
+        assert stats['total_items'] == 5
+        assert [item['id'] for item in saved] == [f'item{i}' for i in range(5)]
+
+    @pytest.mark.parametrize("output_format", ['json', 'jsonl'])
+    def test_failed_run_keeps_previous_output(self, processor, output_format, make_item):
+        """Test that a run that crashes part way leaves the previous results file alone."""
+        data = [make_item(f'item{i}', 1) for i in range(3)]
+        processor.generator.generate_prediction.side_effect = [
+            {"predicted_program": "1", "predicted_answer": 1.0},
+            KeyboardInterrupt
+        ]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, f'output.{output_format}')
+            with open(input_file, 'w') as f:
+                json.dump(data, f)
+            with open(output_file, 'w') as f:
+                f.write('previous results')
+
+            with pytest.raises(KeyboardInterrupt):
+                processor.process_dataset(input_file, output_file, max_workers=1, output_format=output_format)
+
+            with open(output_file) as f:
+                assert f.read() == 'previous results'
+            assert not os.path.exists(f'{output_file}.tmp')
+
+    def test_process_dataset_writes_call_metrics(self, processor, make_item):
+        """Test the per-turn call metrics saved next to the predictions."""
+        def predict(financial_report, conversation_history, current_question, **prompt_parts):
+            record_call(CallMetrics(latency=0.5, prompt_tokens=100, completion_tokens=10, attempts=1))
+            if current_question == 'item1 question 0':
+                record_call(CallMetrics(cache_hit=True))
+            return {"predicted_program": "1", "predicted_answer": 1.0}
+
+        processor.generator.generate_prediction.side_effect = predict
+        data = [make_item('item0', 2), make_item('item1', 1)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, 'input.json')
+            output_file = os.path.join(temp_dir, 'output.json')
+            with open(input_file, 'w') as f:
+                json.dump(data, f)
+
+            stats = processor.process_dataset(input_file, output_file, max_workers=2)
+
+            records_path, summary_path = TurnMetricsWriter.paths_for(output_file)
+            with open(records_path) as f:
+                records = [json.loads(line) for line in f]
+            assert os.path.exists(summary_path)
+
+        assert [r['question_id'] for r in records] == ['item0-0', 'item0-1', 'item1-0']
+        assert records[2]['calls'] == 2
+        assert records[2]['cache_hits'] == 1
+        assert all(r['success'] for r in records)
+        assert stats['call_metrics']['prompt_tokens'] == 300
+        assert stats['call_metrics']['cache_hits'] == 1
+
+
+class TestIterItemOutcomes:
+    """Test cases for DatasetProcessor._iter_item_outcomes."""
+
+    def test_submission_window_is_bounded(self, processor, make_item):
+        """Test that items are not all submitted up front."""
+        started = []
+        lock = threading.Lock()
+
+        def record_start(financial_report, conversation_history, current_question, **prompt_parts):
+            with lock:
+                started.append(current_question)
+            time.sleep(0.01)
+            return {"predicted_program": "", "predicted_answer": 0.0}
+
+        processor.generator.generate_prediction.side_effect = record_start
+        data = [make_item(f'item{i}', 1) for i in range(20)]
+
+        outcomes = processor._iter_item_outcomes(data, max_workers=2)
+        next(outcomes)
+        time.sleep(0.05)
+
+        with lock:
+            assert len(started) <= 5
+        outcomes.close()
+
+
+class TestLazyConstruction:
+    """Test cases for the lazily created shared instances."""
+
+    def test_generator_created_on_first_use(self):
+        """Test that the shared generator is only fetched when needed."""
+        with patch('src.prediction.processor.get_prediction_generator') as mock_get_generator:
+            processor = DatasetProcessor()
+            mock_get_generator.assert_not_called()
+
+            assert processor.generator is mock_get_generator.return_value
+            mock_get_generator.assert_called_once()
+
+    def test_shared_processor(self):
+        """Test that get_dataset_processor always returns the same processor."""
+        assert get_dataset_processor() is get_dataset_processor()
+
+    def test_import_has_no_side_effects(self):
+        """Test that the entry points import without credentials or clients."""
+        code = (
+            "import main, eval\n"
+            "from src.api import azure_client\n"
+            "from src.prediction import generator, processor\n"
+            "assert azure_client._azure_client is None\n"
+            "assert generator._prediction_generator is None\n"
+            "assert processor._dataset_processor is None\n"
+        )
+        env = {k: v for k, v in os.environ.items() if not k.startswith('AZURE_OPENAI')}
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=root, env=env, capture_output=True, text=True
+        )
+
+        assert result.returncode == 0, result.stderr
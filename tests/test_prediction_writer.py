@@ -0,0 +1,124 @@
+"""Tests for src/prediction/writer.py"""
+
+import json
+import os
+import pytest
+
+from src.prediction.writer import (
+    JsonResultWriter,
+    JsonlResultWriter,
+    create_result_writer
+)
+
+
+class TestJsonResultWriter:
+    """Test cases for JsonResultWriter class."""
+    
+    def test_writes_array_on_close(self, tmp_path):
+        """Test that items are written as one JSON array on close."""
+        output_file = str(tmp_path / 'nested' / 'out.json')
+        writer = JsonResultWriter(output_file)
+        writer.write({'id': 'a'})
+        writer.write({'id': 'b'})
+        
+        assert not os.path.exists(output_file)
+        writer.close()
+        
+        with open(output_file) as f:
+            assert json.load(f) == [{'id': 'a'}, {'id': 'b'}]
+        assert writer.count == 2
+        assert not os.path.exists(writer.temp_file)
+    
+    def test_abort_keeps_previous_output(self, tmp_path):
+        """Test that an aborted writer leaves the existing output file alone."""
+        output_file = str(tmp_path / 'out.json')
+        with open(output_file, 'w') as f:
+            json.dump([{'id': 'old'}], f)
+        writer = JsonResultWriter(output_file)
+        writer.write({'id': 'a'})
+        writer.abort()
+        writer.close()
+        
+        with open(output_file) as f:
+            assert json.load(f) == [{'id': 'old'}]
+
+
+class TestJsonlResultWriter:
+    """Test cases for JsonlResultWriter class."""
+    
+    def test_writes_one_line_per_item(self, tmp_path):
+        """Test JSON Lines output."""
+        output_file = str(tmp_path / 'out.jsonl')
+        writer = JsonlResultWriter(output_file)
+        writer.write({'id': 'a', 'text': 'multi\nline'})
+        writer.write({'id': 'b'})
+        writer.close()
+        
+        with open(output_file) as f:
+            lines = f.read().splitlines()
+        
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == {'id': 'a', 'text': 'multi\nline'}
+        assert json.loads(lines[1]) == {'id': 'b'}
+    
+    def test_flush_interval(self, tmp_path):
+        """Test that items become visible on disk at each flush."""
+        output_file = str(tmp_path / 'out.jsonl')
+        writer = JsonlResultWriter(output_file, flush_interval=2)
+        
+        writer.write({'id': 'a'})
+        writer.write({'id': 'b'})
+        with open(writer.temp_file) as f:
+            assert len(f.read().splitlines()) == 2
+        
+        writer.write({'id': 'c'})
+        writer.close()
+        with open(output_file) as f:
+            assert len(f.read().splitlines()) == 3
+    
+    def test_close_is_idempotent(self, tmp_path):
+        """Test closing twice, and aborting after close."""
+        output_file = str(tmp_path / 'out.jsonl')
+        writer = JsonlResultWriter(output_file)
+        writer.close()
+        writer.close()
+        writer.abort()
+        
+        assert os.path.exists(output_file)
+    
+    def test_abort_keeps_previous_output(self, tmp_path):
+        """Test that partial results never replace the existing output file."""
+        output_file = str(tmp_path / 'out.jsonl')
+        with open(output_file, 'w') as f:
+            f.write('{"id": "old"}\n')
+        writer = JsonlResultWriter(output_file)
+        writer.write({'id': 'a'})
+        
+        with open(output_file) as f:
+            assert f.read() == '{"id": "old"}\n'
+        writer.abort()
+        
+        with open(output_file) as f:
+            assert f.read() == '{"id": "old"}\n'
+        assert not os.path.exists(writer.temp_file)
+
+
+class TestCreateResultWriter:
+    """Test cases for create_result_writer function."""
+    
+    def test_json_format(self, tmp_path):
+        """Test creating a JSON writer."""
+        writer = create_result_writer(str(tmp_path / 'out.json'), 'json')
+        assert isinstance(writer, JsonResultWriter)
+    
+    def test_jsonl_format(self, tmp_path):
+        """Test creating a JSONL writer."""
+        writer = create_result_writer(str(tmp_path / 'out.jsonl'), 'jsonl', flush_interval=5)
+        assert isinstance(writer, JsonlResultWriter)
+        assert writer.flush_interval == 5
+        writer.close()
+    
+    def test_unsupported_format(self, tmp_path):
+        """Test that unknown formats are rejected."""
+        with pytest.raises(ValueError, match="Unsupported output format"):
+            create_result_writer(str(tmp_path / 'out.csv'), 'csv')
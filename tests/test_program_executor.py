@@ -0,0 +1,142 @@
+"""Tests for src/utils/program_executor.py"""
+
+import pytest
+
+from src.utils.program_executor import (
+    MAX_NESTING_DEPTH,
+    ProgramError,
+    execute_program,
+    parse_program,
+    try_execute_program
+)
+
+
+class TestExecuteProgram:
+    """Test cases for execute_program function."""
+
+    def test_single_step(self):
+        """Test a single operation."""
+        assert execute_program("subtract(206588, 181001)") == 25587
+
+    def test_back_references(self):
+        """Test '#n' references to earlier step results."""
+        result = execute_program("subtract(206588, 181001), divide(#0, 181001)")
+        assert result == pytest.approx(0.14136, rel=1e-4)
+
+    def test_all_operations(self):
+        """Test every supported operation."""
+        assert execute_program("add(1.5, 2)") == 3.5
+        assert execute_program("subtract(1, 3)") == -2
+        assert execute_program("multiply(4, 2.5)") == 10
+        assert execute_program("divide(9, 3)") == 3
+        assert execute_program("exp(1.1, 2)") == pytest.approx(1.21)
+        assert execute_program("greater(5, 3)") == 1.0
+        assert execute_program("greater(3, 5)") == 0.0
+
+    def test_constants(self):
+        """Test const_* values, including negative constants."""
+        assert execute_program("subtract(75.95, const_100)") == pytest.approx(-24.05)
+        assert execute_program("multiply(1.5, const_1000)") == 1500
+        assert execute_program("multiply(2, const_m1)") == -2
+
+    def test_percentages_and_negative_numbers(self):
+        """Test '%' suffixes and negative literals."""
+        assert execute_program("multiply(1500, 4.02%)") == pytest.approx(60.3)
+        assert execute_program("divide(-2620, 7983)") == pytest.approx(-0.3282, rel=1e-3)
+
+    def test_bare_number(self):
+        """Test a direct lookup program."""
+        assert execute_program("9362.2") == 9362.2
+
+    def test_nested_calls(self):
+        """Test calls used as arguments."""
+        assert execute_program("multiply(divide(subtract(10, 5), 5), 100)") == 100
+
+    def test_whitespace_is_ignored(self):
+        """Test programs with irregular spacing."""
+        assert execute_program("  add( 1 ,2 ) ,multiply( #0,2 ) ") == 6
+
+    @pytest.mark.parametrize("program", [
+        "",
+        "add(1)",
+        "add(1, 2, 3)",
+        "add(1, 2",
+        "add 1, 2",
+        "table_max(revenue, none)",
+        "const_abc",
+        "divide(#1, 2)",
+        "add(1, 2) multiply(3, 4)",
+        "add(1, $2)",
+    ])
+    def test_invalid_programs(self, program):
+        """Test that malformed programs raise ProgramError."""
+        with pytest.raises(ProgramError):
+            execute_program(program)
+
+    def test_division_by_zero(self):
+        """Test that division by zero raises ProgramError."""
+        with pytest.raises(ProgramError, match="Division by zero"):
+            execute_program("subtract(5, 5), divide(10, #0)")
+
+    def test_program_error_is_value_error(self):
+        """Test that callers catching ValueError also catch ProgramError."""
+        assert issubclass(ProgramError, ValueError)
+
+    def test_results_are_cached(self):
+        """Test that repeated programs are served from the cache."""
+        execute_program.cache_clear()
+        execute_program("add(40, 2)")
+        execute_program("add(40, 2)")
+
+        info = execute_program.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+
+class TestParseProgram:
+    """Test cases for parse_program function."""
+
+    def test_nesting_limit(self):
+        """Test that nesting up to MAX_NESTING_DEPTH is accepted."""
+        depth = MAX_NESTING_DEPTH
+        assert execute_program("add(1, " * depth + "1" + ")" * depth) == depth + 1
+
+        depth += 1
+        with pytest.raises(ProgramError):
+            parse_program("add(1, " * depth + "1" + ")" * depth)
+
+    def test_parse_steps(self):
+        """Test the parsed representation of a two-step program."""
+        steps = parse_program("subtract(5, const_1), divide(#0, 2)")
+
+        assert steps == (
+            ('subtract', (5.0, 1.0)),
+            ('divide', (('ref', 0), 2.0)),
+        )
+
+
+class TestTryExecuteProgram:
+    """Test cases for try_execute_program function."""
+
+    def test_valid_program(self):
+        """Test that valid programs return their result."""
+        assert try_execute_program("add(1, 2)") == 3
+
+    def test_invalid_program_returns_none(self):
+        """Test that errors are swallowed."""
+        assert try_execute_program("not a program") is None
+        assert try_execute_program("") is None
+        assert try_execute_program(None) is None
+
+    def test_non_string_program_returns_none(self):
+        """Test that a program given as a number is not executed."""
+        assert try_execute_program(206588) is None
+
+    def test_deeply_nested_program_returns_none(self):
+        """Test that nesting beyond the limit fails cleanly instead of exhausting the stack."""
+        depth = 5000
+        program = "add(1, " * depth + "1" + ")" * depth
+
+        assert try_execute_program(program) is None
+        with pytest.raises(ProgramError, match="nested more than"):
+            parse_program(program)
@@ -0,0 +1,138 @@
+"""Tests for src/data/reader.py"""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from src.data import reader
+from src.data.reader import iter_items
+from src.utils.validation import validate_data_structure
+
+
+def write_file(tmp_path, name, content):
+    """Write content to a file in tmp_path and return its path."""
+    path = str(tmp_path / name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+def make_item(item_id):
+    """Build a minimal valid dataset item."""
+    return {
+        'id': item_id,
+        'financial_report': {'pre_text': ['Revenue grew 10%']},
+        'conversation': [{'question': 'what was revenue?'}]
+    }
+
+
+class TestIterItems:
+    """Test cases for iter_items function."""
+
+    def test_reads_json_array(self, tmp_path):
+        """Test reading every item of a JSON array."""
+        data = [make_item(f'item{i}') for i in range(3)]
+        path = write_file(tmp_path, 'data.json', json.dumps(data, indent=2))
+
+        assert list(iter_items(path)) == data
+
+    def test_reads_jsonl(self, tmp_path):
+        """Test reading a JSON Lines file, skipping blank lines."""
+        data = [make_item(f'item{i}') for i in range(3)]
+        content = "\n".join(json.dumps(item) for item in data) + "\n\n"
+        path = write_file(tmp_path, 'data.jsonl', content)
+
+        assert list(iter_items(path)) == data
+
+    def test_max_items_stops_before_rest_of_file(self, tmp_path):
+        """Test that reading stops after max_items without parsing the rest."""
+        content = json.dumps([make_item('item0'), make_item('item1')])[:-1] + ", {broken"
+        path = write_file(tmp_path, 'data.json', content)
+
+        with patch.object(reader, 'CHUNK_SIZE', 16):
+            items = list(iter_items(path, max_items=2))
+
+        assert [item['id'] for item in items] == ['item0', 'item1']
+
+    def test_values_split_across_chunks(self, tmp_path):
+        """Test values spanning several small chunks, including bare numbers."""
+        data = [12345, "text with ] and , inside", {"nested": [1, 2, {"a": None}]}, 6.5, True]
+        path = write_file(tmp_path, 'data.json', json.dumps(data))
+
+        for chunk_size in (1, 2, 3, 7):
+            with patch.object(reader, 'CHUNK_SIZE', chunk_size):
+                assert list(iter_items(path)) == data
+
+    def test_unicode_content(self, tmp_path):
+        """Test reading UTF-8 encoded text."""
+        data = [{"id": "1", "text": "测试数据"}]
+        path = write_file(tmp_path, 'data.json', json.dumps(data, ensure_ascii=False))
+
+        with patch.object(reader, 'CHUNK_SIZE', 5):
+            assert list(iter_items(path)) == data
+
+    def test_empty_array(self, tmp_path):
+        """Test that an empty array yields nothing."""
+        path = write_file(tmp_path, 'data.json', " [ ] ")
+
+        assert list(iter_items(path)) == []
+
+    def test_not_an_array(self, tmp_path):
+        """Test that a JSON object is rejected."""
+        path = write_file(tmp_path, 'data.json', json.dumps({"not": "an array"}))
+
+        with pytest.raises(ValueError, match="must contain a JSON array"):
+            list(iter_items(path))
+
+    def test_invalid_json(self, tmp_path):
+        """Test that malformed JSON raises JSONDecodeError."""
+        path = write_file(tmp_path, 'data.json', '[{"id": 1}, {broken')
+
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_items(path))
+
+    @pytest.mark.parametrize("content", ['[{"id": 1}, ', '[1,2', '[1, {"id": 2', '['])
+    def test_unterminated_array(self, tmp_path, content):
+        """Test that a truncated array is reported as an unexpected end of input."""
+        path = write_file(tmp_path, 'data.json', content)
+
+        with pytest.raises(json.JSONDecodeError, match="Unexpected end of input"):
+            list(iter_items(path))
+
+    @pytest.mark.parametrize("content", ['[1,]', '[1, 2 , ]', '[,]'])
+    def test_trailing_comma(self, tmp_path, content):
+        """Test that a trailing comma is rejected like json.loads does."""
+        path = write_file(tmp_path, 'data.json', content)
+
+        with pytest.raises(json.JSONDecodeError, match="Expecting value"):
+            list(iter_items(path))
+
+    def test_missing_delimiter(self, tmp_path):
+        """Test that values without a comma between them are rejected."""
+        path = write_file(tmp_path, 'data.json', '[1 2]')
+
+        with pytest.raises(json.JSONDecodeError, match="Expecting ',' delimiter"):
+            list(iter_items(path))
+
+    def test_file_not_found(self):
+        """Test that a missing file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            list(iter_items("non_existent_file.json"))
+
+    def test_validator_rejects_malformed_item(self, tmp_path):
+        """Test that items are validated as they are read."""
+        data = [make_item('item0'), {'id': 'item1'}]
+        path = write_file(tmp_path, 'data.json', json.dumps(data))
+
+        items = iter_items(path, validator=validate_data_structure)
+
+        assert next(items)['id'] == 'item0'
+        with pytest.raises(ValueError, match="Item 1: Missing required field 'financial_report'"):
+            next(items)
+
+    def test_validator_rejects_non_dict_item(self, tmp_path):
+        """Test that non-dictionary items fail validation."""
+        path = write_file(tmp_path, 'data.json', json.dumps(["not a dict"]))
+
+        with pytest.raises(ValueError, match="Must be a dictionary"):
+            list(iter_items(path, validator=validate_data_structure))
@@ -0,0 +1,117 @@
+"""Tests for src/api/cache.py"""
+
+import os
+import tempfile
+import threading
+import pytest
+
+from src.api.cache import ResponseCache
+
+
+@pytest.fixture
+def cache_path():
+    """Temporary path for a cache database."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield os.path.join(temp_dir, 'cache', 'responses.sqlite')
+
+
+class TestMakeKey:
+    """Test cases for ResponseCache.make_key."""
+    
+    def test_key_is_deterministic(self):
+        """Test that equal parts give equal keys regardless of order."""
+        key1 = ResponseCache.make_key(model='gpt', messages=[{'role': 'user', 'content': 'hi'}])
+        key2 = ResponseCache.make_key(messages=[{'role': 'user', 'content': 'hi'}], model='gpt')
+        
+        assert key1 == key2
+        assert len(key1) == 64
+    
+    def test_key_changes_with_parts(self):
+        """Test that any differing part changes the key."""
+        base = dict(model='gpt', messages=[{'role': 'user', 'content': 'hi'}], temperature=0.1)
+        
+        assert ResponseCache.make_key(**base) != ResponseCache.make_key(**{**base, 'temperature': 0.2})
+        assert ResponseCache.make_key(**base) != ResponseCache.make_key(**{**base, 'model': 'other'})
+        assert ResponseCache.make_key(**base) != ResponseCache.make_key(
+            **base, response_format={'type': 'json_object'}
+        )
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache class."""
+    
+    def test_get_miss_and_hit(self, cache_path):
+        """Test hit/miss counting."""
+        cache = ResponseCache(cache_path, max_size_bytes=1024)
+        
+        assert cache.get('k') is None
+        cache.set('k', 'value')
+        assert cache.get('k') == 'value'
+        
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 50
+        assert stats['entries'] == 1
+        assert stats['size_bytes'] == 5
+    
+    def test_persists_across_instances(self, cache_path):
+        """Test that entries survive reopening the database."""
+        cache = ResponseCache(cache_path, max_size_bytes=1024)
+        cache.set('k', 'value')
+        cache.close()
+        
+        reopened = ResponseCache(cache_path, max_size_bytes=1024)
+        assert reopened.get('k') == 'value'
+        assert reopened.stats()['size_bytes'] == 5
+    
+    def test_replace_updates_size(self, cache_path):
+        """Test that overwriting a key does not double count its size."""
+        cache = ResponseCache(cache_path, max_size_bytes=1024)
+        cache.set('k', 'aaaa')
+        cache.set('k', 'bb')
+        
+        assert cache.get('k') == 'bb'
+        assert cache.stats()['size_bytes'] == 2
+    
+    def test_lru_eviction(self, cache_path):
+        """Test that least recently used entries are evicted first."""
+        cache = ResponseCache(cache_path, max_size_bytes=10)
+        cache.set('a', 'xxxx')
+        cache.set('b', 'xxxx')
+        cache.get('a')  # 'b' is now least recently used
+        cache.set('c', 'xxxx')
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == 'xxxx'
+        assert cache.get('c') == 'xxxx'
+        assert cache.stats()['size_bytes'] == 8
+    
+    def test_clear(self, cache_path):
+        """Test clearing the cache."""
+        cache = ResponseCache(cache_path, max_size_bytes=1024)
+        cache.set('k', 'value')
+        cache.get('k')
+        cache.clear()
+        
+        stats = cache.stats()
+        assert stats['entries'] == 0
+        assert stats['size_bytes'] == 0
+        assert stats['hits'] == 0
+    
+    def test_concurrent_access(self, cache_path):
+        """Test that the cache can be shared between threads."""
+        cache = ResponseCache(cache_path, max_size_bytes=10 ** 6)
+        
+        def worker(worker_id):
+            for i in range(20):
+                cache.set(f'{worker_id}-{i}', 'value')
+                assert cache.get(f'{worker_id}-{i}') == 'value'
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert cache.stats()['entries'] == 80
@@ -0,0 +1,104 @@
+"""Tests for src/data/retrieval.py"""
+
+import pytest
+
+from src.data.formatter import format_financial_context
+from src.data.retrieval import ReportIndex, build_query, tokenize
+
+
+@pytest.fixture
+def report():
+    """Financial report with unrelated sentences and a small table."""
+    return {
+        'pre_text': [
+            'the company acquired a subsidiary in europe during 2009 .',
+            'interest expense increased due to new borrowings .',
+            'weather conditions reduced sales in the southern region .'
+        ],
+        'table': [
+            ['', '2009', '2008'],
+            ['net revenue', '$1,200', '$1,100'],
+            ['operating expenses', '(300)', '(250)'],
+            ['headcount', '45', '40']
+        ],
+        'post_text': [
+            'goodwill impairment was not recorded in either year .',
+            'the board approved a dividend of $0.50 per share .'
+        ]
+    }
+
+
+class TestTokenize:
+    """Test cases for tokenize function."""
+
+    def test_tokenize(self):
+        """Test lowercasing, stopword removal and thousands separators."""
+        assert tokenize('What was the Net Revenue of $1,200.5 in 2009?') == [
+            'net', 'revenue', '1200.5', '2009'
+        ]
+
+
+class TestReportIndex:
+    """Test cases for ReportIndex class."""
+
+    def test_scores_relevant_snippets_highest(self, report):
+        """Test that the matching table row outscores unrelated snippets."""
+        index = ReportIndex(report)
+
+        scores = index.score('what was net revenue in 2009?')
+
+        best = max(range(len(scores)), key=scores.__getitem__)
+        assert index.snippets[best] == ('table', 1, ' 2009 2008 net revenue $1,200 $1,100')
+
+    def test_prune_keeps_top_snippets_in_order(self, report):
+        """Test pruning to the top-k snippets with the table header kept."""
+        index = ReportIndex(report)
+
+        pruned = index.prune('what was the dividend per share and net revenue?', top_k=2, token_budget=1000)
+
+        assert pruned['pre_text'] == []
+        assert pruned['table'] == [['', '2009', '2008'], ['net revenue', '$1,200', '$1,100']]
+        assert pruned['post_text'] == ['the board approved a dividend of $0.50 per share .']
+        assert report['pre_text'][0].startswith('the company')  # original untouched
+
+    def test_prune_respects_token_budget(self, report):
+        """Test that lower-ranked snippets are dropped once the budget is used."""
+        index = ReportIndex(report)
+
+        pruned = index.prune('interest expense and weather in the southern region', top_k=5, token_budget=14)
+
+        assert pruned['pre_text'] == ['weather conditions reduced sales in the southern region .']
+        assert pruned['table'] == [['', '2009', '2008']]
+
+    def test_header_kept_when_no_row_selected(self, report):
+        """Test that the table header survives when only text snippets match."""
+        index = ReportIndex(report)
+
+        pruned = index.prune('dividend per share', top_k=1, token_budget=1000)
+
+        assert pruned['post_text'] == ['the board approved a dividend of $0.50 per share .']
+        assert pruned['table'] == [['', '2009', '2008']]
+        assert 'Financial Data' not in format_financial_context(pruned)
+
+    def test_small_report_unchanged(self, report):
+        """Test that reports within top_k and the budget are not pruned."""
+        index = ReportIndex(report)
+
+        assert index.prune('net revenue', top_k=20, token_budget=10000) is report
+
+    def test_no_match_keeps_full_report(self, report):
+        """Test that a question matching nothing falls back to the full report."""
+        index = ReportIndex(report)
+
+        assert index.prune('zzz qqq', top_k=1, token_budget=10) is report
+
+
+class TestBuildQuery:
+    """Test cases for build_query function."""
+
+    def test_build_query(self):
+        """Test that earlier questions are included for follow-ups."""
+        history = [{'question': 'what was net revenue in 2009?'}]
+
+        assert build_query('and in 2008?', history) == 'what was net revenue in 2009? and in 2008?'
+        assert build_query('and in 2008?', []) == 'and in 2008?'
@@ -0,0 +1,194 @@
+"""Tests for src/api/retry.py"""
+
+import asyncio
+import httpx
+import openai
+import pytest
+from email.utils import formatdate
+from unittest.mock import Mock, AsyncMock, patch
+
+from src.api.retry import (
+    is_transient_error,
+    get_retry_after,
+    compute_backoff,
+    call_with_retry,
+    acall_with_retry
+)
+
+
+REQUEST = httpx.Request('POST', 'https://test.openai.azure.com/chat/completions')
+
+
+def make_status_error(status_code, headers=None):
+    """Build an OpenAI status error for the given HTTP status."""
+    response = httpx.Response(status_code, headers=headers or {}, request=REQUEST)
+    error_classes = {
+        400: openai.BadRequestError,
+        401: openai.AuthenticationError,
+        429: openai.RateLimitError,
+    }
+    error_class = error_classes.get(status_code, openai.InternalServerError)
+    return error_class(f"HTTP {status_code}", response=response, body=None)
+
+
+class TestIsTransientError:
+    """Test cases for is_transient_error function."""
+
+    @pytest.mark.parametrize('status_code', [429, 500, 502, 503, 504])
+    def test_transient_status_codes(self, status_code):
+        """Test that throttling and server errors are transient."""
+        assert is_transient_error(make_status_error(status_code)) is True
+
+    @pytest.mark.parametrize('status_code', [400, 401])
+    def test_client_errors_not_transient(self, status_code):
+        """Test that client errors are not retried."""
+        assert is_transient_error(make_status_error(status_code)) is False
+
+    def test_timeout_is_transient(self):
+        """Test that timeouts are transient."""
+        assert is_transient_error(openai.APITimeoutError(request=REQUEST)) is True
+
+    def test_connection_error_is_transient(self):
+        """Test that connection errors are transient."""
+        assert is_transient_error(openai.APIConnectionError(request=REQUEST)) is True
+
+    def test_generic_exception_not_transient(self):
+        """Test that unrelated exceptions are not retried."""
+        assert is_transient_error(ValueError("bad value")) is False
+
+
+class TestGetRetryAfter:
+    """Test cases for get_retry_after function."""
+
+    def test_retry_after_seconds(self):
+        """Test Retry-After header in seconds."""
+        error = make_status_error(429, {'retry-after': '7'})
+        assert get_retry_after(error) == 7.0
+
+    def test_retry_after_ms_preferred(self):
+        """Test that retry-after-ms takes precedence."""
+        error = make_status_error(429, {'retry-after-ms': '1500', 'retry-after': '7'})
+        assert get_retry_after(error) == 1.5
+
+    def test_retry_after_http_date(self):
+        """Test Retry-After header as an HTTP date."""
+        with patch('src.api.retry.time.time', return_value=1_000_000_000):
+            error = make_status_error(429, {'retry-after': formatdate(1_000_000_010, usegmt=True)})
+            assert get_retry_after(error) == pytest.approx(10.0)
+
+    def test_retry_after_invalid(self):
+        """Test that an unparseable header is ignored."""
+        error = make_status_error(429, {'retry-after': 'soon'})
+        assert get_retry_after(error) is None
+
+    def test_no_response(self):
+        """Test errors without a response."""
+        assert get_retry_after(openai.APITimeoutError(request=REQUEST)) is None
+        assert get_retry_after(ValueError("x")) is None
+
+
+class TestComputeBackoff:
+    """Test cases for compute_backoff function."""
+
+    def test_backoff_grows_exponentially(self):
+        """Test that the jitter upper bound doubles with each attempt."""
+        with patch('src.api.retry.random.uniform', side_effect=lambda low, high: high):
+            assert compute_backoff(0, 1.0, 60.0) == 1.0
+            assert compute_backoff(1, 1.0, 60.0) == 2.0
+            assert compute_backoff(3, 1.0, 60.0) == 8.0
+
+    def test_backoff_capped(self):
+        """Test that the delay never exceeds max_delay."""
+        for attempt in range(20):
+            assert 0 <= compute_backoff(attempt, 1.0, 5.0) <= 5.0
+
+
+@patch('src.api.retry.config')
+class TestCallWithRetry:
+    """Test cases for call_with_retry and acall_with_retry functions."""
+
+    @patch('src.api.retry.time.sleep')
+    def test_success_without_retry(self, mock_sleep, mock_config):
+        """Test that a successful call is not retried."""
+        mock_config.retry_attempts = 3
+        func = Mock(return_value='ok')
+
+        assert call_with_retry(func, 'a', key='b') == 'ok'
+        func.assert_called_once_with('a', key='b')
+        mock_sleep.assert_not_called()
+
+    @patch('src.api.retry.time.sleep')
+    def test_retries_transient_errors(self, mock_sleep, mock_config):
+        """Test that transient errors are retried until success."""
+        mock_config.retry_attempts = 3
+        mock_config.retry_delay = 1.0
+        mock_config.retry_max_delay = 60.0
+        func = Mock(side_effect=[make_status_error(503), make_status_error(429), 'ok'])
+
+        assert call_with_retry(func) == 'ok'
+        assert func.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    @patch('src.api.retry.time.sleep')
+    def test_respects_retry_after(self, mock_sleep, mock_config):
+        """Test that the server's Retry-After delay is used."""
+        mock_config.retry_attempts = 3
+        mock_config.retry_max_delay = 60.0
+        func = Mock(side_effect=[make_status_error(429, {'retry-after': '12'}), 'ok'])
+
+        call_with_retry(func)
+        mock_sleep.assert_called_once_with(12.0)
+
+    @patch('src.api.retry.time.sleep')
+    def test_retry_after_capped(self, mock_sleep, mock_config):
+        """Test that a huge Retry-After is capped at retry_max_delay."""
+        mock_config.retry_attempts = 3
+        mock_config.retry_max_delay = 60.0
+        func = Mock(side_effect=[make_status_error(429, {'retry-after': '86400'}), 'ok'])
+
+        call_with_retry(func)
+        mock_sleep.assert_called_once_with(60.0)
+
+    @patch('src.api.retry.time.sleep')
+    def test_gives_up_after_retry_attempts(self, mock_sleep, mock_config):
+        """Test that the last error is raised once retries are exhausted."""
+        mock_config.retry_attempts = 2
+        mock_config.retry_delay = 0.0
+        mock_config.retry_max_delay = 0.0
+        func = Mock(side_effect=make_status_error(500))
+
+        with pytest.raises(openai.InternalServerError):
+            call_with_retry(func)
+        assert func.call_count == 3
+
+    @patch('src.api.retry.time.sleep')
+    def test_non_transient_error_not_retried(self, mock_sleep, mock_config):
+        """Test that non-transient errors are raised immediately."""
+        mock_config.retry_attempts = 3
+        func = Mock(side_effect=make_status_error(400))
+
+        with pytest.raises(openai.BadRequestError):
+            call_with_retry(func)
+        func.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('src.api.retry.asyncio.sleep', new_callable=AsyncMock)
+    def test_async_retries_transient_errors(self, mock_sleep, mock_config):
+        """Test that the async variant retries transient errors."""
+        mock_config.retry_attempts = 3
+        mock_config.retry_max_delay = 60.0
+        func = AsyncMock(side_effect=[make_status_error(429, {'retry-after': '1'}), 'ok'])
+
+        assert asyncio.run(acall_with_retry(func)) == 'ok'
+        assert func.await_count == 2
+        mock_sleep.assert_awaited_once_with(1.0)
+
+    @patch('src.api.retry.asyncio.sleep', new_callable=AsyncMock)
+    def test_async_non_transient_error_not_retried(self, mock_sleep, mock_config):
+        """Test that the async variant raises non-transient errors immediately."""
+        mock_config.retry_attempts = 3
+        func = AsyncMock(side_effect=ValueError("bad"))
+
+        with pytest.raises(ValueError):
+            asyncio.run(acall_with_retry(func))
+        mock_sleep.assert_not_awaited()
@@ -38,6 +38,23 @@ class TestAzureOpenAIConfig:
             config_obj = AzureOpenAIConfig()
             assert config_obj.api_version == '2024-02-01'
     
+    def test_init_with_quota_env_vars(self):
+        """Test reading optional RPM/TPM quotas."""
+        with patch.dict(os.environ, {
+            'AZURE_OPENAI_RPM': '300',
+            'AZURE_OPENAI_TPM': '50000'
+        }):
+            config_obj = AzureOpenAIConfig()
+            assert config_obj.requests_per_minute == 300
+            assert config_obj.tokens_per_minute == 50000
+    
+    def test_init_without_quota_env_vars(self):
+        """Test quotas default to None (no client-side limiting)."""
+        with patch.dict(os.environ, {}, clear=True):
+            config_obj = AzureOpenAIConfig()
+            assert config_obj.requests_per_minute is None
+            assert config_obj.tokens_per_minute is None
+    
     def test_validate_success(self):
         """Test successful validation."""
         with patch.dict(os.environ, {
@@ -100,6 +117,7 @@ class TestAppConfig:
             assert config_obj.batch_size == 10
             assert config_obj.retry_attempts == 3
             assert config_obj.retry_delay == 1.0
+            assert config_obj.retry_max_delay == 60.0
     
     def test_default_file_paths(self):
         """Test default file paths."""
@@ -0,0 +1,78 @@
+"""Tests for src/utils/tokens.py"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from src.utils import tokens
+from src.utils.tokens import count_message_tokens, count_tokens, estimate_tokens, tokenizer_available
+
+
+@pytest.fixture
+def reset_encoding():
+    """Forget the loaded encoding before and after the test."""
+    tokens._encoding, tokens._encoding_loaded = None, False
+    yield
+    tokens._encoding, tokens._encoding_loaded = None, False
+
+
+class TestCountTokens:
+    """Test cases for count_tokens and count_message_tokens."""
+
+    def test_uses_tokenizer_encoding(self):
+        """Test counting with a loaded tiktoken-compatible encoding."""
+        encoding = Mock()
+        encoding.encode.side_effect = lambda text, disallowed_special: text.split()
+
+        with patch('src.utils.tokens._get_encoding', return_value=encoding):
+            assert count_tokens("net revenue in 2009") == 4
+            assert count_message_tokens([
+                {"role": "system", "content": "be brief"},
+                {"role": "user", "content": ""}
+            ]) == 2 * tokens.TOKENS_PER_MESSAGE + 2
+
+    def test_falls_back_to_estimate(self):
+        """Test the character-based estimate when no tokenizer is available."""
+        with patch('src.utils.tokens._get_encoding', return_value=None):
+            assert count_tokens("x" * 10) == estimate_tokens("x" * 10) == 3
+            assert count_tokens("") == 0
+
+    def test_unavailable_encoding_loaded_once(self, reset_encoding):
+        """Test that a failing tokenizer is only tried once."""
+        with patch.dict('sys.modules', {'tiktoken': Mock(get_encoding=Mock(side_effect=OSError("offline")))}) as modules:
+            assert count_tokens("abcdefgh") == 2
+            assert count_tokens("abcdefgh") == 2
+
+            modules['tiktoken'].get_encoding.assert_called_once()
+
+    def test_encoding_not_downloaded_by_default(self, tmp_path, monkeypatch):
+        """Test that an encoding missing from the local cache is not fetched."""
+        pytest.importorskip('tiktoken')
+        from tiktoken import load
+        monkeypatch.setenv('TIKTOKEN_CACHE_DIR', str(tmp_path))
+        original_read_file = load.read_file
+
+        with patch('src.utils.tokens.config') as mock_config, \
+             patch('requests.get') as mock_get:
+            mock_config.token_encoding_download = False
+            with pytest.raises(FileNotFoundError, match="not cached locally"):
+                tokens._load_encoding('o200k_base')
+
+        mock_get.assert_not_called()
+        assert load.read_file is original_read_file
+
+    def test_encoding_downloaded_when_enabled(self):
+        """Test that config.token_encoding_download lets tiktoken fetch the encoding."""
+        tiktoken = Mock()
+        with patch.dict('sys.modules', {'tiktoken': tiktoken}), \
+             patch('src.utils.tokens.config') as mock_config:
+            mock_config.token_encoding_download = True
+            assert tokens._load_encoding('o200k_base') is tiktoken.get_encoding.return_value
+
+        tiktoken.get_encoding.assert_called_once_with('o200k_base')
+
+    def test_tokenizer_available(self):
+        """Test reporting whether a tokenizer encoding is loaded."""
+        with patch('src.utils.tokens._get_encoding', return_value=Mock()):
+            assert tokenizer_available() is True
+        with patch('src.utils.tokens._get_encoding', return_value=None):
+            assert tokenizer_available() is False
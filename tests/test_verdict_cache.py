@@ -0,0 +1,99 @@
+"""Tests for src/evaluation/verdict_cache.py"""
+
+import os
+import tempfile
+import pytest
+from unittest.mock import patch
+
+from src.evaluation.verdict_cache import VerdictCache
+
+
+def make_turn(**overrides):
+    """Build the judge inputs for a turn."""
+    turn = {
+        'question_id': 'item-0',
+        'question': 'What was the change in revenue?',
+        'expected_answer': 25587.0,
+        'predicted_answer': 25687.0,
+        'expected_program': 'subtract(206588, 181001)',
+        'predicted_program': 'subtract(206688, 181001)'
+    }
+    turn.update(overrides)
+    return turn
+
+
+@pytest.fixture
+def verdict_cache():
+    """VerdictCache in a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = VerdictCache(os.path.join(temp_dir, 'verdicts.sqlite'), 1024 * 1024)
+        yield cache
+        cache.close()
+
+
+class TestMakeKey:
+    """Test cases for VerdictCache.make_key."""
+    
+    def test_key_ignores_formatting_differences(self):
+        """Test that whitespace, constants and float noise do not change the key."""
+        key = VerdictCache.make_key(make_turn())
+        
+        assert key == VerdictCache.make_key(make_turn(
+            question_id='other-3',
+            question='  What was the change   in revenue? ',
+            predicted_answer=25687.000000000004,
+            expected_program='subtract( 206588,181001 )'
+        ))
+        assert VerdictCache.make_key(make_turn(predicted_program='subtract(75.95, const_100)')) == \
+            VerdictCache.make_key(make_turn(predicted_program='subtract(75.95, 100.0)'))
+    
+    def test_key_changes_with_inputs(self):
+        """Test that any changed judge input changes the key."""
+        key = VerdictCache.make_key(make_turn())
+        
+        assert key != VerdictCache.make_key(make_turn(predicted_answer=25587.0))
+        assert key != VerdictCache.make_key(make_turn(predicted_program='subtract(206588, 181001)'))
+        assert key != VerdictCache.make_key(make_turn(question='What was the change in cost?'))
+    
+    def test_key_changes_with_prompt_version(self):
+        """Test that bumping the prompt version invalidates cached verdicts."""
+        key = VerdictCache.make_key(make_turn())
+        
+        with patch('src.evaluation.verdict_cache.EvaluationPrompts.PROMPT_VERSION', 'next'):
+            assert VerdictCache.make_key(make_turn()) != key
+
+
+class TestVerdictCache:
+    """Test cases for VerdictCache get/set."""
+    
+    def test_miss_then_hit(self, verdict_cache):
+        """Test storing and retrieving a verdict."""
+        assert verdict_cache.get(make_turn()) is None
+        
+        verdict_cache.set(make_turn(), {
+            'answer_correct': False,
+            'program_correct': False,
+            'reasoning': 'Off by 100',
+            'extra': 'ignored'
+        })
+        
+        assert verdict_cache.get(make_turn()) == {
+            'answer_correct': False,
+            'program_correct': False,
+            'reasoning': 'Off by 100'
+        }
+        stats = verdict_cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+    
+    def test_persists_across_instances(self):
+        """Test that verdicts survive reopening the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'verdicts.sqlite')
+            cache = VerdictCache(path, 1024 * 1024)
+            cache.set(make_turn(), {'answer_correct': True, 'program_correct': True})
+            cache.close()
+            
+            reopened = VerdictCache(path, 1024 * 1024)
+            assert reopened.get(make_turn())['answer_correct'] is True
+            reopened.close()